@@ -0,0 +1,52 @@
+"""
+Compares Base's divide-and-conquer conversion against the digit-at-a-time
+loops it replaced. Run with `python -m benchmarks.base`.
+"""
+import random
+import time
+import numpy as np
+from src.base import Base
+
+def weighted_loop(digits, old_base):
+  """The original to_base_10: a new weighting factor for every digit"""
+  decimal = 0
+  for index, digit in enumerate(reversed(digits)):
+    decimal += old_base ** index * int(digit, old_base)
+  return decimal
+
+def division_loop(decimal, new_base):
+  """The original from_base_10 (with exact division): one digit added to the left at a time"""
+  digits = ""
+  while decimal != 0:
+    digits = Base.DIGITS[decimal % new_base] + digits
+    decimal //= new_base
+  return digits
+
+def measure(function, *args):
+  """Returns the time (in seconds) of a single run"""
+  start = time.perf_counter()
+  function(*args)
+  return time.perf_counter() - start
+
+def main():
+  print(f"{'digits':>10} {'weighted loop':>15} {'to_base_10':>12} {'division loop':>15} {'to_string':>12}")
+  for size in [10**3, 10**4, 10**5, 10**6]:
+    digits = "".join(random.choice("0123456789") for _ in range(size))
+    decimal = Base.to_base_10(digits, 10)
+    # The original loops take minutes past 10^5 digits
+    weighted_time = measure(weighted_loop, digits, 10) if size <= 10**4 else None
+    division_time = measure(division_loop, decimal, 7) if size <= 10**5 else None
+    print(f"{size:>10} " +
+      (f"{weighted_time:>13.3f} s " if weighted_time else f"{'-':>15} ") +
+      f"{measure(Base.to_base_10, digits, 10):>10.3f} s " +
+      (f"{division_time:>13.3f} s " if division_time else f"{'-':>15} ") +
+      f"{measure(Base.to_string, decimal, 7):>10.3f} s")
+  # A column of a million IDs, one Base.convert() call at a time (timed on
+  # the first 10^5) against one Base.convert_many() call
+  ids = np.random.default_rng(1).integers(0, 10**12, 10**6)
+  loop_time = measure(lambda: [Base.convert(int(value), 10, 36) for value in ids[:10**5]]) * 10
+  batch_time = measure(Base.convert_many, ids, 10, 36)
+  print(f"\n10^6 IDs to base-36: convert loop {loop_time:.3f} s, convert_many {batch_time:.3f} s ({loop_time / batch_time:.1f}x)")
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,48 @@
+"""
+Compares the cumulative ('min'/'max') path of Probability.binomial (the
+recurrence in Probability.binomial_sum and the cached Binomial tables)
+against the loops it replaced. Run with `python -m benchmarks.binomial`.
+"""
+import math
+import timeit
+from src.probability import Probability, Binomial
+
+def factorial_loop(n, r, success_chance):
+  """The original loop: three factorials and two powers per outcome"""
+  total = 0
+  for k in range(0, r + 1):
+    combinations = math.factorial(n) / (math.factorial(k) * math.factorial(n - k))
+    total += combinations * success_chance ** k * (1 - success_chance) ** (n - k)
+  return total
+
+def log_loop(n, r, success_chance):
+  """The log-space loop: one log-gamma chance per outcome"""
+  return sum(math.exp(Probability.log_binomial(n, k, success_chance)) for k in range(0, r + 1))
+
+def measure(function, *args):
+  """Returns the best time (in seconds) of a few runs"""
+  timer = timeit.Timer(lambda: function(*args))
+  runs, _ = timer.autorange()
+  return min(timer.repeat(3, runs)) / runs
+
+def main():
+  print(f"{'n':>12} {'factorial loop':>16} {'log loop':>12} {'recurrence':>12} {'speedup':>9} {'table build':>13} {'lookup':>10}")
+  for n in [10, 100, 170, 1000, 10**4, 10**5, 10**6]:
+    # Chance of at most n/2 successes in n fair coin flips
+    args = (n, n // 2, 0.5)
+    # The original loop overflows floats above n = 170
+    factorial_time = measure(factorial_loop, *args) if n <= 170 else None
+    log_time = measure(log_loop, *args) if n <= 10**5 else None
+    recurrence_time = measure(Probability.binomial_sum, n, 0, n // 2, 0.5)
+    baseline = log_time or factorial_time
+    print(f"{n:>12} " +
+      (f"{factorial_time * 1e3:>13.3f} ms " if factorial_time else f"{'overflow':>16} ") +
+      (f"{log_time * 1e3:>9.3f} ms " if log_time else f"{'-':>12} ") +
+      f"{recurrence_time * 1e3:>9.3f} ms " +
+      (f"{baseline / recurrence_time:>8.1f}x " if baseline else f"{'-':>9} ") +
+      (f"{measure(lambda: Binomial(*args[::2]).build()) * 1e3:>10.3f} ms " +
+        f"{measure(Binomial.of(n, 0.5).probability, n // 2, 'max') * 1e6:>7.3f} us"
+        if n <= Binomial.TABLE_LIMIT else ""))
+
+if __name__ == '__main__':
+  main()
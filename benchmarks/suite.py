@@ -0,0 +1,200 @@
+"""
+Measures how long each solver takes (and how much memory it uses) as its
+input grows, so slowdowns show up before they reach a real job. Run with
+`python -m benchmarks.suite`.
+
+For each case, the input size is swept (matrix order, n, digit count, or
+number of triangles) and each size gets:
+  - its best time over a few runs (in seconds)
+  - its peak memory (in bytes, from tracemalloc, in a separate run since
+    tracing slows everything down)
+
+The empirical complexity exponent is the slope of log(time) against
+log(size). For example, about 1 is linear, about 2 is quadratic, and
+factorial growth (like Matrix.determinant's cofactor expansion) keeps
+rising as the sizes get bigger.
+
+  python -m benchmarks.suite --output baseline.json
+  python -m benchmarks.suite --compare baseline.json  <- flags slowdowns
+
+*Comparing exits with status 1 when any size got slower than the
+threshold, so it can be used in scripts
+"""
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+import tracemalloc
+import numpy as np
+from src.base import Base
+from src.matrix import Matrix
+from src.probability import Probability, Binomial
+from src.triangle import Triangle, TriangleBatch
+
+def random_matrix(order):
+  generator = random.Random(order)
+  return Matrix([[generator.uniform(-10, 10) for _ in range(order)] for _ in range(order)])
+
+def random_triangles(count):
+  """Returns SAS triangles (2 sides and the angle between them) as keyword arguments"""
+  generator = random.Random(count)
+  return [{"a": generator.uniform(1, 10), "b": generator.uniform(1, 10), "C": generator.uniform(1, 179)}
+    for _ in range(count)]
+
+def solve_triangles(triangles):
+  for triangle in triangles:
+    Triangle(**triangle)
+
+def triangle_columns(count):
+  """Returns the same triangles as random_triangles() as columns for TriangleBatch"""
+  triangles = random_triangles(count)
+  return {name: np.array([triangle[name] for triangle in triangles]) for name in ("a", "b", "C")}
+
+def solve_batch(columns):
+  return TriangleBatch(**columns)
+
+def binomial(n):
+  # Nothing is reused between runs, so each run is a one-off call
+  Binomial.clear()
+  return Probability.binomial(n, n // 2, 0.5, "max")
+
+def random_digits(size):
+  generator = random.Random(size)
+  return str(generator.randint(1, 9)) + "".join(generator.choice("0123456789") for _ in range(size - 1))
+
+# name: (size label, sizes, quick sizes, setup(size) -> args, function(*args))
+CASES = {
+  "matrix.determinant": ("order", [3, 4, 5, 6, 7, 8], [3, 4, 5],
+    lambda order: (random_matrix(order),), Matrix.determinant),
+  "matrix.multiply": ("order", [10, 20, 40, 80], [5, 10],
+    lambda order: (random_matrix(order), random_matrix(order)), Matrix.__mul__),
+  "matrix.to_row_echelon": ("order", [10, 20, 40, 80], [5, 10],
+    lambda order: (random_matrix(order),), Matrix.to_row_echelon),
+  # Only up to Binomial.TABLE_LIMIT, since larger n use a different method
+  "probability.binomial": ("n", [10**2, 10**3, 10**4, 10**5], [10**2, 10**3],
+    lambda n: (n,), binomial),
+  "base.convert": ("digits", [10**3, 10**4, 10**5, 3 * 10**5], [10**2, 10**3],
+    lambda size: (random_digits(size), 10, 7), Base.convert),
+  "triangle.solve": ("triangles", [10**2, 10**3, 10**4], [10, 100],
+    lambda count: (random_triangles(count),), solve_triangles),
+  "triangle.batch": ("triangles", [10**2, 10**3, 10**4, 10**5, 10**6], [10, 100],
+    lambda count: (triangle_columns(count),), solve_batch),
+}
+
+def measure(function, args, min_time=0.2, max_runs=20):
+  """Returns the best time (in seconds) of a few runs, stopping after min_time seconds"""
+  best = math.inf
+  total = 0
+  runs = 0
+  while runs < max_runs and (runs < 3 or total < min_time):
+    start = time.perf_counter()
+    function(*args)
+    elapsed = time.perf_counter() - start
+    best = min(best, elapsed)
+    total += elapsed
+    runs += 1
+    # Very slow sizes only run once
+    if elapsed > 2 * min_time:
+      break
+  return best
+
+def peak_memory(function, args):
+  """Returns the most memory (in bytes) allocated at once during a run"""
+  tracemalloc.start()
+  try:
+    function(*args)
+    return tracemalloc.get_traced_memory()[1]
+  finally:
+    tracemalloc.stop()
+
+def exponent(sizes, seconds):
+  """Returns the slope of the best-fit line of log(time) against log(size)"""
+  if len(sizes) < 2:
+    return None
+  return float(np.polyfit(np.log(sizes), np.log(np.maximum(seconds, 1e-9)), 1)[0])
+
+def run_case(name, quick=False, min_time=0.2):
+  """Sweeps the sizes of a case and returns its results"""
+  label, sizes, quick_sizes, setup, function = CASES[name]
+  sizes = quick_sizes if quick else sizes
+  results = {"size": label, "sizes": sizes, "seconds": [], "peak_bytes": []}
+  for size in sizes:
+    # Inputs are made outside the timed runs
+    args = setup(size)
+    results["seconds"].append(measure(function, args, min_time))
+    results["peak_bytes"].append(peak_memory(function, args))
+  results["exponent"] = exponent(sizes, results["seconds"])
+  return results
+
+def run(names=None, quick=False, min_time=0.2, progress=None):
+  """Runs the cases (all of them by default) and returns their results with details of this machine"""
+  results = {"python": platform.python_version(), "numpy": np.__version__, "machine": platform.machine(),
+    "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "quick": quick, "cases": {}}
+  for name in names or CASES:
+    results["cases"][name] = run_case(name, quick, min_time)
+    if progress is not None:
+      progress(name, results["cases"][name])
+  return results
+
+def compare(results, baseline, threshold=1.25):
+  """
+  Returns a list of slowdowns: the case, size, baseline and new times,
+  and their ratio for every size that takes more than 'threshold' times as
+  long as it did in the baseline
+  """
+  slowdowns = []
+  for name, case in results["cases"].items():
+    old_case = baseline["cases"].get(name)
+    if old_case is None:
+      continue
+    old_times = dict(zip(old_case["sizes"], old_case["seconds"]))
+    for size, seconds in zip(case["sizes"], case["seconds"]):
+      if size in old_times and seconds > threshold * old_times[size]:
+        slowdowns.append({"case": name, "size": size, "baseline": old_times[size], "seconds": seconds,
+          "ratio": seconds / old_times[size]})
+  return slowdowns
+
+def print_case(name, case, baseline=None):
+  old_times = {}
+  if baseline is not None and name in baseline["cases"]:
+    old_times = dict(zip(baseline["cases"][name]["sizes"], baseline["cases"][name]["seconds"]))
+  fitted = "-" if case["exponent"] is None else f"{case['exponent']:.2f}"
+  print(f"{name} (time ~ {case['size']}^{fitted})")
+  for size, seconds, peak in zip(case["sizes"], case["seconds"], case["peak_bytes"]):
+    change = f" {seconds / old_times[size]:>6.2f}x baseline" if size in old_times else ""
+    print(f"  {case['size']}={size:<10} {seconds * 1e3:>12.3f} ms {peak / 2**20:>10.2f} MiB{change}")
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description="Benchmarks every solver over a range of sizes.")
+  parser.add_argument("cases", nargs="*", help=f"cases to run (all by default): {', '.join(CASES)}")
+  parser.add_argument("--output", help="file to save the results to as JSON")
+  parser.add_argument("--compare", help="JSON results from an earlier run to compare against")
+  parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio that gets flagged")
+  parser.add_argument("--quick", action="store_true", help="only run the smallest sizes")
+  parser.add_argument("--min-time", type=float, default=0.2, help="seconds to keep re-running each size for")
+  args = parser.parse_args(argv)
+  unknown = [name for name in args.cases if name not in CASES]
+  if unknown:
+    parser.error(f"unknown cases: {', '.join(unknown)}")
+  baseline = None
+  if args.compare:
+    with open(args.compare) as file:
+      baseline = json.load(file)
+  results = run(args.cases, args.quick, args.min_time, lambda name, case: print_case(name, case, baseline))
+  if args.output:
+    with open(args.output, "w") as file:
+      json.dump(results, file, indent=2)
+  if baseline is not None:
+    slowdowns = compare(results, baseline, args.threshold)
+    for slowdown in slowdowns:
+      print(f"SLOWER: {slowdown['case']} at size {slowdown['size']} took {slowdown['ratio']:.2f}x as long "
+        f"({slowdown['baseline'] * 1e3:.3f} ms -> {slowdown['seconds'] * 1e3:.3f} ms)")
+    print(f"{len(slowdowns)} slowdowns over {args.threshold}x")
+    return 1 if slowdowns else 0
+  return 0
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -1,8 +1,6 @@
-import math
-from src.triangle import Triangle
-from src.matrix import Matrix
-from src.plane import Plane
-from src.probability import Probability
-from src.base import Base
+# Runs solver requests from JSON Lines (see docs/markdown/cli.md)
+# Ex. python main.py requests.jsonl --workers 4
+from src.cli import main
 
-# Solvers go here
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,6 @@
+import os
+
+# Instruments the whole run when MATHKIT_INSTRUMENT is set (see src/instrument.py)
+if os.environ.get("MATHKIT_INSTRUMENT"):
+  from src.instrument import Instrument
+  Instrument.from_environment()
@@ -1,6 +1,30 @@
-import math
+import functools
+import time
+import numpy as np
 
 class Base:
+  """
+  Converts numbers between number systems (bases). Digits past 9 are
+  letters, so hexadecimal 'ff' is 255 and base-36 can use every digit from 0
+  to z.
+
+  *Numbers can be given as ints (ex. 265) or strings (ex. '265' or '1f'). Ints
+  are returned when every digit of the answer is 0-9 (so no letters are
+  needed), and strings are returned otherwise or when the input was a string.
+  """
+  DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+  # Numbers with at most this many digits are converted one digit at a time.
+  # Longer numbers are split in half (see Base.to_string()) until they're
+  # this short.
+  LEAF_DIGITS = 32
+  # Powers with more bits than this are divided by with a reciprocal instead
+  # of Python's own division (see Base.split())
+  RECIPROCAL_BITS = 2**14
+  # Number of bits in one digit of each power-of-two base
+  BITS = {2: 1, 4: 2, 8: 3, 16: 4, 32: 5}
+  # Digits handled at a time when regrouping bits (see Base.regroup())
+  CHUNK_DIGITS = 2**16
+
   @staticmethod
   def convert(num, old_base, new_base):
     """
@@ -8,34 +32,175 @@ class Base:
     base using both weighted multiplication and successive division. This
     uses base-10 as an intermediary number system because that's how we
     normally represent numbers (digits ranging from 0 to 9).
+
+    Returns None if num has a digit that isn't allowed in the old base.
     """
+    digits = Base.digits_of(num)
     # Check if all digits in num are valid (less than the old base)
-    if(all(int(digit) < old_base for digit in str(num))):
-      decimal = Base.to_base_10(num, old_base)
-      output = Base.from_base_10(decimal, new_base)
-      return output
-  
+    if not Base.is_valid(digits, old_base):
+      return None
+    if old_base in Base.BITS and new_base in Base.BITS:
+      # Between power-of-two bases, digits can be regrouped without base-10
+      chunks = (digits[start:start + Base.CHUNK_DIGITS] for start in range(0, len(digits), Base.CHUNK_DIGITS))
+      output = "".join(Base.regroup(chunks, old_base, new_base, len(digits)))
+      return output if isinstance(num, str) else Base.to_number(output)
+    decimal = Base.to_base_10(digits, old_base)
+    output = Base.to_string(decimal, new_base)
+    return output if isinstance(num, str) else Base.to_number(output)
+
+  @staticmethod
+  def convert_many(values, old_base, new_base):
+    """
+    Converts a whole array (or list) of numbers from their old base to a new
+    base at once, with numpy. Returns a numpy array of the converted numbers,
+    or None if any of them has a digit that isn't allowed in the old base.
+
+    The numbers are lined up as rows of a digit matrix (padded with zeros
+    on the left), so weighted multiplication becomes one matrix product with
+    the weighting factors, and successive division works on a whole column
+    of digits at a time.
+
+    Ex. ['265', '17'] in base 8 -> [[2, 6, 5], [0, 1, 7]] @ [64, 8, 1] -> [181, 15]
+
+    *An int array stays an int array when the new base is 10 or less (so no
+    answer can have letters), and strings are returned otherwise. Numbers
+    too big to fit in 64 bits are converted one at a time with Base.convert().
+    *Like Base.convert(), negative numbers raise a ValueError (while digit
+    strings with a '-' just have a digit that isn't allowed)
+    """
+    if not isinstance(values, np.ndarray):
+      # Lists go through Python objects, since numpy would turn ints too big
+      # for 64 bits into (rounded) floats
+      values = np.array(values, dtype=object)
+    numbers = values.dtype.kind in "iu" or (values.dtype == object and
+      all(isinstance(value, int) for value in values.flat))
+    if values.size == 0:
+      return np.array([], dtype=np.int64 if numbers else str).reshape(values.shape)
+    flat = values.ravel()
+    if values.dtype.kind in "if":
+      negative = flat[flat < 0].tolist()
+    else:
+      negative = [value for value in flat.tolist() if isinstance(value, (int, float)) and value < 0]
+    if negative:
+      raise ValueError(f"can't convert negative number {negative[0]}")
+    try:
+      if values.dtype.kind in "iu":
+        decimal = Base.read_many(flat.astype(np.uint64), old_base)
+      else:
+        decimal = Base.parse_many(flat, old_base)
+    except OverflowError:
+      output = [Base.convert(value.decode() if isinstance(value, bytes) else value, old_base, new_base)
+        for value in flat.tolist()]
+      if any(value is None for value in output):
+        return None
+      return np.array(output, dtype=object if numbers and new_base <= 10 else str).reshape(values.shape)
+    if decimal is None:
+      return None
+    # Successive division, one column of digits at a time (from the right)
+    size = len(Base.to_string(int(decimal.max(initial=0)), new_base))
+    output = np.empty((len(decimal), size), dtype=np.uint8)
+    for column in range(size - 1, -1, -1):
+      decimal, output[:, column] = np.divmod(decimal, np.uint64(new_base))
+    if numbers and new_base <= 10 and size <= 18:
+      weights = 10 ** np.arange(size - 1, -1, -1, dtype=np.int64)
+      return (output.astype(np.int64) @ weights).reshape(values.shape)
+    characters = np.frombuffer(Base.DIGITS.encode(), dtype=np.uint8)[output]
+    strings = np.char.lstrip(characters.view(f"S{size}").ravel(), b"0")
+    strings = np.where(strings == b"", b"0", strings).astype(str).reshape(values.shape)
+    if numbers and new_base <= 10:
+      # Too long for 64 bits, so these become Python ints
+      return np.array([int(value) for value in strings.ravel()], dtype=object).reshape(values.shape)
+    return strings
+
+  @staticmethod
+  def read_many(values, old_base):
+    """
+    Returns the base-10 values of a uint64 array of numbers whose decimal
+    digits are digits in the old base, or None if any digit is too big for
+    it. The digits are pulled off from the right with successive division
+    by 10, so no strings are made.
+
+    *Raises an OverflowError if the values might not fit in 64 bits
+    """
+    if old_base == 10:
+      return values
+    if old_base > 10 and old_base ** len(str(int(values.max()))) > 2**64:
+      raise OverflowError("values are too big for 64 bits")
+    decimal = np.zeros(len(values), dtype=np.uint64)
+    weight = np.uint64(1)
+    remaining = values.copy()
+    while remaining.any():
+      remaining, digit = np.divmod(remaining, np.uint64(10))
+      if (digit >= old_base).any():
+        return None
+      # Each decimal digit gets the weighting factor of its place in the old base
+      decimal += digit * weight
+      weight *= np.uint64(old_base)
+    return decimal
+
+  @staticmethod
+  def parse_many(values, old_base):
+    """
+    Returns the base-10 values of a flat array of digit strings (or
+    numbers, whose decimal digits are used) as a uint64 array, or None if
+    any of them has a digit that's too big for the old base.
+
+    *Raises an OverflowError if the values might not fit in 64 bits
+    """
+    try:
+      # 1 byte per character, so every digit is one column of the matrix
+      digits = np.char.strip(values.astype("S"))
+    except UnicodeEncodeError:
+      return None
+    lengths = np.char.str_len(digits)
+    width = int(lengths.max())
+    if (lengths == 0).any():
+      return None
+    if old_base ** width > 2**64:
+      raise OverflowError("values are too big for 64 bits")
+    # Turn each digit's character code into its value (255 for non-digits)
+    codes = np.char.rjust(digits, width, b"0").view(np.uint8).reshape(-1, width)
+    matrix = Base.digit_values()[codes]
+    # Check the whole batch in one pass
+    if (matrix >= old_base).any():
+      return None
+    weights = np.uint64(old_base) ** np.arange(width - 1, -1, -1, dtype=np.uint64)
+    return matrix.astype(np.uint64) @ weights
+
+  @staticmethod
+  @functools.lru_cache(maxsize=None)
+  def digit_values():
+    """Returns an array from character codes to digit values, where non-digits are 255"""
+    table = np.full(256, 255, dtype=np.uint8)
+    for digits in (Base.DIGITS, Base.DIGITS.upper()):
+      table[np.frombuffer(digits.encode(), dtype=np.uint8)] = np.arange(len(digits))
+    return table
+
   @staticmethod
   def to_base_10(num, old_base):
     """
     Returns the base-10 (decimal) equivalent of an input number using weighted
     multiplication. This is useful when you want to convert from a
     non-base-10 number system (ex. binary, hexadecimal) to base-10.
+
+    Weighted multiplication gives each digit a weighting factor by raising its
+    base by its position from the right (ex. 2 in octal 265 has a factor of
+    8^2, or 64), and adds up the products of each digit and its factor.
+    Instead of doing this one digit at a time, the digits are split in half
+    and each half is converted separately. The left half is then just one big
+    digit, whose weighting factor is the old base raised to the length of the
+    right half.
+
+    Ex. octal 265 = 26 * 8^1 + 5 = (2 * 8 + 6) * 8 + 5 = 181
+
+    *Splitting at lengths of LEAF_DIGITS * 2^k means every weighting factor
+    is a power from a small shared table (see Base.power())
     """
-    # Split num into a list of its digits
-    digits = [int(digit) for digit in str(num)]
-    # Decimal will be used as an output sum in base-10
-    decimal = 0
-    # Get each digit and its index in reverse order, since weighted
-    # multiplication goes from right to left
-    for index, digit in enumerate(reversed(digits)):
-      # Find each digit's weighting factor by raising its base by its
-      # position from the right (ex. 2 in octal 265 has a factor of 8^2, or 64)
-      weighting_factor = old_base ** index
-      # Adds the product between the digit and its weighting factor to sum
-      # Ex. The 2 in 265 is two 64s, which is 128 in base-10
-      decimal += weighting_factor * digit
-    return decimal
+    digits = Base.digits_of(num)
+    level = 0
+    while Base.LEAF_DIGITS << level < len(digits):
+      level += 1
+    return Base.join(digits, old_base, level)
 
   @staticmethod
   def from_base_10(decimal, new_base):
@@ -44,16 +209,380 @@ class Base:
     number system using successive division. This is useful for converting
     from base-10 to non-base-10.
     """
-    # Digits will be used to construct the output number
-    digits = ""
-    # Continue dividing until quotient goes from its full amount (the
-    # input decimal) to 0
-    quotient = decimal
-    while quotient != 0:
-      # Add the remainder to the left of any existing digits (basically
-      # concatenating in reverse)
-      digits = str(quotient % new_base) + digits
-      # Update the quotient, rounded down
-      quotient = math.floor(quotient / new_base)
-    # Convert from string to integer
-    return int(digits)
\ No newline at end of file
+    return Base.to_number(Base.to_string(decimal, new_base))
+
+  @staticmethod
+  def to_string(decimal, new_base):
+    """
+    Returns the digits of a base-10 (decimal) number in a new base as a
+    string (ex. to_string(255, 16) is 'ff').
+
+    Successive division finds the digits from right to left: the remainder
+    of dividing by the new base is the rightmost digit, and the quotient holds
+    the rest. Dividing by new_base^k instead splits off k digits at once, so
+    this divides the number in half (by a power from Base.power()), converts
+    both halves the same way, and joins their digits. Every division is on
+    exact integers, so there's no rounding no matter how big the number is.
+    """
+    if decimal < 0:
+      # Floor division of a negative number never reaches 0, so the digits would never end
+      raise ValueError(f"can't convert negative number {decimal}")
+    if decimal == 0:
+      return "0"
+    # Find the smallest shared power bigger than the number
+    level = 0
+    while Base.power(new_base, level) <= decimal:
+      level += 1
+    return "".join(Base.split_digits(decimal, new_base, level, False))
+
+  @staticmethod
+  def join(digits, base, level):
+    """
+    Returns the value of a digit string with at most LEAF_DIGITS * 2^level
+    digits (see Base.to_base_10())
+    """
+    if level == 0:
+      return int(digits, base)
+    # The right half always has exactly LEAF_DIGITS * 2^(level - 1) digits
+    width = Base.LEAF_DIGITS << (level - 1)
+    if len(digits) <= width:
+      return Base.join(digits, base, level - 1)
+    high = Base.join(digits[:-width], base, level - 1)
+    low = Base.join(digits[-width:], base, level - 1)
+    return high * Base.power(base, level - 1) + low
+
+  @staticmethod
+  def split_digits(number, base, level, pad):
+    """
+    Yields the digits of a number below Base.power(base, level) in pieces,
+    from left to right. When pad is True, zeros are added to the left so the
+    number takes up exactly LEAF_DIGITS * 2^level digits (ex. the right half
+    of 10005 is '05', not '5').
+    """
+    if level == 0:
+      digits = []
+      while number:
+        number, digit = divmod(number, base)
+        digits.append(Base.DIGITS[digit])
+      digits = "".join(reversed(digits))
+      yield digits.rjust(Base.LEAF_DIGITS, "0") if pad else digits
+      return
+    high, low = Base.split(number, base, level - 1)
+    # Leading zeros are only kept when this isn't the left end of the number
+    if high or pad:
+      yield from Base.split_digits(high, base, level - 1, pad)
+      pad = True
+    yield from Base.split_digits(low, base, level - 1, pad)
+
+  @staticmethod
+  def split(number, base, level):
+    """
+    Returns divmod(number, Base.power(base, level)) for a number below the
+    power squared.
+
+    Python's division takes time proportional to the square of the number's
+    length, while its multiplication (Karatsuba's algorithm) is much faster
+    for big numbers. So big powers are divided by multiplying with a
+    precomputed reciprocal instead (Barrett reduction).
+
+    Formula: quotient = floor(number * floor(4^L / power) / 4^L), where L is
+      the number of bits in the power
+    *This can only be too small by 1 or 2, which the loop at the end fixes
+    """
+    power = Base.power(base, level)
+    if power.bit_length() <= Base.RECIPROCAL_BITS:
+      return divmod(number, power)
+    bits = 2 * power.bit_length()
+    quotient = (number * Base.reciprocal(base, level)) >> bits
+    remainder = number - quotient * power
+    while remainder >= power:
+      quotient += 1
+      remainder -= power
+    return (quotient, remainder)
+
+  @staticmethod
+  @functools.lru_cache(maxsize=256)
+  def power(base, level):
+    """
+    Returns base^(LEAF_DIGITS * 2^level). Each level is the square of the one
+    before it, and they're all kept, since every conversion in the same base
+    reuses them.
+    """
+    if level == 0:
+      return base ** Base.LEAF_DIGITS
+    return Base.power(base, level - 1) ** 2
+
+  @staticmethod
+  @functools.lru_cache(maxsize=256)
+  def reciprocal(base, level):
+    """Returns floor(4^L / power), where power is Base.power(base, level) with L bits"""
+    return Base.inverse(Base.power(base, level))
+
+  @staticmethod
+  def inverse(divisor):
+    """
+    Returns floor(4^L / divisor), where L is the number of bits in the
+    divisor, using Newton's method.
+
+    The inverse of just the top half of the divisor's bits is found first
+    (the same way), which is already correct for about half of the answer's
+    bits. One step of Newton's method, x = x + x * (1 - divisor * x), doubles
+    the number of correct bits, and the last few units are fixed by checking
+    the remainder.
+    """
+    size = divisor.bit_length()
+    if size <= Base.RECIPROCAL_BITS:
+      return (1 << 2 * size) // divisor
+    half = size // 2 + 2
+    shift = size - half
+    estimate = Base.inverse(divisor >> shift) << shift
+    error = (1 << 2 * size) - divisor * estimate
+    estimate += (estimate * error) >> (2 * size)
+    remainder = (1 << 2 * size) - divisor * estimate
+    while remainder < 0:
+      estimate -= 1
+      remainder += divisor
+    while remainder >= divisor:
+      estimate += 1
+      remainder -= divisor
+    return estimate
+
+  @staticmethod
+  def regroup(chunks, old_base, new_base, total_digits=None):
+    """
+    Converts digits between two power-of-two bases (2, 4, 8, 16, or 32)
+    without working out the number's value. It takes an iterable of digit
+    strings (ex. pieces of a file) and yields the new digits in pieces.
+
+    Every digit in these bases stands for a fixed group of bits (ex. each hex
+    digit is 4 bits), so the number's bits are just its digits' bits in a row.
+    Converting means cutting those bits into groups of the new size, from the
+    right, and looking up each group's digit.
+
+    Ex. octal 75 -> bits 111 101 -> bits 11 1101 -> hex 3d
+
+    - total_digits is the number of digits in all the chunks together. The
+      groups are counted from the right, so this tells how many zero bits go
+      on the left to line them up. If it's None, the chunks are all read
+      before anything is yielded, unless each old digit turns into a whole
+      number of new digits (ex. hex to binary), where no lining up is needed.
+
+    *Leading zeros are removed, and a ValueError is raised for any digit that
+    isn't allowed in the old base
+    """
+    old_bits, new_bits = Base.BITS[old_base], Base.BITS[new_base]
+    if old_bits % new_bits == 0:
+      # Each old digit is a whole number of new digits, so this is a single
+      # str.translate() per chunk
+      table = Base.digit_table(old_base, new_base)
+      group = 0
+    else:
+      table = Base.digit_table(old_base, 2)
+      groups = Base.group_table(new_base)
+      group = len(next(iter(groups)))
+      if total_digits is None:
+        chunks = ["".join(chunks)]
+        total_digits = len(chunks[0])
+    # Zero bits that line the groups up with the right end of the number
+    carry = "0" * (-total_digits * old_bits % group) if group else ""
+    leading = True
+    for chunk in chunks:
+      if not chunk:
+        continue
+      if not Base.is_valid(chunk.lower(), old_base):
+        raise ValueError(f"'{chunk}' has a digit that isn't allowed in base {old_base}")
+      if group:
+        bits = carry + chunk.translate(table)
+        end = len(bits) - len(bits) % group
+        carry = bits[end:]
+        output = "".join([groups[bits[start:start + group]] for start in range(0, end, group)])
+      else:
+        output = chunk.translate(table)
+      if leading:
+        output = output.lstrip("0")
+        leading = not output
+      if output:
+        yield output
+    if leading:
+      yield "0"
+
+  @staticmethod
+  def convert_stream(chunks, old_base, new_base, total_digits=None, progress=None, stats=None):
+    """
+    Converts a number whose digits come in pieces (ex. read from a file bit
+    by bit) from its old base to a new base, and yields the new digits in
+    pieces. Whitespace in the chunks (ex. line breaks) is skipped.
+
+    - Between power-of-two bases, the digits are regrouped as they arrive
+      (see Base.regroup()), so only one chunk is held in memory at a time.
+      total_digits is the same as in Base.regroup().
+    - Between any other bases, every digit of the output depends on every
+      digit of the input, so the number's value has to be worked out before
+      the first output digit is known. The chunks are still read one at a
+      time and combined like Base.to_base_10() does (see Base.read_chunks()),
+      so only the value is kept, which takes about half the memory of its
+      digits (or less). The output is then yielded in pieces as it's found.
+    - progress is an optional function that's called as progress(stats)
+      after each output piece, and stats is an optional dictionary that's
+      filled with 'digits_read', 'digits_written', 'seconds', and
+      'digits_per_second' (input digits per second)
+
+    *A ValueError is raised for any digit that isn't allowed in the old base
+    """
+    stats = {} if stats is None else stats
+    stats.update({"digits_read": 0, "digits_written": 0, "seconds": 0.0, "digits_per_second": 0.0})
+    start = time.perf_counter()
+    chunks = Base.track(chunks, stats)
+    if old_base in Base.BITS and new_base in Base.BITS:
+      output = Base.regroup(chunks, old_base, new_base, total_digits)
+    else:
+      output = Base.write_chunks(Base.read_chunks(chunks, old_base), new_base)
+    for piece in output:
+      stats["digits_written"] += len(piece)
+      stats["seconds"] = time.perf_counter() - start
+      stats["digits_per_second"] = stats["digits_read"] / stats["seconds"] if stats["seconds"] else 0.0
+      if progress is not None:
+        progress(stats)
+      yield piece
+
+  @staticmethod
+  def convert_file(source, destination, old_base, new_base, chunk_size=2**20, progress=None):
+    """
+    Converts a number stored as digits in a text file (which can be bigger
+    than memory) to a new base and writes its digits to another file.
+    Returns the stats from Base.convert_stream().
+
+    *chunk_size is the number of characters read at a time
+    """
+    total_digits = None
+    if old_base in Base.BITS and new_base in Base.BITS and Base.BITS[old_base] % Base.BITS[new_base]:
+      # Regrouping needs the total length to line up its groups, so the file
+      # is counted first instead of being held in memory
+      total_digits = sum(len("".join(chunk.split())) for chunk in Base.read_file(source, chunk_size))
+    stats = {}
+    with open(destination, "w") as output:
+      for piece in Base.convert_stream(Base.read_file(source, chunk_size), old_base, new_base,
+          total_digits, progress, stats):
+        output.write(piece)
+    return stats
+
+  @staticmethod
+  def read_file(path, chunk_size):
+    """Yields the text of a file in pieces of chunk_size characters"""
+    with open(path) as file:
+      while chunk := file.read(chunk_size):
+        yield chunk
+
+  @staticmethod
+  def track(chunks, stats):
+    """Yields chunks without whitespace while counting their digits in stats"""
+    for chunk in chunks:
+      chunk = "".join(chunk.split())
+      stats["digits_read"] += len(chunk)
+      yield chunk
+
+  @staticmethod
+  def read_chunks(chunks, old_base):
+    """
+    Returns the base-10 value of a number whose digits come in pieces.
+
+    The digits are cut into blocks of CHUNK_DIGITS, and each block's value is
+    found with Base.join(). Like the digits of a binary counter, two values
+    covering the same number of digits are combined as soon as they're both
+    there (the left one times the power of the base that fits the right
+    one, plus the right one). So every multiplication is between numbers of
+    the same size, like in Base.to_base_10(), and only a few values are held
+    at a time.
+    """
+    level = (Base.CHUNK_DIGITS // Base.LEAF_DIGITS).bit_length() - 1
+    # (value, level) pairs, where each value covers LEAF_DIGITS * 2^level digits
+    stack = []
+    buffer = ""
+    for chunk in chunks:
+      if chunk and not Base.is_valid(chunk.lower(), old_base):
+        raise ValueError(f"'{chunk}' has a digit that isn't allowed in base {old_base}")
+      buffer += chunk
+      end = len(buffer) - len(buffer) % Base.CHUNK_DIGITS
+      for start in range(0, end, Base.CHUNK_DIGITS):
+        stack.append((Base.join(buffer[start:start + Base.CHUNK_DIGITS], old_base, level), level))
+        while len(stack) > 1 and stack[-1][1] == stack[-2][1]:
+          low, size = stack.pop()
+          high, _ = stack.pop()
+          stack.append((high * Base.power(old_base, size) + low, size + 1))
+      buffer = buffer[end:]
+    if not stack and not buffer:
+      raise ValueError("there are no digits to convert")
+    # Combine what's left, from the left (biggest) to the right
+    decimal = 0
+    for value, size in stack:
+      decimal = decimal * Base.power(old_base, size) + value
+    if buffer:
+      decimal = decimal * old_base ** len(buffer) + Base.join(buffer, old_base, level)
+    return decimal
+
+  @staticmethod
+  def write_chunks(decimal, new_base):
+    """Yields the digits of a base-10 number in a new base, about CHUNK_DIGITS at a time"""
+    if decimal == 0:
+      yield "0"
+      return
+    level = 0
+    while Base.power(new_base, level) <= decimal:
+      level += 1
+    pieces = []
+    size = 0
+    for piece in Base.split_digits(decimal, new_base, level, False):
+      pieces.append(piece)
+      size += len(piece)
+      if size >= Base.CHUNK_DIGITS:
+        yield "".join(pieces)
+        pieces, size = [], 0
+    if pieces:
+      yield "".join(pieces)
+
+  @staticmethod
+  @functools.lru_cache(maxsize=None)
+  def digit_table(old_base, new_base):
+    """
+    Returns a str.translate() table that turns each digit of a power-of-two
+    base into its digits in a smaller power-of-two base (ex. hex 'a' to
+    binary '1010')
+    """
+    width = Base.BITS[old_base] // Base.BITS[new_base]
+    table = {}
+    for value in range(old_base):
+      digits = Base.to_string(value, new_base).rjust(width, "0")
+      table[ord(Base.DIGITS[value])] = table[ord(Base.DIGITS[value].upper())] = digits
+    return table
+
+  @staticmethod
+  @functools.lru_cache(maxsize=None)
+  def group_table(new_base):
+    """
+    Returns a dictionary from strings of bits to the digits they make in a
+    power-of-two base. Each key holds as many digits as fit in 12 bits (ex. 3
+    hex digits), so one lookup makes several digits at once.
+    """
+    count = 12 // Base.BITS[new_base]
+    width = count * Base.BITS[new_base]
+    return {format(value, "b").rjust(width, "0"): Base.to_string(value, new_base).rjust(count, "0")
+      for value in range(2**width)}
+
+  @staticmethod
+  def digits_of(num):
+    """Returns the digits of a number (an int or a string) as a lowercase string"""
+    if isinstance(num, str):
+      return num.strip().lower()
+    # str() can't be used, since Python refuses to turn ints with more than
+    # 4300 digits into strings
+    return Base.to_string(num, 10)
+
+  @staticmethod
+  def is_valid(digits, base):
+    """Checks if every digit in a digit string is less than the base"""
+    return len(digits) > 0 and set(digits) <= set(Base.DIGITS[:base])
+
+  @staticmethod
+  def to_number(digits):
+    """Returns a digit string as an int if it only uses digits 0-9, and as is otherwise"""
+    return Base.to_base_10(digits, 10) if digits.isdecimal() else digits
@@ -0,0 +1,164 @@
+import argparse
+import itertools
+import json
+import sys
+
+class Cli:
+  """
+  Runs solver requests from JSON Lines (one request per line) and writes
+  one JSON response per line. Each request names its operation ('op') and
+  its arguments ('args'), and can have an 'id' that's copied to its response.
+
+  Ex. {"id": 1, "op": "triangle.solve", "args": {"a": 3, "b": 4, "c": 5}}
+      {"id": 2, "op": "base.convert", "args": {"number": "ff", "old_base": 16, "new_base": 2}}
+
+  Responses have the request's 'id' and either its 'result' or an 'error'
+  message, so one bad request doesn't stop the rest.
+
+  Operations:
+    - 'matrix.determinant': {"matrix"}
+    - 'matrix.inverse': {"matrix"}
+    - 'matrix.solve': {"matrix", "vector"} (x in matrix * x = vector)
+    - 'triangle.solve': some of {"a", "b", "c", "A", "B", "C"}
+    - 'base.convert': {"number", "old_base", "new_base"}
+    - 'probability.binomial': {"n", "r", "success_chance", "r_meaning"}
+
+  *Each operation only imports the solver it uses, so a job of triangles
+  never loads Matrix or Base
+  """
+  # Names of the methods that run each operation
+  OPERATIONS = {
+    "matrix.determinant": "matrix_determinant",
+    "matrix.inverse": "matrix_inverse",
+    "matrix.solve": "matrix_solve",
+    "triangle.solve": "triangle_solve",
+    "base.convert": "base_convert",
+    "probability.binomial": "probability_binomial",
+  }
+
+  @staticmethod
+  def matrix_determinant(matrix):
+    from src.matrix import Matrix
+    return Matrix(matrix).determinant()
+
+  @staticmethod
+  def matrix_inverse(matrix):
+    from src.matrix import Matrix
+    return Matrix(matrix).inverse().data
+
+  @staticmethod
+  def matrix_solve(matrix, vector):
+    # AX = B => X = A'B (see Matrix)
+    from src.matrix import Matrix
+    return [row[0] for row in (Matrix(matrix).inverse() * Matrix(vector)).data]
+
+  @staticmethod
+  def triangle_solve(a=None, b=None, c=None, A=None, B=None, C=None):
+    from src.triangle import Triangle
+    *values, validity = Triangle.solve_tuple(a, b, c, A, B, C)
+    solution = dict(zip(("a", "b", "c", "A", "B", "C", "perimeter", "area", "height"), values))
+    solution["valid"] = validity == Triangle.VALID
+    return solution
+
+  @staticmethod
+  def base_convert(number, old_base, new_base):
+    from src.base import Base
+    return Base.convert(number, old_base, new_base)
+
+  @staticmethod
+  def probability_binomial(n, r, success_chance, r_meaning="exact"):
+    from src.probability import Probability
+    return Probability.binomial(n, r, success_chance, r_meaning)
+
+  @staticmethod
+  def parse(line):
+    """Returns the (id, op, args) of a request line, or raises ValueError if it isn't a valid request"""
+    request = json.loads(line)
+    if not isinstance(request, dict):
+      raise ValueError("request isn't a JSON object")
+    op = request.get("op")
+    args = request.get("args") or {}
+    if op not in Cli.OPERATIONS:
+      raise ValueError(f"unknown op '{op}'")
+    if not isinstance(args, dict):
+      raise ValueError("args isn't a JSON object")
+    return (request.get("id"), op, args)
+
+  @staticmethod
+  def solve(op, args):
+    """Runs an operation with its arguments and returns the result"""
+    return getattr(Cli, Cli.OPERATIONS[op])(**args)
+
+  @staticmethod
+  def id_of(line):
+    """Returns the id of a request line, or None if it can't be read"""
+    try:
+      request = json.loads(line)
+      return request.get("id") if isinstance(request, dict) else None
+    except ValueError:
+      return None
+
+  @staticmethod
+  def handle(line):
+    """
+    Runs the request on one line and returns its response as a line of JSON
+    (None for blank lines).
+
+    *The response is written out here too, so a result that JSON can't hold
+    (ex. an int with more than 4300 digits) only turns its own response into
+    an error
+    """
+    if not line.strip():
+      return None
+    try:
+      request_id, op, args = Cli.parse(line)
+      return json.dumps({"id": request_id, "result": Cli.solve(op, args)}) + "\n"
+    except Exception as error:
+      return json.dumps({"id": Cli.id_of(line), "error": f"{type(error).__name__}: {error}"}) + "\n"
+
+  @staticmethod
+  def handle_batch(lines):
+    """Runs the requests on several lines (in a worker) and returns their responses as text"""
+    return "".join(response for response in map(Cli.handle, lines) if response is not None)
+
+  @staticmethod
+  def run(lines, output, workers=1, ordered=True, batch_size=64):
+    """
+    Writes the response to every request line to output (a file or a
+    stream). With more than 1 worker, lines are sent to a WorkerPool in
+    batches of batch_size, since sending each request to a worker by itself
+    costs more than most requests take to solve.
+
+    *When ordered is False, responses are written as soon as their batch is
+    done instead of in the same order as the requests
+    """
+    if workers <= 1:
+      for line in lines:
+        output.write(Cli.handle_batch([line]))
+        output.flush()
+      return
+    from src.pool import WorkerPool
+    lines = iter(lines)
+    batches = iter(lambda: list(itertools.islice(lines, batch_size)), [])
+    with WorkerPool(workers) as pool:
+      for _, text, error in pool.map(Cli.handle_batch, batches, ordered=ordered):
+        # handle_batch() catches the requests' errors, so this is only for
+        # workers that stop unexpectedly
+        if error is not None:
+          text = json.dumps({"id": None, "error": f"{type(error).__name__}: {error}"}) + "\n"
+        output.write(text)
+        output.flush()
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(prog="python -m src",
+    description="Runs MathKit solver requests from JSON Lines and writes a JSON response per line.")
+  parser.add_argument("input", nargs="?", default="-", help="file of requests (stdin by default)")
+  parser.add_argument("--workers", type=int, default=1, help="number of worker processes")
+  parser.add_argument("--unordered", action="store_true", help="write responses as soon as they're done")
+  parser.add_argument("--batch-size", type=int, default=64, help="requests sent to a worker at a time")
+  args = parser.parse_args(argv)
+  if args.input == "-":
+    Cli.run(sys.stdin, sys.stdout, args.workers, not args.unordered, args.batch_size)
+  else:
+    with open(args.input) as lines:
+      Cli.run(lines, sys.stdout, args.workers, not args.unordered, args.batch_size)
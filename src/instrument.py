@@ -0,0 +1,273 @@
+import atexit
+import importlib
+import marshal
+import os
+import sys
+import time
+
+class Operations:
+  """
+  Estimates how many element operations (ex. multiplications, additions,
+  or copied elements) a call does from the size of its arguments. Each
+  estimate is called as estimate(args, kwargs), where args[0] is 'self' for
+  normal methods.
+  """
+  @staticmethod
+  def order(matrix):
+    """Returns the number of (rows, columns) of a Matrix or 2D list"""
+    data = getattr(matrix, "data", matrix)
+    return (len(data), len(data[0]) if data else 0)
+
+  @staticmethod
+  def size(value):
+    """Returns the number of elements (or the bits of an integer) in a value"""
+    if isinstance(value, int):
+      return value.bit_length()
+    return len(value) if hasattr(value, "__len__") else 1
+
+  @staticmethod
+  def multiply(args, kwargs):
+    # Every output element is a sum of 'inner' products (2 operations each)
+    (rows, inner), other = Operations.order(args[0]), args[1]
+    if isinstance(other, (int, float)):
+      return rows * inner
+    return 2 * rows * Operations.order(other)[1] * inner if hasattr(other, "data") else 0
+
+  @staticmethod
+  def determinant(args, kwargs):
+    # One product and one sum for each element of the first row (each
+    # recursive call is counted by itself)
+    submatrix = args[1] if len(args) > 1 else kwargs.get("submatrix")
+    return 2 * Operations.order(args[0] if submatrix is None else submatrix)[1]
+
+  @staticmethod
+  def cofactor(args, kwargs):
+    # Elements copied into the minor
+    submatrix = args[3] if len(args) > 3 else kwargs.get("submatrix")
+    rows, cols = Operations.order(args[0] if submatrix is None else submatrix)
+    return max(rows - 1, 0) * max(cols - 1, 0)
+
+  @staticmethod
+  def elimination(args, kwargs):
+    # Each leading entry clears the rows below (or above) it: about rows^2 * cols
+    rows, cols = Operations.order(args[0])
+    return rows * rows * cols
+
+  @staticmethod
+  def elements(args, kwargs):
+    rows, cols = Operations.order(args[0])
+    return rows * cols
+
+  @staticmethod
+  def first_size(args, kwargs):
+    return Operations.size(args[0]) if args else 0
+
+  @staticmethod
+  def binomial_sum(args, kwargs):
+    n, low, high = args[:3]
+    return max(high - low + 1, 0)
+
+  @staticmethod
+  def table(args, kwargs):
+    return args[0].n + 1
+
+  @staticmethod
+  def batch(args, kwargs):
+    return len(args[0])
+
+class Instrument:
+  """
+  Counts and times calls to the solvers' hot methods, to find out where a
+  slow job spends its time (ex. in Matrix.cofactor recursion, deepcopy, row
+  operations, or graphing). For each method, this records:
+    - calls, and the deepest recursion (how many calls of the method were
+      running at once)
+    - total time (including the methods it calls) and own time (not
+      including other instrumented methods), like cProfile
+    - estimated element operations (ex. 2 * rows * cols * inner for matrix
+      multiplication), worked out from the size of the arguments
+
+  Ex. with Instrument() as instrument:
+        Matrix([[1, 2, 3], [4, 5, 6], [7, 8, 10]]).inverse()
+      print(instrument.report())
+      instrument.dump("matrix.prof")  <- open with pstats or snakeviz
+
+  The methods are only wrapped while instrumenting, so there's no overhead
+  at all otherwise. Setting the MATHKIT_INSTRUMENT environment variable
+  instruments a whole run: the report is printed to stderr when Python
+  exits, or if the variable is a file path (ex. 'job.prof'), the stats are
+  dumped there instead.
+
+  *Only calls in this process (and thread) are counted, so solvers run in
+  worker processes (ex. by WorkerPool) aren't included
+  """
+  ENVIRONMENT = "MATHKIT_INSTRUMENT"
+  # (module, class (None for module functions), name, operation estimate (see Operations))
+  TARGETS = [
+    ("src.matrix", "Matrix", "determinant", Operations.determinant),
+    ("src.matrix", "Matrix", "cofactor", Operations.cofactor),
+    ("src.matrix", "Matrix", "inverse", Operations.elements),
+    ("src.matrix", "Matrix", "to_row_echelon", Operations.elimination),
+    ("src.matrix", "Matrix", "to_reduced_row_echelon", Operations.elimination),
+    ("src.matrix", "Matrix", "__mul__", Operations.multiply),
+    ("src.matrix", "Matrix", "__add__", Operations.elements),
+    ("src.matrix", "Matrix", "__sub__", Operations.elements),
+    ("src.matrix", None, "deepcopy", None),
+    ("src.matrix", "Matrix", "graph_vector", None),
+    ("src.matrix", "Matrix", "graph_transform2", None),
+    ("src.matrix", "Matrix", "graph_transform3", None),
+    ("src.probability", "Probability", "binomial", None),
+    ("src.probability", "Probability", "binomial_sum", Operations.binomial_sum),
+    ("src.probability", "Probability", "log_binomial", None),
+    ("src.probability", "Probability", "regularized_beta", None),
+    ("src.probability", "Probability", "simulate_binomial", None),
+    ("src.probability", "Probability", "graph_binomial", None),
+    ("src.probability", "Binomial", "build", Operations.table),
+    ("src.triangle", "Triangle", "solve", None),
+    ("src.triangle", "Triangle", "solve_tuple", None),
+    ("src.triangle", "Triangle", "solve_all", None),
+    ("src.triangle", "Triangle", "validity", None),
+    ("src.triangle", "Triangle", "graph", None),
+    ("src.triangle", "TriangleBatch", "solve", Operations.batch),
+    ("src.base", "Base", "convert", Operations.first_size),
+    ("src.base", "Base", "convert_many", Operations.first_size),
+    ("src.base", "Base", "to_base_10", Operations.first_size),
+    ("src.base", "Base", "to_string", Operations.first_size),
+    ("src.base", "Base", "join", Operations.first_size),
+    ("src.base", "Base", "split", Operations.first_size),
+    ("src.base", "Base", "inverse", Operations.first_size),
+    ("src.plane", "Plane", "new_graph", None),
+    ("src.plane", "Plane", "finish", None),
+  ]
+
+  def __init__(self):
+    # Original attributes, restored by disable()
+    self.originals = []
+    # Stats of each method, by its name (ex. 'Matrix.determinant')
+    self.stats = {}
+    # Call stack of [name, start time, time in instrumented calls]
+    self.stack = []
+    # Number of calls of each method that are running
+    self.running = {}
+
+  def __enter__(self):
+    self.enable()
+    return self
+
+  def __exit__(self, *exception):
+    self.disable()
+
+  def enable(self):
+    """Wraps every target method (importing its module if needed)"""
+    if self.originals:
+      return
+    for module_name, class_name, name, counter in Instrument.TARGETS:
+      module = importlib.import_module(module_name)
+      owner = module if class_name is None else getattr(module, class_name)
+      # Read from __dict__ so staticmethods are kept as they are
+      original = owner.__dict__[name] if class_name is not None else getattr(module, name)
+      function = original.__func__ if isinstance(original, staticmethod) else original
+      wrapper = self.wrap(function, name if class_name is None else f"{class_name}.{name}", counter)
+      setattr(owner, name, staticmethod(wrapper) if isinstance(original, staticmethod) else wrapper)
+      self.originals.append((owner, name, original))
+
+  def disable(self):
+    """Puts back the original methods"""
+    for owner, name, original in reversed(self.originals):
+      setattr(owner, name, original)
+    self.originals = []
+
+  def reset(self):
+    """Forgets every stat collected so far"""
+    self.stats = {}
+
+  def wrap(self, function, name, counter):
+    """Returns a version of function that records its calls in this instrument's stats"""
+    code = getattr(function, "__wrapped__", function).__code__
+    location = (code.co_filename, code.co_firstlineno, name)
+
+    def wrapper(*args, **kwargs):
+      stats = self.stats.get(name)
+      if stats is None:
+        stats = self.stats[name] = {"location": location, "calls": 0, "primitive_calls": 0, "total": 0.0,
+          "own": 0.0, "max_depth": 0, "ops": 0, "callers": {}}
+      depth = self.running.get(name, 0) + 1
+      self.running[name] = depth
+      stats["max_depth"] = max(stats["max_depth"], depth)
+      if counter is not None:
+        stats["ops"] += counter(args, kwargs)
+      caller = self.stack[-1][0] if self.stack else None
+      frame = [name, time.perf_counter(), 0.0]
+      self.stack.append(frame)
+      try:
+        return function(*args, **kwargs)
+      finally:
+        elapsed = time.perf_counter() - frame[1]
+        self.stack.pop()
+        self.running[name] = depth - 1
+        own = elapsed - frame[2]
+        if self.stack:
+          self.stack[-1][2] += elapsed
+        # Like cProfile, only the outermost call of a recursive method counts
+        # towards its total time, so time isn't counted twice
+        outermost = depth == 1
+        stats["calls"] += 1
+        stats["primitive_calls"] += outermost
+        stats["own"] += own
+        stats["total"] += elapsed if outermost else 0
+        # Same order as cProfile's caller entries: (calls, primitive calls, own, total)
+        edge = stats["callers"].setdefault(caller, [0, 0, 0.0, 0.0])
+        edge[0] += 1
+        edge[1] += outermost
+        edge[2] += own
+        edge[3] += elapsed if outermost else 0
+
+    wrapper.__wrapped__ = function
+    wrapper.__name__ = function.__name__
+    wrapper.__doc__ = function.__doc__
+    return wrapper
+
+  def report(self, limit=None):
+    """Returns a table of the stats, sorted by own time"""
+    lines = [f"{'method':<36} {'calls':>10} {'total ms':>11} {'own ms':>11} {'us/call':>9} {'depth':>6} {'ops':>14}"]
+    ranked = sorted(self.stats.items(), key=lambda item: item[1]["own"], reverse=True)
+    for name, stats in ranked[:limit]:
+      lines.append(f"{name:<36} {stats['calls']:>10} {stats['total'] * 1e3:>11.3f} {stats['own'] * 1e3:>11.3f} " +
+        f"{stats['own'] / stats['calls'] * 1e6:>9.2f} {stats['max_depth']:>6} {stats['ops']:>14}")
+    return "\n".join(lines)
+
+  def dump(self, path):
+    """
+    Saves the stats in the same format as cProfile's dump_stats(), so they
+    can be read with pstats.Stats(path) (or tools like snakeviz)
+    """
+    entries = {}
+    for stats in self.stats.values():
+      callers = {self.stats[caller]["location"]: tuple(edge)
+        for caller, edge in stats["callers"].items() if caller is not None}
+      entries[stats["location"]] = (stats["primitive_calls"], stats["calls"], stats["own"], stats["total"], callers)
+    with open(path, "wb") as file:
+      marshal.dump(entries, file)
+
+  @staticmethod
+  def from_environment():
+    """
+    Instruments the rest of the run if MATHKIT_INSTRUMENT is set, and
+    reports (or dumps) the stats when Python exits. Returns the instrument,
+    or None if the variable isn't set.
+    """
+    setting = os.environ.get(Instrument.ENVIRONMENT)
+    if not setting:
+      return None
+    instrument = Instrument()
+    instrument.enable()
+
+    def finish():
+      instrument.disable()
+      if setting.lower() in ("1", "true", "yes", "on"):
+        print(instrument.report(), file=sys.stderr)
+      else:
+        instrument.dump(setting)
+
+    atexit.register(finish)
+    return instrument
@@ -0,0 +1,28 @@
+import importlib
+
+class LazyModule:
+  """
+  A stand-in for a module that only imports it the first time one of its
+  attributes is used. Matplotlib takes a long time to import and is only
+  needed for graphing, so this keeps scripts that just use the solvers (ex.
+  Matrix.determinant) from ever loading it.
+
+  Ex. plt = LazyModule("matplotlib.pyplot")
+      plt.show()  <- matplotlib.pyplot is imported here
+  """
+  def __init__(self, name):
+    self._name = name
+
+  def __getattr__(self, attribute):
+    # Only called for attributes that aren't set on the stand-in itself
+    # (ex. ones replaced during tests with unittest.mock.patch)
+    return getattr(importlib.import_module(self._name), attribute)
+
+# Shared by every module, so patching an attribute (ex. plt.show) in one
+# module patches it everywhere, just like with a normal import
+plt = LazyModule("matplotlib.pyplot")
+ticker = LazyModule("matplotlib.ticker")
+patches = LazyModule("matplotlib.patches")
+animation = LazyModule("matplotlib.animation")
+figure = LazyModule("matplotlib.figure")
+backend_agg = LazyModule("matplotlib.backends.backend_agg")
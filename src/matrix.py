@@ -1,7 +1,7 @@
 from copy import deepcopy
 import re
 from src.plane import Plane
-import matplotlib.pyplot as plt
+from src.lazy import plt, patches
 
 class Matrix:
   """
@@ -382,84 +382,84 @@ class Matrix:
     if isinstance(other, int) or isinstance(other, float):
       return self * other
 
-  def graph_vector(self, col=0, scale=1):
+  def graph_vector(self, col=0, scale=1, output=None):
     """
     Graphs the basis vectors of a 2x1 or 3x1 matrix on a plane. For matrices
     with more than 1 column, you can specify the matrix column to graph.
+
+    *Pass in an output file path (ex. 'vector.png') to save the graph
+    instead of showing it
     """
     if len(self.data) == 2:
-      Plane.init_cartesian2(plt, scale)
-      plt.title("Matrix Vector")
-      plt.arrow(0, 0, self.data[0][col], self.data[1][col], lw=3, head_width=(scale/50), color="r")
-      plt.text(self.data[0][col], self.data[1][col], f"({self.data[0][col]}, {self.data[1][col]})")
-      plt.show()
+      ax = Plane.new_graph("cartesian2", output, scale=scale)
+      ax.set_title("Matrix Vector")
+      ax.arrow(0, 0, self.data[0][col], self.data[1][col], lw=3, head_width=(scale/50), color="r")
+      ax.text(self.data[0][col], self.data[1][col], f"({self.data[0][col]}, {self.data[1][col]})")
+      Plane.finish(ax, output)
     if len(self.data) == 3:
-      Plane.init_cartesian3(plt, scale)
-      plt.title("Matrix Vector")
-      ax = plt.gca()
+      ax = Plane.new_graph("cartesian3", output, scale=scale)
+      ax.set_title("Matrix Vector")
       ax.quiver(0, 0, 0, self.data[0][col], self.data[1][col], self.data[2][col], color="r")
       ax.text(self.data[0][col], self.data[1][col],  self.data[2][col], f"({self.data[0][col]}, {self.data[1][col]}, {self.data[2][col]})")
-      plt.show()
+      Plane.finish(ax, output)
 
-  def graph_transform2(self, vector=(1, 1), scale=1):
+  def graph_transform2(self, vector=(1, 1), scale=1, output=None):
     """
     Graphs the basis vectors of a 2x2 matrix, as well as its transformation
     on a given vector.
     """
-    Plane.init_cartesian2(plt, scale)
-    ax = plt.gca()
-    plt.title("Matrix Transformation")
+    ax = Plane.new_graph("cartesian2", output, scale=scale)
+    ax.set_title("Matrix Transformation")
     # Determinant Area
     # Create parallelogram using: origin, basis vectors, and a point parallel to both basis vectors
     points = [(0, 0), (self.data[0][0], self.data[1][0]), (self.data[0][0] + self.data[0][1],
       self.data[1][0] + self.data[1][1]), (self.data[0][1], self.data[1][1]), (0, 0)]
-    ax.add_patch(plt.Polygon(points))
+    ax.add_patch(patches.Polygon(points))
     # Find center of parallelogram by getting average of x (and y) min and max
     sorted_x = sorted([0, self.data[0][0], self.data[0][1], self.data[0][0] + self.data[0][1]])
     sorted_y = sorted([0, self.data[1][0], self.data[1][1], self.data[1][0] + self.data[1][1]])
     ax.text((sorted_x[3] - sorted_x[0]) / 2, (sorted_y[3] - sorted_y[0]) / 2, f"{self.determinant()}")
     # Basis vectors
-    plt.arrow(0, 0, self.data[0][0], self.data[1][0], head_width=(scale/50), color="g", label="Basis i")
+    ax.arrow(0, 0, self.data[0][0], self.data[1][0], head_width=(scale/50), color="g", label="Basis i")
     ax.text(self.data[0][0], self.data[1][0], f"({self.data[0][0]}, {self.data[1][0]})")
-    plt.arrow(0, 0, self.data[0][1], self.data[1][1], head_width=(scale/50), color="b", label="Basis j")
+    ax.arrow(0, 0, self.data[0][1], self.data[1][1], head_width=(scale/50), color="b", label="Basis j")
     ax.text(self.data[0][1], self.data[1][1], f"({self.data[0][1]}, {self.data[1][1]})")
     # Pre-tranformation
     transformed = self * Matrix([vector[0], vector[1]])
-    plt.arrow(0, 0, vector[0], vector[1], head_width=(scale/50), color="y", label="Pre-transform")
+    ax.arrow(0, 0, vector[0], vector[1], head_width=(scale/50), color="y", label="Pre-transform")
     ax.text(vector[0], vector[1], f"({vector[0]}, {vector[1]})")
     # Post-tranformation
-    plt.arrow(0, 0, transformed.data[0][0], transformed.data[1][0], head_width=(scale/50),
+    ax.arrow(0, 0, transformed.data[0][0], transformed.data[1][0], head_width=(scale/50),
       color="tab:orange", label="Post-transform")
     ax.text(transformed.data[0][0], transformed.data[1][0], f"({transformed.data[0][0]}, {transformed.data[1][0]})")
     
     # Display legend and graph
     ax.legend()
-    plt.show()
+    Plane.finish(ax, output)
 
-  def graph_transform3(self, vector=(1, 1, 1), scale=1):
+  def graph_transform3(self, vector=(1, 1, 1), scale=1, output=None):
     """
     Graphs the basis vectors of a 3x3 matrix, as well as its transformation
     on a given vector.
     """
-    Plane.init_cartesian3(plt, scale)
-    ax = plt.gca()
-    plt.title("Matrix Transformation")
+    ax = Plane.new_graph("cartesian3", output, scale=scale)
+    ax.set_title("Matrix Transformation")
     # Basis vectors and labels
-    plt.quiver(0, 0, 0, self.data[0][0], self.data[1][0], self.data[2][0], color="r", label="Basis i")
+    ax.quiver(0, 0, 0, self.data[0][0], self.data[1][0], self.data[2][0], color="r", label="Basis i")
     ax.text(self.data[0][0], self.data[1][0], self.data[2][0], f"({self.data[0][0]}, {self.data[1][0]}, {self.data[2][0]})")
-    plt.quiver(0, 0, 0, self.data[0][1], self.data[1][1], self.data[2][1], color="g", label="Basis j")
+    ax.quiver(0, 0, 0, self.data[0][1], self.data[1][1], self.data[2][1], color="g", label="Basis j")
     ax.text(self.data[0][1], self.data[1][1], self.data[2][1], f"({self.data[0][1]}, {self.data[1][1]}, {self.data[2][1]})")
-    plt.quiver(0, 0, 0, self.data[0][2], self.data[1][2], self.data[2][2], color="b", label="Basis k")
+    ax.quiver(0, 0, 0, self.data[0][2], self.data[1][2], self.data[2][2], color="b", label="Basis k")
     ax.text(self.data[0][2], self.data[1][2], self.data[2][2], f"({self.data[0][2]}, {self.data[1][2]}, {self.data[2][2]})")
     # Pre-transformation
     transformed = self * Matrix([vector[0], vector[1], vector[2]])
-    plt.quiver(0, 0, 0, vector[0], vector[1], vector[2], color="y", label="Pre-transform")
+    ax.quiver(0, 0, 0, vector[0], vector[1], vector[2], color="y", label="Pre-transform")
     ax.text(vector[0], vector[1], vector[2], f"({vector[0]}, {vector[1]}, {vector[2]})")
     # Post-transformation
-    plt.quiver(0, 0, 0, transformed.data[0][0], transformed.data[1][0],
+    ax.quiver(0, 0, 0, transformed.data[0][0], transformed.data[1][0],
       transformed.data[2][0], color="tab:orange", label="Post-transform")
     ax.text(transformed.data[0][0], transformed.data[1][0], transformed.data[2][0],
       f"({transformed.data[0][0]}, {transformed.data[1][0]}, {transformed.data[2][0]})")
     # Display legend and graph
     ax.legend()
-    plt.show()
\ No newline at end of file
+    Plane.finish(ax, output)
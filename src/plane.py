@@ -1,7 +1,8 @@
 import math
+from collections import OrderedDict
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.ticker as ticker
+from src.lazy import plt, ticker, figure, backend_agg
+from src.sampler import Sampler
 
 class Plane:
   """
@@ -29,20 +30,53 @@ class Plane:
     Converts rectangular co-ordinate (a, b) to polar co-ordinate (r, theta).
     Formulas:
     - r = sqrt(x**2+y**2)
-    - theta = atan(y/x)
-    """
-    r = math.sqrt(a**2 + b**2)
-    theta = math.atan(b / a)
-    # Correct angle for quadrants 3, 2, and 4, respectively
-    if a < 0 and b < 0:
-      theta = math.pi + abs(theta)
-    elif a < 0:
-      theta = math.pi - abs(theta)
-    elif b < 0:
-      theta = 2 * math.pi - abs(theta)
+    - theta = atan(y/x), corrected for the quadrant (x, y) is in
+    """
+    r = math.hypot(a, b)
+    # atan2 looks at the signs of both a and b, so it already knows which
+    # quadrant the point is in (and doesn't divide by 0 when a is 0). It
+    # returns angles from -pi to pi, so the modulo wraps quadrants 3 and 4
+    # around to the 0 to 2pi range
+    theta = math.atan2(b, a) % (2 * math.pi)
     theta = math.degrees(theta) if isDegrees else theta
     return (r, theta)
 
+  @staticmethod
+  def to_rectangular_many(r, theta, isDegrees=True):
+    """
+    Converts arrays of polar co-ordinates to arrays of rectangular co-ordinates
+    (a, b). This uses the same formulas as to_rectangular(), but numpy applies
+    them to every point at once instead of one Python call per point.
+
+    *r and theta can be lists, numpy arrays, or numbers (numbers are broadcast
+    against the arrays)
+    """
+    r = np.asarray(r, dtype=float)
+    theta = np.asarray(theta, dtype=float)
+    radians = np.radians(theta) if isDegrees else theta
+    return (r * np.cos(radians), r * np.sin(radians))
+
+  @staticmethod
+  def to_polar_many(a, b=None, isDegrees=True):
+    """
+    Converts arrays of rectangular co-ordinates to arrays of polar co-ordinates
+    (r, theta). This is the vectorized version of to_polar(), so every
+    quadrant and axis is handled by arctan2 without any branching.
+
+    *a and b can be lists, numpy arrays, or numbers (numbers are broadcast
+    against the arrays). A complex array can be passed in as 'a' by itself.
+    """
+    # Complex numbers already hold both components (a + bi)
+    if b is None:
+      a = np.asarray(a)
+      a, b = a.real, a.imag
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    r = np.hypot(a, b)
+    theta = np.mod(np.arctan2(b, a), 2 * np.pi)
+    theta = np.degrees(theta) if isDegrees else theta
+    return (r, theta)
+
   @staticmethod
   def to_quadrant(ref_angle, quadrant, isDegrees=True):
     """Converts a reference angle to an angle in a specified quadrant"""
@@ -60,50 +94,197 @@ class Plane:
         return full_angle - ref_angle
 
   @staticmethod
-  def graph_rectangular(a=None, b=None, scale=1):
-    """Plots rectangular co-ordinate on a rectangular plane"""
-    Plane.init_cartesian2(plt, scale, x_axis_label='Re', y_axis_label='Im')
-    plt.title("Rectangular Graph")
+  def graph_rectangular(a=None, b=None, scale=1, output=None):
+    """
+    Plots rectangular co-ordinate on a rectangular plane
+
+    *Every graph_* method accepts an output file path (ex. 'graph.png'). When
+    it's given, the graph is saved there instead of shown (see Plane.new_graph)
+    """
+    ax = Plane.new_graph("cartesian2", output, scale=scale, x_axis_label='Re', y_axis_label='Im')
+    ax.set_title("Rectangular Graph")
     # 'a' can double-down as a coordinate, in the format (a, b)
     if isinstance(a, tuple):
       b = a[1]
       a = a[0] # this line has to be last, or else 'b' will be assigned to a[0][1]
-    plt.scatter(a, b)
-    plt.show()
+    ax.scatter(a, b)
+    Plane.finish(ax, output)
 
   @staticmethod
-  def graph_polar(r=None, theta=None, isDegrees=True):
+  def graph_polar(r=None, theta=None, isDegrees=True, output=None):
     """Plots polar co-ordinate on a polar plane"""
-    Plane.init_polar(plt, isDegrees=isDegrees)
+    ax = Plane.new_graph("polar", output, isDegrees=isDegrees)
     # 'r' can double-down as a coordinate, in the format (r, theta)
     if isinstance(r, tuple):
       theta = r[1]
       r = r[0]
     theta = math.radians(theta) if isDegrees else theta
-    plt.scatter(theta, r)
-    plt.title("Polar Graph")
-    plt.show()
+    ax.scatter(theta, r)
+    ax.set_title("Polar Graph")
+    Plane.finish(ax, output)
 
   @staticmethod
-  def graph_function(function, scale=1):
+  def graph_function(function, scale=1, max_points=200, output=None):
     """
-    Graphs a specified function on a 2D cartesian plane
+    Graphs a specified function on a 2D cartesian plane. The function is
+    sampled adaptively (see Sampler), so sharp turns get more points than
+    flat parts, and graphing the same function again reuses earlier values.
 
     *Function argument must be a lambda (ex. `lambda x: x**2`)
     """
-    Plane.init_cartesian2(plt, scale)
-    x = np.linspace(-scale, scale, 50)
-    y = function(x)
-    plt.plot(x, y)
-    plt.show()
+    ax = Plane.new_graph("cartesian2", output, scale=scale)
+    x, y = Sampler.of(function).sample(-scale, scale, max_points=max_points, y_range=2 * scale)
+    ax.plot(x, y)
+    Plane.finish(ax, output)
+
+  @staticmethod
+  def graph_series(x, y, scale=None, method="minmax", output=None):
+    """
+    Graphs a series of points (ex. measurements) as a line on a 2D cartesian
+    plane. Large series are downsampled first (see Plane.downsample), so
+    this stays fast even with millions of points.
+
+    *x must be sorted from least to greatest
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    # Fit the axes around the series by default
+    if scale is None:
+      scale = float(max(np.nanmax(np.abs(x)), np.nanmax(np.abs(y))))
+    ax = Plane.new_graph("cartesian2", output, scale=scale)
+    x, y = Plane.downsample(ax, x, y, method=method)
+    ax.plot(x, y)
+    Plane.finish(ax, output)
+
+  @staticmethod
+  def downsample(ax, x, y, method="minmax"):
+    """
+    Reduces a series to about as many points as the axes can show, based on
+    how many pixels wide they are. Drawing more points than there are pixel
+    columns only slows matplotlib down without changing the picture.
+
+    *method can be 'minmax' (keeps every peak exactly, see Sampler.min_max)
+    or 'lttb' (fewer points that keep the overall shape, see Sampler.lttb)
+    """
+    pixels = max(int(ax.get_window_extent().width), 1)
+    # Use one bucket per pixel column that the series covers (the series
+    # can be wider or narrower than the visible x range)
+    left, right = ax.get_xlim()
+    span = (x[-1] - x[0]) if len(x) > 1 else 0
+    buckets = max(int(math.ceil(pixels * span / ((right - left) or 1))), 1)
+    if method == "minmax":
+      return Sampler.min_max(x, y, buckets)
+    elif method == "lttb":
+      return Sampler.lttb(x, y, 2 * buckets)
+    else:
+      raise ValueError(f"unknown downsample method '{method}'")
+
+  # Pre-built figures used when saving graphs to files, keyed by plane type
+  # and settings. The oldest ones are dropped after MAX_TEMPLATES.
+  MAX_TEMPLATES = 8
+  _templates = OrderedDict()
+  # Artists each template started with, which aren't cleared between graphs
+  _template_artists = {}
+
+  @staticmethod
+  def new_graph(plane, output=None, **settings):
+    """
+    Returns the axes that a graph should be drawn on.
+
+    Without an output path, this opens a new pyplot figure to be shown
+    later. With one, this returns a pre-built template for the plane
+    instead. Templates are drawn with the non-interactive Agg backend and
+    reused between graphs, so rendering many graphs to files doesn't rebuild
+    the same axes, spines, arrows, and labels every time.
+
+    *plane can be 'cartesian2', 'cartesian3', 'polar', or 'blank'. The
+    settings are passed to Plane.build (ex. scale, isDegrees)
+    """
+    if output is None:
+      return Plane.build(plt.figure(), plane, **settings)
+    key = (plane,) + tuple(sorted(settings.items()))
+    if key in Plane._templates:
+      Plane._templates.move_to_end(key)
+      return Plane._templates[key]
+    # Figures made without pyplot aren't tracked by it, so they're freed as
+    # soon as they're dropped from the templates
+    fig = figure.Figure()
+    backend_agg.FigureCanvasAgg(fig)
+    ax = Plane.build(fig, plane, **settings)
+    Plane._templates[key] = ax
+    Plane._template_artists[ax] = set(ax.get_children())
+    if len(Plane._templates) > Plane.MAX_TEMPLATES:
+      _, oldest = Plane._templates.popitem(last=False)
+      del Plane._template_artists[oldest]
+    return ax
+
+  @staticmethod
+  def finish(ax, output=None):
+    """
+    Shows a graph from Plane.new_graph or, if there's an output path, saves
+    it to that file (the format comes from its extension, ex. '.png' or
+    '.svg') and clears the graph's data from its template.
+    """
+    if output is None:
+      plt.show()
+    else:
+      ax.figure.savefig(output)
+      Plane.clear(ax)
+
+  @staticmethod
+  def clear(ax):
+    """Removes everything drawn on a template since it was built"""
+    baseline = Plane._template_artists.get(ax, set())
+    for artist in ax.get_children():
+      if artist not in baseline:
+        artist.remove()
+    for text in ax.figure.texts[:]:
+      text.remove()
+    ax.set_title("")
+    # Forget the cleared data's limits, so they don't affect autoscaling
+    ax.relim()
+
+  @staticmethod
+  def clear_templates():
+    """Frees every template used to save graphs"""
+    Plane._templates.clear()
+    Plane._template_artists.clear()
+
+  @staticmethod
+  def build(fig, plane, scale=1, x_axis_label='x', y_axis_label='y', isDegrees=True):
+    """Adds axes for the specified plane type to a figure and returns them"""
+    if plane == "cartesian2":
+      ax = fig.add_subplot(1, 1, 1)
+      Plane.format_cartesian2(ax, scale, x_axis_label, y_axis_label)
+    elif plane == "cartesian3":
+      ax = fig.add_subplot(1, 1, 1, projection='3d')
+      Plane.format_cartesian3(ax, scale)
+    elif plane == "polar":
+      ax = fig.add_subplot(1, 1, 1, projection='polar')
+      Plane.format_polar(ax, isDegrees)
+    else:
+      ax = fig.add_subplot(1, 1, 1)
+    return ax
 
   @staticmethod
   def init_cartesian2(plt, scale, x_axis_label='x', y_axis_label='y'):
-    """Creates a formatted 2D cartesian plane."""
-    # Setup
-    fig = plt.figure()
-    ax = fig.add_subplot(1, 1, 1)
-    plt.grid(True)
+    """Creates a formatted 2D cartesian plane and returns its axes."""
+    return Plane.build(plt.figure(), "cartesian2", scale=scale,
+      x_axis_label=x_axis_label, y_axis_label=y_axis_label)
+
+  @staticmethod
+  def init_cartesian3(plt, scale):
+    """Creates a formatted 3D cartesian plane and returns its axes."""
+    return Plane.build(plt.figure(), "cartesian3", scale=scale)
+
+  @staticmethod
+  def init_polar(plt, isDegrees=True):
+    """Creates a formatted polar plane and returns its axes."""
+    return Plane.build(plt.figure(), "polar", isDegrees=isDegrees)
+
+  @staticmethod
+  def format_cartesian2(ax, scale, x_axis_label='x', y_axis_label='y'):
+    """Formats axes into a 2D cartesian plane."""
+    ax.grid(True)
     # Center axes at origin and remove unnecessary ones
     ax.spines.right.set_visible(False)
     ax.spines.top.set_visible(False)
@@ -131,11 +312,8 @@ class Plane:
     ax.set_ylabel(y_axis_label, labelpad=-33, y=0.98, rotation=0)
 
   @staticmethod
-  def init_cartesian3(plt, scale):
-    """Creates a formatted 3D cartesian plane."""
-    # Setup
-    fig = plt.figure()
-    ax = fig.add_subplot(1, 1, 1, projection='3d')
+  def format_cartesian3(ax, scale):
+    """Formats 3D axes into a 3D cartesian plane."""
     # Graph and label xyz axes
     length = scale * 0.75
     ax.quiver(0, 0, 0, length, 0, 0, color='k')
@@ -150,14 +328,12 @@ class Plane:
     ax.set_zlim(-scale, scale)
 
   @staticmethod
-  def init_polar(plt, isDegrees=True):
-    """Creates a formatted polar plane."""
-    # Creates a figure and polar plot from matplotlib's base projections
-    fig, ax = plt.subplots(subplot_kw={'projection': 'polar'})
+  def format_polar(ax, isDegrees=True):
+    """Formats polar axes (from matplotlib's base projections) into a polar plane."""
     if not isDegrees:
       angles = list(ax.get_xticks())
       labels = [str(label / math.pi) + "π" for label in angles]
       ax.set_xticks(ax.get_xticks())
       # Use fixed locators to accurately place fixed-formatted labels (both are lists)
       ax.xaxis.set_major_locator(ticker.FixedLocator(angles))
-      ax.set_xticklabels(labels)
\ No newline at end of file
+      ax.set_xticklabels(labels)
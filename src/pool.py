@@ -0,0 +1,88 @@
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+class WorkerPool:
+  """
+  Runs a function on many items across worker processes. Python threads
+  can't run Python code at the same time (because of the GIL), but separate
+  processes can, so CPU-heavy work (ex. rendering graphs) finishes up to
+  'workers' times faster.
+
+  Only 'max_pending' items are handed to the workers at once. New items are
+  only taken from the input once earlier ones are done, so memory stays
+  bounded even for huge (or endless) inputs.
+
+  Ex. with WorkerPool(workers=4) as pool:
+        for index, result, error in pool.map(math.factorial, range(1000)):
+          ...
+
+  *Functions and items are sent to the workers by pickling them, so functions
+  must be defined at the top level of a module (lambdas won't work)
+  """
+  def __init__(self, workers=None, max_pending=None, initializer=None, initargs=(), tasks_per_worker=None):
+    self.workers = workers or os.cpu_count() or 1
+    self.max_pending = max_pending or 2 * self.workers
+    options = {"initializer": initializer, "initargs": initargs}
+    # Restarting workers after some tasks frees any memory they've built up.
+    # ProcessPoolExecutor can only do this from Python 3.11, so older versions
+    # keep the same workers.
+    if tasks_per_worker is not None and sys.version_info >= (3, 11):
+      options["max_tasks_per_child"] = tasks_per_worker
+    self.executor = ProcessPoolExecutor(self.workers, **options)
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exception):
+    self.close()
+
+  def close(self):
+    """Stops the workers, dropping any items that haven't started yet"""
+    self.executor.shutdown(wait=True, cancel_futures=True)
+
+  def map(self, function, items, ordered=True):
+    """
+    Calls function(item) for each item in the workers and yields
+    (index, result, error) for each one. Exceptions raised by the function
+    are returned as 'error' (with result as None) instead of stopping the
+    whole batch.
+
+    *When ordered is True, results are yielded in the same order as the
+    items. Otherwise, they're yielded as soon as they finish.
+    """
+    pending = {}
+    # Finished results waiting for earlier items (only used when ordered)
+    finished = {}
+    next_index = 0
+    items = enumerate(items)
+    exhausted = False
+    try:
+      while not exhausted or pending or finished:
+        # Keep the workers busy without holding more than max_pending items
+        while not exhausted and len(pending) + len(finished) < self.max_pending:
+          try:
+            index, item = next(items)
+          except StopIteration:
+            exhausted = True
+            break
+          pending[self.executor.submit(function, item)] = index
+        if pending:
+          done, _ = wait(pending, return_when=FIRST_COMPLETED)
+          for future in done:
+            index = pending.pop(future)
+            error = future.exception()
+            result = None if error is not None else future.result()
+            if ordered:
+              finished[index] = (result, error)
+            else:
+              yield (index, result, error)
+        # Yield every result that's next in line
+        while next_index in finished:
+          result, error = finished.pop(next_index)
+          yield (next_index, result, error)
+          next_index += 1
+    finally:
+      # Runs if the caller stops early, so leftover items don't keep running
+      for future in pending:
+        future.cancel()
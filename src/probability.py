@@ -1,11 +1,21 @@
+import functools
 import math
-import random
-import matplotlib.pyplot as plt
+import sys
+import warnings
+from collections import OrderedDict
+from statistics import NormalDist
+import numpy as np
+from src.lazy import plt, animation
+from src.pool import WorkerPool
 
 class Probability:
   """
   This class contains solvers and graphers related to probability.
   """
+  # Below this many chosen elements, logs of permutations and combinations
+  # are found from the exact integers instead of log-gamma
+  EXACT_LOG_LIMIT = 64
+
   @staticmethod
   def permutations(n, r):
     """
@@ -18,7 +28,10 @@ class Probability:
     if r > n:
       return 0
     else:
-      return math.factorial(n) / math.factorial(n - r)
+      # math.perm multiplies n x (n - 1) x ... x (n - r + 1) directly as exact
+      # integers, instead of dividing two huge factorials as floats (which
+      # overflows once n! is over about 10^308, or n > 170)
+      return math.perm(n, r)
 
   @staticmethod
   def combinations(n, r):
@@ -33,7 +46,109 @@ class Probability:
     if r > n:
       return 0
     else:
-      return math.factorial(n) / (math.factorial(r) * math.factorial(n - r))
+      # Exact integer version of the formula above, which cancels the
+      # factorials as it goes instead of computing them in full
+      return math.comb(n, r)
+
+  @staticmethod
+  def log_permutations(n, r):
+    """
+    Finds the natural log of permutations(n, r). Logs of huge numbers are
+    small (ex. ln(1000!) is about 5912), so this works for any n without
+    building giant integers. It uses the log-gamma function, where
+    lgamma(n + 1) = ln(n!).
+    Formula: ln(P(n, r)) = ln(n!) - ln((n-r)!)
+    """
+    if r > n:
+      return -math.inf
+    # lgamma(n + 1) and lgamma(n - r + 1) are huge and nearly equal when n
+    # is big but r is small, so subtracting them loses precision. Those
+    # cases are cheap to find exactly instead.
+    if r < Probability.EXACT_LOG_LIMIT:
+      return math.log(math.perm(n, r))
+    return math.lgamma(n + 1) - math.lgamma(n - r + 1)
+
+  @staticmethod
+  def log_combinations(n, r):
+    """
+    Finds the natural log of combinations(n, r) (see log_permutations()).
+    Formula: ln(C(n, r)) = ln(n!) - ln(r!) - ln((n-r)!)
+    """
+    if r > n:
+      return -math.inf
+    if min(r, n - r) < Probability.EXACT_LOG_LIMIT:
+      return math.log(math.comb(n, r))
+    return math.lgamma(n + 1) - math.lgamma(r + 1) - math.lgamma(n - r + 1)
+
+  @staticmethod
+  def log_binomial(n, r, success_chance):
+    """
+    Finds the natural log of the chance of exactly r successes in n trials
+    (see binomial()). Adding logs instead of multiplying tiny powers keeps
+    results like 0.5^10000 from rounding down to 0 partway through.
+    Formula: ln(nCr * p^r * q^(n - r)) = ln(nCr) + r*ln(p) + (n - r)*ln(q)
+    """
+    if r < 0 or r > n:
+      return -math.inf
+    # 0^0 is 1, so chances of 0 or 1 only rule out the outcomes they make impossible
+    if success_chance == 0:
+      return 0 if r == 0 else -math.inf
+    if success_chance == 1:
+      return 0 if r == n else -math.inf
+    if min(r, n - r) < Probability.EXACT_LOG_LIMIT:
+      return (Probability.log_combinations(n, r) + r * math.log(success_chance) +
+        (n - r) * math.log1p(-success_chance))
+    # For large n, ln(nCr) is the difference of huge log-gamma values, which
+    # loses precision. Loader's saddle point formula only works with small
+    # correction terms instead (it's what R's dbinom uses):
+    # ln(P(r)) = e(n) - e(r) - e(n-r) - d(r, np) - d(n-r, nq) + ln(sqrt(n / (2pi * r * (n-r))))
+    # *e=Stirling's formula error, d=deviance (see the functions used below)
+    failures = n - r
+    return (Probability.stirling_error(n) - Probability.stirling_error(r) -
+      Probability.stirling_error(failures) - Probability.deviance(r, n * success_chance) -
+      Probability.deviance(failures, n * (1 - success_chance)) +
+      0.5 * math.log(n / (2 * math.pi * r * failures)))
+
+  @staticmethod
+  def stirling_error(n):
+    """
+    Finds how far Stirling's formula is from ln(n!), which is a small number
+    (about 1/12n) for large n.
+    Formula: ln(n!) - ln(sqrt(2pi * n) * (n/e)^n)
+
+    *Large n use the first terms of the series 1/12n - 1/360n^3 + 1/1260n^5 - ...
+    """
+    if n <= 15:
+      return math.lgamma(n + 1) - (n + 0.5) * math.log(n) + n - 0.5 * math.log(2 * math.pi)
+    # Fewer terms are needed as n gets bigger
+    terms = [1/12, 1/360, 1/1260, 1/1680, 1/1188]
+    count = 2 if n > 500 else 3 if n > 80 else 4 if n > 35 else 5
+    total = 0
+    for term in reversed(terms[:count]):
+      total = term - total / (n * n)
+    return total / n
+
+  @staticmethod
+  def deviance(x, mean):
+    """
+    Finds x*ln(x/mean) + mean - x, which measures how far x is from the mean
+    of a binomial distribution. When x is close to the mean, the two parts
+    nearly cancel, so a series is used instead.
+
+    *Series: (x - mean)^2/(x + mean) + 2x * (v^3/3 + v^5/5 + ...), where v=(x - mean)/(x + mean)
+    """
+    if abs(x - mean) >= 0.1 * (x + mean):
+      return x * math.log(x / mean) + mean - x
+    v = (x - mean) / (x + mean)
+    total = (x - mean) * v
+    power = 2 * x * v
+    for j in range(1, 1000):
+      power *= v * v
+      updated = total + power / (2 * j + 1)
+      if updated == total:
+        break
+      total = updated
+    return total
   
   @staticmethod
   def binomial(n, r, success_chance, r_meaning="exact"):
@@ -51,59 +166,449 @@ class Probability:
     **r_meaning can be 'exact', 'min', or 'max' (ex. to find the chance of
     rolling a 1 AT MOST 2 times out of 5, call binomial(5, 2, 1/6, 'max'))
     """
-    # Choose the number of successful outcomes to consider, depending on 
+    # Up to a point, n and success chances that are used more than once get
+    # every chance worked out and stored (see Binomial), so later calls are
+    # just lookups. A single call doesn't pay for building the whole table.
+    if n <= Binomial.TABLE_LIMIT and Binomial.is_repeated(n, success_chance):
+      return Binomial.of(n, success_chance).probability(r, r_meaning)
+    if r_meaning == "exact":
+      return math.exp(Probability.log_binomial(n, r, success_chance))
+    # Very large n uses the incomplete beta function, which finds a whole
+    # range of outcomes at once (see regularized_beta())
+    if n > Probability.BETA_LIMIT:
+      if r_meaning == "min":
+        # P(X >= r) = I_p(r, n - r + 1)
+        return 1.0 if r <= 0 else Probability.regularized_beta(success_chance, r, n - r + 1)
+      elif r_meaning == "max":
+        # P(X <= r) = I_q(n - r, r + 1)
+        return 1.0 if r >= n else Probability.regularized_beta(1 - success_chance, n - r, r + 1)
+    # Choose the range of successful outcomes to consider, depending on
     # the value of 'r_meaning'
+    if r_meaning == "min":
+      return Probability.binomial_sum(n, max(r, 0), n, success_chance)
+    elif r_meaning == "max":
+      return Probability.binomial_sum(n, 0, min(r, n), success_chance)
+
+  # Above this many trials, ranges of binomial outcomes are found with the
+  # incomplete beta function instead of by adding up each outcome
+  BETA_LIMIT = 10**7
+
+  @staticmethod
+  def binomial_sum(n, low, high, success_chance):
+    """
+    Adds up the chances of getting anywhere from 'low' to 'high' successes
+    in n trials (see binomial()).
+
+    Instead of finding every chance from scratch, this uses the ratio
+    between neighbouring chances:
+    P(k + 1) / P(k) = (n - k) / (k + 1) * p / q
+
+    Binomial chances rise up to the most likely outcome (the mode) and then
+    fall, so this starts at the outcome in the range closest to the mode and
+    walks outwards. Chances only shrink from there, so the walk stops as soon
+    as they're too small to change the total. That means only a few
+    outcomes around the mode are ever visited, even for huge n.
+
+    *Every chance is kept relative to the starting one (which is found in log
+    space), so none of them can overflow or underflow
+    """
+    if low > high:
+      return 0.0
+    # With a certain outcome (0 or n successes), only that outcome can happen
+    if success_chance == 0 or success_chance == 1:
+      certain = 0 if success_chance == 0 else n
+      return 1.0 if low <= certain <= high else 0.0
+    odds = success_chance / (1 - success_chance)
+    mode = min(math.floor((n + 1) * success_chance), n)
+    start = min(max(mode, low), high)
+    # Total of the chances relative to P(start), which counts as 1
+    total = 1.0
+    # Walk up from the start
+    chance = 1.0
+    for k in range(start, high):
+      chance *= (n - k) / (k + 1) * odds
+      total += chance
+      if chance < total * sys.float_info.epsilon:
+        break
+    # Walk down from the start, using the ratio in reverse
+    chance = 1.0
+    for k in range(start, low, -1):
+      chance *= k / ((n - k + 1) * odds)
+      total += chance
+      if chance < total * sys.float_info.epsilon:
+        break
+    return min(math.exp(Probability.log_binomial(n, start, success_chance)) * total, 1.0)
+
+  @staticmethod
+  def regularized_beta(x, a, b):
+    """
+    Finds the regularized incomplete beta function I_x(a, b), which is the
+    fraction of the area under t^(a-1) * (1-t)^(b-1) (from 0 to 1) that's
+    between 0 and x. For whole numbers, it's also the chance of at least 'a'
+    successes in a + b - 1 trials with success chance x, which is why
+    binomial() can use it to find a whole range of outcomes at once.
+
+    This evaluates a continued fraction for I_x(a, b) with Lentz's method
+    (from Numerical Recipes).
+
+    *The fraction only converges quickly when x < (a + 1) / (a + b + 2), so
+    other x values use the symmetry I_x(a, b) = 1 - I_(1-x)(b, a)
+    """
+    if x <= 0:
+      return 0.0
+    if x >= 1:
+      return 1.0
+    # x^a * (1-x)^b / Beta(a, b), found in log space. For whole numbers,
+    # this equals a * (1-x) times the chance of a successes in a + b - 1
+    # trials, which log_binomial() finds more precisely than log-gamma does.
+    if float(a).is_integer() and float(b).is_integer():
+      log_front = Probability.log_binomial(a + b - 1, a, x) + math.log1p(-x) + math.log(a)
+    else:
+      log_front = (math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) +
+        a * math.log(x) + b * math.log1p(-x))
+    if x < (a + 1) / (a + b + 2):
+      return math.exp(log_front) * Probability.beta_fraction(x, a, b) / a
+    return 1 - math.exp(log_front) * Probability.beta_fraction(1 - x, b, a) / b
+
+  @staticmethod
+  def beta_fraction(x, a, b):
+    """Evaluates the continued fraction used by regularized_beta()"""
+    # Stands in for 0 so that nothing is divided by 0
+    tiny = 1e-300
+    c = 1.0
+    d = 1 - (a + b) * x / (a + 1)
+    d = 1 / (d if abs(d) > tiny else tiny)
+    fraction = d
+    # The number of terms needed grows with the square root of a + b
+    for m in range(1, 100 + 10 * int(math.sqrt(a + b))):
+      # Each step adds an even term and then an odd term of the fraction
+      for numerator in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+          -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))):
+        d = 1 + numerator * d
+        d = 1 / (d if abs(d) > tiny else tiny)
+        c = 1 + numerator / c
+        c = c if abs(c) > tiny else tiny
+        fraction *= d * c
+      if abs(d * c - 1) < sys.float_info.epsilon:
+        break
+    return fraction
+
+  @staticmethod
+  def simulate_binomial(n, r, success_chance, r_meaning="exact", trials=10, seed=None,
+      points=1000, confidence=0.95, chunk_size=10**6):
+    """
+    Runs actual trials of a binomial experiment (see binomial()) and tracks
+    how often they succeed. Each trial is n random outcomes, so its number
+    of successes follows a binomial distribution that numpy can sample
+    directly, instead of drawing every outcome one by one.
+
+    Returns a tuple of numpy arrays (trial_counts, rates, lower, upper):
+    - trial_counts are the numbers of trials run at each checkpoint
+    - rates are the success rates after that many trials
+    - lower and upper are the bounds of the confidence interval around each
+      rate (see wilson_interval())
+
+    - points is the number of checkpoints, spread evenly from the first
+      trial to the last. Set it to None to get every trial.
+    - seed makes the random trials repeatable
+    - chunk_size is the number of trials simulated at a time. Only one chunk
+      is in memory at once, so even 10^8 trials use constant memory (as long
+      as points is not None).
+    """
+    if trials < 1:
+      raise ValueError(f"can't run {trials} trials")
+    if points is None or points >= trials:
+      trial_counts = np.arange(1, trials + 1)
+    else:
+      trial_counts = np.unique(np.ceil(np.linspace(1, trials, points)).astype(np.int64))
+    generator = np.random.default_rng(seed)
+    successful_counts = np.empty(len(trial_counts), dtype=np.int64)
+    done, successful_trials, checkpoint = 0, 0, 0
+    while done < trials:
+      size = min(chunk_size, trials - done)
+      successes = generator.binomial(n, success_chance, size=size)
+      # Running total of successful trials within this chunk
+      running = successful_trials + np.cumsum(Probability.is_success(successes, r, r_meaning))
+      # Record the checkpoints that fall inside this chunk
+      end = np.searchsorted(trial_counts, done + size, side="right")
+      successful_counts[checkpoint:end] = running[trial_counts[checkpoint:end] - done - 1]
+      successful_trials = int(running[-1])
+      done += size
+      checkpoint = end
+    lower, upper = Probability.wilson_interval(successful_counts, trial_counts, confidence)
+    return (trial_counts, successful_counts / trial_counts, lower, upper)
+
+  @staticmethod
+  def simulate_binomial_parallel(n, r, success_chance, r_meaning="exact", trials=10, seed=None,
+      workers=None, chunk_size=10**6, confidence=0.95, target_width=None):
+    """
+    Runs the same trials as simulate_binomial(), but splits them into chunks
+    that run at the same time across worker processes (one per CPU core by
+    default). This is meant for huge numbers of trials, where only the final
+    success rate is needed.
+
+    Returns a tuple (rate, lower, upper, trials_run), where lower and upper
+    are the confidence interval around the rate (see wilson_interval()).
+
+    - target_width stops the trials early once the confidence interval is
+      narrower than it (ex. 0.001), so trials_run can be less than trials
+    - seed makes the trials repeatable. Each chunk gets its own random
+      numbers from numpy's SeedSequence.spawn(), so the result is the same
+      for a given seed and chunk_size no matter how many workers there are.
+
+    *Chunk results are added up in order as they come back, so stopping
+    early always happens after the same chunk too
+    """
+    if trials < 1:
+      raise ValueError(f"can't run {trials} trials")
+    root = np.random.SeedSequence(seed)
+    def chunks():
+      for start in range(0, trials, chunk_size):
+        # Seeds are only spawned as chunks are handed out
+        yield (n, r, success_chance, r_meaning, min(chunk_size, trials - start), root.spawn(1)[0])
+
+    successful_trials, trials_run = 0, 0
+    with WorkerPool(workers) as pool:
+      for index, count, error in pool.map(Probability.count_successes, chunks()):
+        if error is not None:
+          raise error
+        successful_trials += count
+        trials_run += min(chunk_size, trials - index * chunk_size)
+        lower, upper = Probability.wilson_interval(successful_trials, trials_run, confidence)
+        if target_width is not None and upper - lower < target_width:
+          break
+    return (successful_trials / trials_run, float(lower), float(upper), trials_run)
+
+  @staticmethod
+  def count_successes(chunk):
+    """
+    Runs one chunk of trials for simulate_binomial_parallel() and returns
+    how many were successful.
+
+    *chunk is a tuple (n, r, success_chance, r_meaning, size, seed)
+    """
+    n, r, success_chance, r_meaning, size, seed = chunk
+    successes = np.random.default_rng(seed).binomial(n, success_chance, size=size)
+    return int(np.count_nonzero(Probability.is_success(successes, r, r_meaning)))
+
+  @staticmethod
+  def is_success(successes, r, r_meaning="exact"):
+    """
+    Checks whether trials with the given numbers of successful outcomes
+    count as successes (see binomial() for r_meaning). This works on single
+    numbers and on numpy arrays.
+    """
     if r_meaning == "exact":
-      success_range = range(r, r + 1)
+      return successes == r
     elif r_meaning == "min":
-      success_range = range(r, n + 1)
+      return successes >= r
     elif r_meaning == "max":
-      success_range = range(0, r + 1)
+      return successes <= r
 
-    # Add the probabilities of all acceptable numbers of successes
-    total = 0
-    for num_successes in success_range:
-      p = success_chance ** num_successes
-      q = (1 - success_chance) ** (n - num_successes)
-      total += Probability.combinations(n, num_successes) * p * q
-    return total
+  @staticmethod
+  def wilson_interval(successes, trials, confidence=0.95):
+    """
+    Finds the range that the true success chance is likely in (with the
+    given confidence), after seeing a number of successes in some trials.
+    This uses the Wilson score interval, which (unlike the simpler
+    rate +- z * standard error) stays between 0 and 1 and works even
+    when there have been no successes yet.
+
+    Formula: (p + z^2/2t +- z * sqrt(p(1-p)/t + z^2/4t^2)) / (1 + z^2/t)
+
+    *p=observed success rate, t=number of trials, z=number of standard
+    deviations that covers the confidence (ex. 1.96 for 95%)
+    """
+    successes = np.asarray(successes, dtype=float)
+    trials = np.asarray(trials, dtype=float)
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    rate = successes / trials
+    scale = 1 + z**2 / trials
+    center = (rate + z**2 / (2 * trials)) / scale
+    margin = z * np.sqrt(rate * (1 - rate) / trials + z**2 / (4 * trials**2)) / scale
+    return (center - margin, center + margin)
 
   @staticmethod
-  def graph_binomial(n, r, success_chance, r_meaning="exact", trials=10, delay=0.5):
+  def graph_binomial(n, r, success_chance, r_meaning="exact", trials=10, delay=None, fps=2, batch_size=1,
+      display=True, seed=None):
+    """
+    Runs actual trials of a binomial experiment and animates how often they
+    succeed on a bar graph, next to a line at the calculated probability.
+    As more trials are run, the bar should settle near the line.
+
+    Returns the success rate after each trial (the convergence series).
+
+    - fps is the number of times the bar is updated per second
+    - delay is the old way to set the speed, as seconds between updates
+      (fps = 1 / delay). It's deprecated, but still works for older callers.
+    - batch_size is the number of trials run between updates
+    - display can be set to False to skip the graph and only return the series
+    - seed makes the random trials repeatable
+
+    *Only the bar and its label are redrawn between frames (blitting), and all
+    trials are simulated at once with numpy, so this stays fast for large
+    numbers of trials
+    """
+    if delay is not None:
+      warnings.warn("graph_binomial()'s delay is deprecated, use fps (1 / delay) instead", DeprecationWarning,
+        stacklevel=2)
+      fps = 1 / delay
+    _, rates, _, _ = Probability.simulate_binomial(n, r, success_chance, r_meaning, trials,
+      seed=seed, points=None)
+    if not display:
+      return rates
+
     # Set up bar graph
     fig, ax = plt.subplots()
     ax.set_ylim(0, 1)
-    # Graph initial x and y values on bar graph
-    successful_trials, failed_trials = 0, 0
-    bar_label = ax.text(0, 0, "0")
-    bars = plt.bar(["Success"], [successful_trials])
+    # Graph initial x and y values on bar graph (animated artists are left
+    # out of the background and only redrawn on their own)
+    bar_label = ax.text(0, 0, "0", animated=True)
+    bars = ax.bar(["Success"], [0], animated=True)
     # Graph line representing average probability
     average = Probability.binomial(n, r, success_chance, r_meaning)
-    plt.axhline(y=average, linewidth=1, color='k')
-    plt.text(0, average, f"Average Success: {average:.3f}")
-    
-    # Start filling bar graph with trial successes/failures
-    for trial in range(trials):
-      # Decide whether trial is a success using r and random numbers
-      successful_outcomes, failed_outcomes = 0, 0
-      for element in range(n):
-        if random.uniform(0, 1) < success_chance:
-          successful_outcomes += 1
-        else:
-          failed_outcomes += 1
-      # Add trial success/failure to above counters
-      if (r_meaning == "exact" and successful_outcomes == r or
-          r_meaning == "min" and successful_outcomes >= r or
-          r_meaning == "max" and successful_outcomes <= r):
-        successful_trials += 1
-      else:
-        failed_trials += 1
-      # Update the rendered graph by setting the bar heights and redrawing
-      current_success = successful_trials / (successful_trials + failed_trials)
+    ax.axhline(y=average, linewidth=1, color='k')
+    ax.text(0, average, f"Average Success: {average:.3f}")
+
+    def update(frame):
+      # Show the success rate after the last trial in this frame's batch
+      current_success = rates[min((frame + 1) * batch_size, trials) - 1]
       bars[0].set_height(current_success)
       bar_label.set_position((0, current_success / 2))
       bar_label.set_text(f"{current_success:.3f}")
-      fig.canvas.draw()
-      # Pause for 0.5 seconds between trials
-      plt.pause(delay)
-    plt.show()
\ No newline at end of file
+      return (bars[0], bar_label)
+
+    # The animation has to stay referenced while it's shown, or it stops
+    fig.binomial_animation = animation.FuncAnimation(fig, update,
+      frames=math.ceil(trials / batch_size), interval=1000 / fps, blit=True, repeat=False)
+    plt.show()
+    return rates
+
+class Binomial:
+  """
+  A binomial distribution: the chances of getting each number of successes
+  (0 to n) in n trials with a fixed success chance (see Probability.binomial).
+
+  The first time they're needed, the chance of every outcome (the PMF) and
+  the running totals of those chances (the CDF) are worked out and stored
+  in numpy arrays. After that, any question about the distribution is just
+  a lookup.
+
+  Ex. dice = Binomial(5, 1/6)
+      dice.cdf(2)  <- chance of rolling a 1 at most 2 times out of 5
+
+  *Use Binomial.of(n, success_chance) to share distributions (and their
+  tables) across a whole program
+  """
+  # Largest n that Probability.binomial() builds tables for
+  TABLE_LIMIT = 10**5
+  # (n, success_chance) pairs that Probability.binomial() has been called
+  # with, so tables are only built once a pair comes up again. The oldest
+  # ones are dropped after MAX_SEEN.
+  MAX_SEEN = 256
+  _seen = OrderedDict()
+
+  @staticmethod
+  @functools.lru_cache(maxsize=8)
+  def of(n, success_chance):
+    """
+    Returns a shared distribution for n and success_chance. The 8 most
+    recently used distributions are kept (see Binomial.of.cache_info()),
+    since each table of n = 10^5 takes a few MB.
+    """
+    return Binomial(n, success_chance)
+
+  @staticmethod
+  def is_repeated(n, success_chance):
+    """Returns whether n and success_chance have been seen before, and remembers them"""
+    key = (n, success_chance)
+    if key in Binomial._seen:
+      Binomial._seen.move_to_end(key)
+      return True
+    Binomial._seen[key] = True
+    if len(Binomial._seen) > Binomial.MAX_SEEN:
+      Binomial._seen.popitem(last=False)
+    return False
+
+  @staticmethod
+  def clear():
+    """Frees every shared distribution and forgets which ones were used"""
+    Binomial.of.cache_clear()
+    Binomial._seen.clear()
+
+  def __init__(self, n, success_chance):
+    self.n = n
+    self.success_chance = success_chance
+    self.tables = None
+
+  def build(self):
+    """
+    Fills in the PMF, CDF, and survival (P(X >= k)) tables.
+
+    Chances are found in log space, starting from the most likely outcome
+    (the mode) and using the ratio between neighbouring chances (see
+    Probability.binomial_sum) to move outwards in both directions
+    """
+    n, p = self.n, self.success_chance
+    if p == 0 or p == 1:
+      # Only one outcome is possible
+      pmf = np.zeros(n + 1)
+      pmf[0 if p == 0 else n] = 1
+    else:
+      log_odds = math.log(p) - math.log1p(-p)
+      mode = min(math.floor((n + 1) * p), n)
+      log_pmf = np.empty(n + 1)
+      log_pmf[mode] = Probability.log_binomial(n, mode, p)
+      # ln(P(k) / P(k - 1)) = ln((n - k + 1) / k) + ln(p / q), added up from the mode
+      above = np.arange(mode + 1, n + 1)
+      log_pmf[mode + 1:] = log_pmf[mode] + np.cumsum(np.log((n - above + 1) / above) + log_odds)
+      below = np.arange(mode - 1, -1, -1)
+      log_pmf[:mode] = (log_pmf[mode] + np.cumsum(np.log((below + 1) / (n - below)) - log_odds))[::-1]
+      pmf = np.exp(log_pmf)
+    # The upper tail is added up from the top, so small chances near n
+    # aren't lost by subtracting from 1
+    cdf = np.minimum(np.cumsum(pmf), 1)
+    survival = np.minimum(np.cumsum(pmf[::-1])[::-1], 1)
+    # Every outcome is covered at the ends, so rounding errors there are dropped
+    cdf[-1] = survival[0] = 1
+    self.tables = (pmf, cdf, survival)
+    return self.tables
+
+  def pmf(self, k):
+    """Returns the chance of exactly k successes (k can be a number or an array)"""
+    pmf, _, _ = self.tables or self.build()
+    k = np.asarray(k)
+    inside = (k >= 0) & (k <= self.n)
+    return np.where(inside, pmf[np.clip(k, 0, self.n)], 0.0)
+
+  def cdf(self, k):
+    """Returns the chance of at most k successes (k can be a number or an array)"""
+    _, cdf, _ = self.tables or self.build()
+    k = np.asarray(k)
+    return np.where(k < 0, 0.0, cdf[np.clip(k, 0, self.n)])
+
+  def sf(self, k):
+    """Returns the chance of at least k successes (k can be a number or an array)"""
+    _, _, survival = self.tables or self.build()
+    k = np.asarray(k)
+    return np.where(k > self.n, 0.0, survival[np.clip(k, 0, self.n)])
+
+  def ppf(self, q):
+    """
+    Returns the smallest number of successes k where the chance of at most k
+    successes is at least q (the inverse of cdf()). For example, ppf(0.5) is
+    the median. Since the CDF only goes up, this is a binary search.
+    """
+    _, cdf, _ = self.tables or self.build()
+    return np.minimum(np.searchsorted(cdf, q, side="left"), self.n)
+
+  def probability(self, r, r_meaning="exact"):
+    """Returns the same value as Probability.binomial(n, r, success_chance, r_meaning)"""
+    # Plain indexing, since numpy's array functions are slow for single numbers
+    pmf, cdf, survival = self.tables or self.build()
+    if r_meaning == "exact":
+      return float(pmf[r]) if 0 <= r <= self.n else 0.0
+    elif r_meaning == "min":
+      return float(survival[max(r, 0)]) if r <= self.n else 0.0
+    elif r_meaning == "max":
+      return float(cdf[min(r, self.n)]) if r >= 0 else 0.0
@@ -0,0 +1,159 @@
+import ast
+from collections import OrderedDict
+import numpy as np
+from src.pool import WorkerPool
+
+class RenderQueue:
+  """
+  Renders many graphs to image files (ex. PNG or SVG) across worker
+  processes. Each graph is described by a spec: a dictionary with its
+  'type', its 'output' file path, and the arguments of the graph method
+  it uses.
+
+  Spec Types:
+    - 'function': Plane.graph_function (needs 'function')
+    - 'rectangular': Plane.graph_rectangular (needs 'a' and 'b')
+    - 'polar': Plane.graph_polar (needs 'r' and 'theta')
+    - 'vector': Matrix.graph_vector (needs 'matrix')
+    - 'transform2': Matrix.graph_transform2 (needs 'matrix')
+    - 'transform3': Matrix.graph_transform3 (needs 'matrix')
+    - 'triangle': Triangle.graph (needs at least 3 of 'a', 'b', 'c', 'A', 'B', 'C')
+
+  Ex. {"type": "function", "function": "np.sin(x) * x", "scale": 5, "output": "sin.png"}
+      {"type": "transform2", "matrix": [[1, 2], [3, 4]], "vector": [1, -1], "output": "t.svg"}
+
+  *Functions can be top-level Python functions or expression strings of x.
+  Strings can use numpy's math functions and constants as 'np' (ex.
+  'np.sin(x) * np.pi'), and are the only option for lambdas, since lambdas
+  can't be sent to other processes. Expressions are checked before they're
+  run, so anything else (ex. other names, attributes, or strings) is refused.
+  """
+  def __init__(self, workers=None, max_pending=None, graphs_per_worker=None):
+    self.workers = workers
+    self.max_pending = max_pending
+    # Restarting workers every so often returns any memory they've built up
+    self.graphs_per_worker = graphs_per_worker
+
+  def render(self, specs, progress=None):
+    """
+    Renders every spec and returns a list of the ones that failed, as
+    dictionaries with the spec's 'index', 'output', and 'error' message.
+
+    *progress is an optional function that's called as
+    progress(done, total, failed) after each graph (total is None when
+    specs has no length, like with generators)
+    """
+    total = len(specs) if hasattr(specs, "__len__") else None
+    outputs = {}
+    failures = []
+    done = 0
+    with WorkerPool(self.workers, self.max_pending, initializer=RenderQueue.init_worker,
+        tasks_per_worker=self.graphs_per_worker) as pool:
+      for index, _, error in pool.map(RenderQueue.render_one, RenderQueue.track(specs, outputs), ordered=False):
+        done += 1
+        output = outputs.pop(index)
+        if error is not None:
+          failures.append({"index": index, "output": output, "error": f"{type(error).__name__}: {error}"})
+        if progress is not None:
+          progress(done, total, len(failures))
+    return failures
+
+  @staticmethod
+  def track(specs, outputs):
+    """Yields specs while remembering their outputs for failure reports"""
+    for index, spec in enumerate(specs):
+      outputs[index] = spec.get("output") if isinstance(spec, dict) else None
+      yield spec
+
+  @staticmethod
+  def init_worker():
+    """Prepares each worker process to draw without a display"""
+    import matplotlib
+    matplotlib.use("Agg")
+
+  # Functions compiled from expression strings in this process, so graphing
+  # the same expression again reuses its Sampler cache. The least recently
+  # used ones (and their Sampler caches) are dropped after MAX_FUNCTIONS, so
+  # a long batch of different expressions doesn't keep growing each worker.
+  MAX_FUNCTIONS = 64
+  _functions = OrderedDict()
+
+  # Syntax allowed in expression strings: numbers, x, arithmetic, comparisons,
+  # and calls to numpy's math functions (see RenderQueue.check_expression())
+  ALLOWED_NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Call, ast.Name,
+    ast.Attribute, ast.Constant, ast.Load, ast.operator, ast.unaryop, ast.cmpop)
+  NUMPY_CONSTANTS = {"pi", "e", "inf", "nan"}
+
+  @staticmethod
+  def to_function(function):
+    """Converts an expression string of x (ex. 'x**2') into a function"""
+    if not isinstance(function, str):
+      return function
+    if function in RenderQueue._functions:
+      RenderQueue._functions.move_to_end(function)
+    else:
+      tree = ast.parse(function.strip(), mode="eval")
+      RenderQueue.check_expression(tree)
+      body = ast.Expression(ast.Lambda(ast.arguments(posonlyargs=[], args=[ast.arg("x")], kwonlyargs=[],
+        kw_defaults=[], defaults=[]), tree.body))
+      RenderQueue._functions[function] = eval(compile(ast.fix_missing_locations(body), "<expression>", "eval"),
+        {"__builtins__": {}, "np": np})
+      while len(RenderQueue._functions) > RenderQueue.MAX_FUNCTIONS:
+        RenderQueue._functions.popitem(last=False)
+    return RenderQueue._functions[function]
+
+  @staticmethod
+  def check_expression(tree):
+    """
+    Raises ValueError unless an expression only uses numbers, x, operators,
+    and numpy's math functions (ufuncs like np.sin) and constants (like np.pi).
+    An empty __builtins__ alone isn't safe, since attributes (ex.
+    x.__class__) can reach any object.
+    """
+    for node in ast.walk(tree):
+      if not isinstance(node, RenderQueue.ALLOWED_NODES):
+        raise ValueError(f"'{type(node).__name__}' isn't allowed in function expressions")
+      if isinstance(node, ast.Constant) and (isinstance(node.value, bool) or
+          not isinstance(node.value, (int, float, complex))):
+        raise ValueError(f"{node.value!r} isn't allowed in function expressions (only numbers are)")
+      if isinstance(node, ast.Name) and node.id not in ("x", "np"):
+        raise ValueError(f"unknown name '{node.id}' (only x and np can be used)")
+      if isinstance(node, ast.Attribute):
+        if not (isinstance(node.value, ast.Name) and node.value.id == "np" and
+            (node.attr in RenderQueue.NUMPY_CONSTANTS or isinstance(getattr(np, node.attr, None), np.ufunc))):
+          raise ValueError(f"'{ast.unparse(node)}' isn't a numpy math function or constant")
+      if isinstance(node, ast.Name) and node.id == "np" and not any(isinstance(parent, ast.Attribute)
+          and parent.value is node for parent in ast.walk(tree)):
+        raise ValueError("np can only be used for its math functions (ex. np.sin)")
+      if isinstance(node, ast.Call) and (node.keywords or not isinstance(node.func, ast.Attribute)):
+        raise ValueError("only numpy math functions can be called, without keyword arguments")
+
+  @staticmethod
+  def render_one(spec):
+    """Draws a single spec and saves it to its output file"""
+    # Imported here so each worker only loads what its graphs need
+    from src.plane import Plane
+    from src.matrix import Matrix
+    from src.triangle import Triangle
+    options = dict(spec)
+    graph_type = options.pop("type")
+    if not options.get("output"):
+      raise ValueError("spec is missing an output path")
+    if graph_type == "function":
+      options["function"] = RenderQueue.to_function(options["function"])
+      Plane.graph_function(**options)
+    elif graph_type == "rectangular":
+      Plane.graph_rectangular(**options)
+    elif graph_type == "polar":
+      Plane.graph_polar(**options)
+    elif graph_type in ("vector", "transform2", "transform3"):
+      matrix = Matrix(options.pop("matrix"))
+      getattr(matrix, "graph_" + graph_type)(**options)
+    elif graph_type == "triangle":
+      output = options.pop("output")
+      triangle = Triangle(**options)
+      if not triangle.is_valid():
+        raise ValueError("triangle could not be made with given information")
+      triangle.graph(output=output)
+    else:
+      raise ValueError(f"unknown graph type '{graph_type}'")
@@ -0,0 +1,227 @@
+import weakref
+from collections import OrderedDict
+import numpy as np
+
+class Sampler:
+  """
+  Picks the x values to evaluate a function at when graphing it. Instead of
+  spacing points evenly, this starts with a coarse grid and keeps splitting
+  the intervals where a straight line between two neighbouring points doesn't
+  match the curve (ex. sharp turns), until the curve looks smooth or the point
+  budget runs out. Flat or straight parts of the graph end up with few points.
+
+  Every evaluation is cached, so graphing the same function again (ex.
+  after zooming in or out) only calls the function at new x values. This
+  matters most for functions that are slow to evaluate. Each cache keeps the
+  MAX_CACHE most recently used points.
+
+  *Functions are called with numpy arrays of x values when possible. If that
+  fails, they are called once per x value instead.
+  """
+  # Samplers are stored per function, so separate calls to Sampler.of() with
+  # the same function share one cache. Weak references (both here and in the
+  # shared samplers themselves) let the cache be deleted along with its function.
+  _samplers = weakref.WeakKeyDictionary()
+  # Points kept in each sampler's cache. The least recently used ones are
+  # dropped after this, so zooming around a graph for a long time doesn't
+  # keep growing it.
+  MAX_CACHE = 2**16
+
+  @staticmethod
+  def of(function):
+    """Returns the shared sampler (and cache) for a function"""
+    try:
+      if function not in Sampler._samplers:
+        Sampler._samplers[function] = Sampler(function, weak=True)
+      return Sampler._samplers[function]
+    except TypeError:
+      # Some callables (ex. built-in functions) can't be weakly referenced,
+      # so they get a new sampler each time
+      return Sampler(function)
+
+  def __init__(self, function, weak=False):
+    # A shared sampler holding its function would keep its own registry entry
+    # alive, so it only holds a weak reference instead
+    self._function = None if weak else function
+    self._reference = weakref.ref(function) if weak else None
+    self.cache = OrderedDict()
+    # Number of x values the function has actually been called with
+    self.evaluations = 0
+
+  @property
+  def function(self):
+    return self._function if self._reference is None else self._reference()
+
+  def evaluate(self, x):
+    """Returns the function's y values at x, only calling it for uncached x values"""
+    x = np.asarray(x, dtype=float)
+    # y values of this call's points, kept here too in case the cache drops them
+    found = {}
+    missing = []
+    for value in np.unique(x).tolist():
+      if value in self.cache:
+        self.cache.move_to_end(value)
+        found[value] = self.cache[value]
+      else:
+        missing.append(value)
+    missing = np.array(missing, dtype=float)
+    if len(missing) > 0:
+      try:
+        # Numbers returned for an array input (ex. lambda x: 5) are broadcast
+        y = np.broadcast_to(np.asarray(self.function(missing), dtype=float), missing.shape)
+      except (TypeError, ValueError):
+        y = np.array([self.function(value) for value in missing], dtype=float)
+      new = dict(zip(missing.tolist(), y.tolist()))
+      found.update(new)
+      self.cache.update(new)
+      self.evaluations += len(missing)
+      while len(self.cache) > Sampler.MAX_CACHE:
+        self.cache.popitem(last=False)
+    return np.array([found[value] for value in x.tolist()])
+
+  def sample(self, start, stop, max_points=200, tolerance=0.002, initial_points=21, y_range=None):
+    """
+    Returns arrays (x, y) of points to graph the function between start and
+    stop with.
+
+    - max_points is the most points that will be returned (unless the cache
+      already holds more points in this range)
+    - tolerance is how far (as a fraction of the graph's height) a point is
+      allowed to be from the line between its neighbours before the intervals
+      next to it are split
+    - y_range is the height of the graph. By default, this is the distance
+      between the lowest and highest y values found.
+    """
+    # Start with an even grid plus any points already evaluated in this range
+    cached = np.fromiter(self.cache.keys(), dtype=float, count=len(self.cache))
+    cached = cached[(cached >= start) & (cached <= stop)]
+    x = np.union1d(np.linspace(start, stop, initial_points), cached)
+    y = self.evaluate(x)
+    # Intervals narrower than this are too small to see, so they aren't split
+    min_width = (stop - start) * 1e-6
+
+    while len(x) < max_points:
+      error = Sampler.interval_errors(x, y, y_range)
+      error[np.diff(x) < min_width] = 0
+      split = np.flatnonzero(error > tolerance)
+      if len(split) == 0:
+        break
+      # Only split the worst intervals when there isn't enough budget for all of them
+      budget = max_points - len(x)
+      if len(split) > budget:
+        split = split[np.argsort(error[split])[::-1][:budget]]
+      midpoints = (x[split] + x[split + 1]) / 2
+      # Merge the new midpoints into the sorted points
+      x = np.concatenate((x, midpoints))
+      y = np.concatenate((y, self.evaluate(midpoints)))
+      order = np.argsort(x, kind="stable")
+      x, y = x[order], y[order]
+    return (x, y)
+
+  @staticmethod
+  def interval_errors(x, y, y_range=None):
+    """
+    Estimates how badly each interval between neighbouring points misses the
+    curve. For each point, this measures its distance from the straight line
+    between the points on either side of it (its local curvature), scaled to
+    the size of the graph. Each interval then takes the larger error of its
+    two endpoints.
+
+    *Intervals where the function goes from defined to undefined (ex. near
+    the asymptote of 1/x) always count as errors, so they keep being narrowed.
+    """
+    finite = np.isfinite(y)
+    if y_range is None:
+      y_range = np.ptp(y[finite]) if finite.any() else 1
+    y_range = y_range if y_range > 0 else 1
+    x_range = (x[-1] - x[0]) if x[-1] > x[0] else 1
+    # Scale x and y so both sides of the graph count equally
+    sx = x / x_range
+    sy = np.where(finite, y, 0) / y_range
+    deviation = np.zeros(len(x))
+    if len(x) > 2:
+      # Fraction of the way each point is between its neighbours, horizontally
+      weight = (sx[1:-1] - sx[:-2]) / (sx[2:] - sx[:-2])
+      line = sy[:-2] + weight * (sy[2:] - sy[:-2])
+      deviation[1:-1] = np.abs(sy[1:-1] - line)
+    error = np.maximum(deviation[:-1], deviation[1:])
+    error[finite[:-1] != finite[1:]] = np.inf
+    return error
+
+  @staticmethod
+  def min_max(x, y, buckets):
+    """
+    Downsamples a series by splitting its x range into equal-width buckets
+    (ex. one per pixel column) and keeping only the first, lowest, highest,
+    and last point in each. A line drawn through these points covers the
+    exact same pixels as the full series, so every peak and dip stays
+    visible while at most 4 points per bucket are left.
+
+    *x must be sorted from least to greatest
+    """
+    x, y = Sampler.finite(x, y)
+    if len(x) <= 4 * buckets:
+      return (x, y)
+    # Find the bucket each point falls in
+    span = (x[-1] - x[0]) or 1
+    bucket = np.minimum(((x - x[0]) / span * buckets).astype(np.int64), buckets - 1)
+    # Since x is sorted, each bucket is a contiguous slice starting at these indices
+    starts = np.flatnonzero(np.diff(bucket, prepend=-1))
+    ends = np.append(starts[1:], len(x)) - 1
+    lowest = np.minimum.reduceat(y, starts)
+    highest = np.maximum.reduceat(y, starts)
+    # Spread each bucket's extremes back over its points to find where they occur
+    sizes = np.diff(np.append(starts, len(x)))
+    minimums = Sampler.first_in_bucket(y == np.repeat(lowest, sizes), bucket)
+    maximums = Sampler.first_in_bucket(y == np.repeat(highest, sizes), bucket)
+    keep = np.unique(np.concatenate((starts, minimums, maximums, ends)))
+    return (x[keep], y[keep])
+
+  @staticmethod
+  def lttb(x, y, threshold):
+    """
+    Downsamples a series to 'threshold' points with the Largest-Triangle-
+    Three-Buckets algorithm. The points (besides the first and last) are split
+    into buckets with equal numbers of points. From each bucket, this keeps
+    the point that forms the largest triangle with the point kept from the
+    previous bucket and the average of the next bucket. Big triangles mean
+    big changes in direction, so the shape of the series is preserved.
+
+    *x must be sorted from least to greatest
+    """
+    x, y = Sampler.finite(x, y)
+    if threshold >= len(x) or threshold < 3:
+      return (x, y)
+    # Bucket edges for every point between the first and last
+    edges = np.linspace(1, len(x) - 1, threshold - 1).astype(np.int64)
+    # Average point of every bucket (the first and last points are buckets of their own)
+    sizes = np.diff(edges)
+    average_x = np.append(np.add.reduceat(x, edges[:-1]) / sizes, x[-1])
+    average_y = np.append(np.add.reduceat(y, edges[:-1]) / sizes, y[-1])
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0], keep[-1] = 0, len(x) - 1
+    previous = 0
+    for index in range(threshold - 2):
+      start, end = edges[index], edges[index + 1]
+      # Twice the triangle area, using the cross product of two of its sides
+      area = np.abs((x[previous] - average_x[index + 1]) * (y[start:end] - y[previous]) -
+        (x[previous] - x[start:end]) * (average_y[index + 1] - y[previous]))
+      previous = start + np.argmax(area)
+      keep[index + 1] = previous
+    return (x[keep], y[keep])
+
+  @staticmethod
+  def first_in_bucket(matches, bucket):
+    """Returns the index of the first matching point in each bucket"""
+    indices = np.flatnonzero(matches)
+    # unique() returns the first position of each bucket number in the matches
+    _, first = np.unique(bucket[indices], return_index=True)
+    return indices[first]
+
+  @staticmethod
+  def finite(x, y):
+    """Removes points that can't be drawn (ex. NaN or infinite y values)"""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    drawable = np.isfinite(x) & np.isfinite(y)
+    return (x, y) if drawable.all() else (x[drawable], y[drawable])
@@ -0,0 +1,416 @@
+import argparse
+import asyncio
+import collections
+import itertools
+import json
+import math
+import random
+import time
+from src.cli import Cli
+from src.pool import WorkerPool
+
+class Server:
+  """
+  Serves solver requests to other local programs, so they don't pay for
+  starting Python (and importing numpy) on every call. Clients connect over
+  a Unix socket (or localhost TCP) and send the same JSON Lines requests as
+  the CLI (see Cli). Each request gets one JSON response line with its 'id',
+  and responses are sent as soon as they're ready, so they can come back in
+  a different order than the requests.
+
+  Ex. {"id": 1, "op": "triangle.solve", "args": {"a": 3, "b": 4, "c": 5}}
+
+  The event loop only reads and writes requests. Solving is done in a
+  WorkerPool, so slow requests (ex. big matrices) don't hold up the rest.
+
+  - Coalescing: identical requests (same op and args) that arrive while
+    one of them is being solved share its result instead of being solved again
+  - Micro-batching: small requests that are quicker to solve together
+    (triangles and binomials) are gathered for batch_delay seconds (or until
+    batch_size of them are waiting), and then solved with one vectorized
+    call in a worker (see TriangleBatch and Binomial)
+  - Metrics: the 'server.metrics' op returns the number of requests, errors,
+    coalesced requests, batches, throughput, and latency percentiles
+  """
+  # Ops that are gathered into batches, and the methods that solve each batch
+  BATCHED = {"triangle.solve": "solve_triangles", "probability.binomial": "solve_binomials"}
+  # Most requests that a connection can have in progress before reading waits
+  MAX_IN_PROGRESS = 1024
+
+  def __init__(self, path=None, host="127.0.0.1", port=8765, workers=None, batch_size=256, batch_delay=0.001):
+    self.path = path
+    self.host = host
+    self.port = port
+    self.workers = workers
+    self.batch_size = batch_size
+    self.batch_delay = batch_delay
+    self.pool = None
+    self.server = None
+    # Tasks and writers of the open connections
+    self.connections = {}
+    # Futures of the requests being solved, by op and args
+    self.in_flight = {}
+    # Requests (and their futures) waiting to be batched, by op
+    self.waiting = {}
+    self.stats = {"requests": 0, "errors": 0, "coalesced": 0, "batches": 0, "batched": 0}
+    # Latencies (in seconds) of the most recent responses
+    self.latencies = collections.deque(maxlen=10000)
+    self.started = None
+
+  async def start(self):
+    """Starts the workers and begins accepting connections"""
+    self.pool = WorkerPool(self.workers)
+    if self.path is not None:
+      self.server = await asyncio.start_unix_server(self.connect, self.path)
+    else:
+      self.server = await asyncio.start_server(self.connect, self.host, self.port)
+      # Port 0 picks any free port
+      self.port = self.server.sockets[0].getsockname()[1]
+    self.started = time.perf_counter()
+    return self
+
+  async def close(self):
+    """Stops accepting connections, closes the open ones, and stops the workers"""
+    self.server.close()
+    for writer in self.connections.values():
+      writer.close()
+    await asyncio.gather(*self.connections, return_exceptions=True)
+    await self.server.wait_closed()
+    self.pool.close()
+
+  async def serve_forever(self):
+    await self.start()
+    try:
+      await self.server.serve_forever()
+    finally:
+      await self.close()
+
+  async def connect(self, reader, writer):
+    """Reads the requests of one connection and sends back their responses"""
+    limit = asyncio.Semaphore(Server.MAX_IN_PROGRESS)
+    tasks = set()
+    self.connections[asyncio.current_task()] = writer
+    try:
+      while line := await reader.readline():
+        if not line.strip():
+          continue
+        await limit.acquire()
+        task = asyncio.ensure_future(self.respond(line, writer))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        task.add_done_callback(lambda _: limit.release())
+      if tasks:
+        await asyncio.gather(*tasks)
+    except ConnectionError:
+      pass
+    finally:
+      del self.connections[asyncio.current_task()]
+      writer.close()
+
+  async def respond(self, line, writer):
+    """Solves one request and writes its response"""
+    start = time.perf_counter()
+    response = await self.handle(line)
+    try:
+      text = json.dumps(response)
+    except (TypeError, ValueError) as error:
+      # Results JSON can't hold (ex. an int with more than 4300 digits) still
+      # need a response, or the client would wait for it forever
+      response = {"id": response["id"], "error": f"{type(error).__name__}: {error}"}
+      text = json.dumps(response)
+    self.stats["requests"] += 1
+    self.stats["errors"] += "error" in response
+    self.latencies.append(time.perf_counter() - start)
+    writer.write((text + "\n").encode())
+    await writer.drain()
+
+  async def handle(self, line):
+    """Returns the response to a request line"""
+    try:
+      request = json.loads(line)
+      if isinstance(request, dict) and request.get("op") == "server.metrics":
+        return {"id": request.get("id"), "result": self.metrics()}
+      request_id, op, args = Cli.parse(line)
+      key = (op, json.dumps(args, sort_keys=True))
+    except Exception as error:
+      return {"id": Cli.id_of(line), "error": f"{type(error).__name__}: {error}"}
+    if key in self.in_flight:
+      self.stats["coalesced"] += 1
+    else:
+      self.in_flight[key] = asyncio.ensure_future(self.solve(op, args))
+      self.in_flight[key].add_done_callback(lambda _: self.in_flight.pop(key, None))
+    # Shielded, so a client leaving early doesn't cancel a request others share
+    result, error = await asyncio.shield(self.in_flight[key])
+    return {"id": request_id, "error": error} if error is not None else {"id": request_id, "result": result}
+
+  async def solve(self, op, args):
+    """Returns the (result, error) of a request, solved in a worker"""
+    if op in Server.BATCHED:
+      future = asyncio.get_running_loop().create_future()
+      waiting = self.waiting.setdefault(op, [])
+      waiting.append((args, future))
+      if len(waiting) >= self.batch_size:
+        self.flush(op)
+      elif len(waiting) == 1:
+        asyncio.get_running_loop().call_later(self.batch_delay, self.flush, op)
+      return await future
+    return await asyncio.get_running_loop().run_in_executor(self.pool.executor, Server.solve_one, op, args)
+
+  def flush(self, op):
+    """Sends the requests waiting for a batch to a worker"""
+    waiting = self.waiting.pop(op, [])
+    if waiting:
+      self.stats["batches"] += 1
+      self.stats["batched"] += len(waiting)
+      asyncio.ensure_future(self.solve_waiting(op, waiting))
+
+  async def solve_waiting(self, op, waiting):
+    """Solves a batch and hands each request its result"""
+    try:
+      results = await asyncio.get_running_loop().run_in_executor(self.pool.executor,
+        Server.solve_batch, op, [args for args, _ in waiting])
+    except Exception as error:
+      # Only for workers that stop unexpectedly, since batches catch their requests' errors
+      results = [(None, f"{type(error).__name__}: {error}")] * len(waiting)
+    for (_, future), result in zip(waiting, results):
+      if not future.done():
+        future.set_result(result)
+
+  def metrics(self):
+    """Returns the request counts, throughput, and latencies (in milliseconds) so far"""
+    uptime = time.perf_counter() - self.started
+    metrics = dict(self.stats, uptime=uptime, requests_per_second=self.stats["requests"] / uptime if uptime > 0 else 0)
+    metrics["latency_ms"] = Server.percentiles(self.latencies)
+    return metrics
+
+  @staticmethod
+  def percentiles(latencies):
+    """Returns the 50th, 95th, and 99th percentile and max of latencies (in seconds) in milliseconds"""
+    ordered = sorted(latencies)
+    if not ordered:
+      return {"p50": 0, "p95": 0, "p99": 0, "max": 0}
+    def percentile(fraction):
+      return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)] * 1000
+    return {"p50": percentile(0.5), "p95": percentile(0.95), "p99": percentile(0.99), "max": ordered[-1] * 1000}
+
+  @staticmethod
+  def solve_one(op, args):
+    """Returns the (result, error) of a request (in a worker)"""
+    try:
+      return (Cli.solve(op, args), None)
+    except Exception as error:
+      return (None, f"{type(error).__name__}: {error}")
+
+  @staticmethod
+  def solve_batch(op, requests):
+    """Returns the (result, error) of each request in a batch of one op (in a worker)"""
+    return getattr(Server, Server.BATCHED[op])(requests)
+
+  @staticmethod
+  def solve_triangles(requests):
+    """Solves a batch of 'triangle.solve' requests together with TriangleBatch"""
+    import numpy as np
+    from src.triangle import TriangleBatch
+    names = ("a", "b", "c", "A", "B", "C")
+    results = [None] * len(requests)
+    rows = []
+    values = []
+    for index, args in enumerate(requests):
+      try:
+        unknown = set(args) - set(names)
+        if unknown:
+          raise TypeError(f"unexpected argument '{sorted(unknown)[0]}'")
+        for name in names:
+          # float() would also take strings like "3" and bools, which Cli.triangle_solve() doesn't
+          if args.get(name) is not None and (isinstance(args[name], bool) or not isinstance(args[name], (int, float))):
+            raise TypeError(f"'{name}' must be a number, not {type(args[name]).__name__}")
+        values.append([math.nan if args.get(name) is None else float(args[name]) for name in names])
+        rows.append(index)
+      except (TypeError, ValueError) as error:
+        results[index] = (None, f"{type(error).__name__}: {error}")
+    batch = TriangleBatch(*np.array(values, dtype=float).reshape(-1, 6).T)
+    solved = np.concatenate((batch.sides, batch.angles, batch.perimeter[:, None],
+      batch.area[:, None], batch.height[:, None]), axis=1).tolist()
+    # Same format as Cli.triangle_solve(), with unknown values as None
+    for index, row, valid in zip(rows, solved, batch.valid.tolist()):
+      solution = dict(zip(names + ("perimeter", "area", "height"), [None if value != value else value for value in row]))
+      solution["valid"] = valid
+      results[index] = (solution, None)
+    return results
+
+  @staticmethod
+  def solve_binomials(requests):
+    """
+    Solves a batch of 'probability.binomial' requests. Requests with the same
+    n and success chance look up all of their chances in the same Binomial
+    tables at once.
+    """
+    import numpy as np
+    from src.probability import Binomial
+    results = [None] * len(requests)
+    groups = collections.defaultdict(list)
+    for index, args in enumerate(requests):
+      n, chance, meaning = args.get("n"), args.get("success_chance"), args.get("r_meaning", "exact")
+      if isinstance(n, int) and 0 <= n <= Binomial.TABLE_LIMIT and isinstance(args.get("r"), int) \
+          and meaning in ("exact", "min", "max") and set(args) <= {"n", "r", "success_chance", "r_meaning"}:
+        groups[(n, chance, meaning)].append(index)
+      else:
+        # Anything unusual (ex. huge n or bad arguments) is solved by itself
+        results[index] = Server.solve_one("probability.binomial", args)
+    for (n, chance, meaning), indices in groups.items():
+      try:
+        distribution = Binomial.of(n, chance)
+        lookup = {"exact": distribution.pmf, "min": distribution.sf, "max": distribution.cdf}[meaning]
+        chances = lookup(np.array([requests[index]["r"] for index in indices])).tolist()
+        for index, value in zip(indices, chances):
+          results[index] = (value, None)
+      except Exception as error:
+        for index in indices:
+          results[index] = (None, f"{type(error).__name__}: {error}")
+    return results
+
+class Client:
+  """
+  Sends requests to a Server over one connection. Requests are pipelined:
+  many can be waiting at once, and each response is matched to its
+  request by id.
+
+  Ex. client = await Client(path="/tmp/mathkit.sock").connect()
+      solution = await client.request("triangle.solve", {"a": 3, "b": 4, "c": 5})
+
+  - timeout is the most seconds to wait for each response (forever by
+    default) before raising TimeoutError. Requests still waiting when the
+    connection closes raise ConnectionError.
+  """
+  def __init__(self, path=None, host="127.0.0.1", port=8765, timeout=None):
+    self.path = path
+    self.host = host
+    self.port = port
+    self.timeout = timeout
+    self.ids = itertools.count()
+    # Futures of the requests waiting for responses, by id
+    self.waiting = {}
+
+  async def connect(self):
+    if self.path is not None:
+      self.reader, self.writer = await asyncio.open_unix_connection(self.path)
+    else:
+      self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+    self.receiver = asyncio.ensure_future(self.receive())
+    return self
+
+  async def close(self):
+    self.writer.close()
+    await self.writer.wait_closed()
+    self.receiver.cancel()
+
+  async def receive(self):
+    """Hands each response to the request waiting for it"""
+    try:
+      while line := await self.reader.readline():
+        response = json.loads(line)
+        future = self.waiting.pop(response.get("id"), None)
+        if future is not None and not future.done():
+          future.set_result(response)
+    finally:
+      # The server closed the connection (or it broke), so no more responses are coming
+      for future in self.waiting.values():
+        if not future.done():
+          future.set_exception(ConnectionError("server closed the connection"))
+      self.waiting.clear()
+
+  async def send(self, op, args=None):
+    """Sends a request and returns its whole response (with its 'result' or 'error')"""
+    if self.receiver.done():
+      raise ConnectionError("server closed the connection")
+    request_id = next(self.ids)
+    future = asyncio.get_running_loop().create_future()
+    self.waiting[request_id] = future
+    try:
+      self.writer.write((json.dumps({"id": request_id, "op": op, "args": args or {}}) + "\n").encode())
+      await self.writer.drain()
+      return await asyncio.wait_for(future, self.timeout)
+    finally:
+      self.waiting.pop(request_id, None)
+
+  async def request(self, op, args=None):
+    """Returns the result of a request, or raises ValueError with its error message"""
+    response = await self.send(op, args)
+    if "error" in response:
+      raise ValueError(response["error"])
+    return response["result"]
+
+  @staticmethod
+  async def load(requests, path=None, host="127.0.0.1", port=8765, connections=4, concurrency=64):
+    """
+    Benchmarks a server by sending it a list of (op, args) requests over
+    several connections, with up to 'concurrency' requests waiting at once.
+    Returns the number of 'requests' and 'errors', the 'seconds' taken,
+    'requests_per_second', and the 'latency_ms' percentiles seen by the client.
+    """
+    clients = [await Client(path, host, port).connect() for _ in range(connections)]
+    limit = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def send(client, op, args):
+      nonlocal errors
+      async with limit:
+        start = time.perf_counter()
+        response = await client.send(op, args)
+        latencies.append(time.perf_counter() - start)
+        errors += "error" in response
+
+    start = time.perf_counter()
+    await asyncio.gather(*(send(clients[index % connections], op, args) for index, (op, args) in enumerate(requests)))
+    seconds = time.perf_counter() - start
+    for client in clients:
+      await client.close()
+    return {"requests": len(requests), "errors": errors, "seconds": seconds,
+      "requests_per_second": len(requests) / seconds if seconds > 0 else 0,
+      "latency_ms": Server.percentiles(latencies)}
+
+  @staticmethod
+  def sample_requests(count, unique=1000, seed=None):
+    """
+    Returns 'count' random (op, args) requests, picked from 'unique' different
+    triangles and binomials (so some of them repeat, like real traffic)
+    """
+    generator = random.Random(seed)
+    choices = []
+    for _ in range(unique):
+      if generator.random() < 0.5:
+        choices.append(("triangle.solve", {"a": generator.randint(1, 20), "b": generator.randint(1, 20),
+          "C": generator.randint(1, 179)}))
+      else:
+        choices.append(("probability.binomial", {"n": generator.randint(1, 100), "r": generator.randint(0, 100),
+          "success_chance": generator.choice([0.1, 0.25, 0.5]), "r_meaning": generator.choice(["exact", "min", "max"])}))
+    return [generator.choice(choices) for _ in range(count)]
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(prog="python -m src.server", description="Serves MathKit solvers to local programs.")
+  parser.add_argument("command", choices=["serve", "load"], help="run a server, or benchmark a running one")
+  parser.add_argument("--socket", help="Unix socket path (localhost TCP is used by default)")
+  parser.add_argument("--port", type=int, default=8765)
+  parser.add_argument("--workers", type=int, default=None, help="worker processes (one per CPU core by default)")
+  parser.add_argument("--batch-size", type=int, default=256)
+  parser.add_argument("--batch-delay", type=float, default=0.001, help="seconds to wait for more requests to batch")
+  parser.add_argument("--requests", type=int, default=10000, help="requests sent by 'load'")
+  parser.add_argument("--unique", type=int, default=1000, help="different requests sent by 'load'")
+  parser.add_argument("--connections", type=int, default=4)
+  parser.add_argument("--concurrency", type=int, default=64, help="requests waiting at once during 'load'")
+  args = parser.parse_args(argv)
+  if args.command == "serve":
+    server = Server(args.socket, port=args.port, workers=args.workers, batch_size=args.batch_size,
+      batch_delay=args.batch_delay)
+    try:
+      asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+      pass
+  else:
+    requests = Client.sample_requests(args.requests, args.unique)
+    print(json.dumps(asyncio.run(Client.load(requests, args.socket, port=args.port,
+      connections=args.connections, concurrency=args.concurrency)), indent=2))
+
+if __name__ == "__main__":
+  main()
@@ -1,11 +1,14 @@
+import functools
+import io
+import itertools
 import math
-import matplotlib.pyplot as plt
+import numbers
+import operator
+import time
+import numpy as np
+from src.lazy import plt, patches
 from src.plane import Plane
 
-class InvalidException(Exception):
-  """Exception for when triangle contains an invalid property"""
-  pass
-
 class Triangle():
   """
   A triangle solver that finds missing sides and angles. This can also
@@ -22,20 +25,25 @@ class Triangle():
     Angles Sum Theorem: X + Y + Z = 180
     Pythagorean Theorem: x^2 + y^2 = z^2
     Distance Formula: d = sqrt((x2-x1)^2 + (y2-y1)^2)
+
+  *Triangle objects can be changed and graphed. To solve many triangles
+  quickly, use Triangle.solve_tuple() or TriangleSolution (an immutable
+  tuple with empty __slots__) instead.
   """
 
+  # Case codes, in the order solve() checks them
+  UNSOLVABLE, SSS, SAS, SSA, ASA = range(5)
+  # Validity codes returned by Triangle.validity(), named after the first
+  # test that fails
+  VALID, MISSING, NON_POSITIVE_ANGLE, NON_POSITIVE_SIDE, ANGLE_SUM, LONGEST_SIDE, INEQUALITY, ISOSCELES = range(8)
+
   def __init__(self, a=None, b=None, c=None, A=None, B=None, C=None):
     # Initial properties
     self.sides = [a, b, c]
     self.angles = [A, B, C]
-    self.default = {'sides': [a, b, c], 'angles': [A, B, C]} # Used to reset triangle
     self.perimeter = 0
     self.area = 0
     self.height = 0
-
-    # Properties needed to solve triangle
-    self.known_sides = len([side for side in self.sides if side is not None])
-    self.known_angles = len([angle for angle in self.angles if angle is not None])
     self.solve()
 
   def __str__(self):
@@ -58,123 +66,304 @@ class Triangle():
 
   def is_valid(self):
     """Checks if the created triangle's properties are valid"""
-    try:
-      # Test for missing components
-      if None in self.sides or None in self.angles:
-        raise InvalidException()
-
-      # Test for non-positive angles
-      for angle in self.angles:
-        if angle <= 0:
-          raise InvalidException()
-
-      # Test for non-positive sides
-      for side in self.sides:
-        if side <= 0:
-          raise InvalidException()
-      
-      # Test if angles add to 180
-      if not math.isclose(sum(self.angles), 180, abs_tol=2):
-        raise InvalidException()
-
-      # Test if longest side is opposite of largest angle
-      longest_side_index = self.sides.index(max(self.sides))
-      largest_angle_index = self.angles.index(max(self.angles))
-      if longest_side_index != largest_angle_index:
-        raise InvalidException()
-
-      # Test if longest side isn't too big nor small
-      sorted_sides = sorted(self.sides)
-      if not (abs(sorted_sides[1] - sorted_sides[0]) < sorted_sides[2] < sorted_sides[1] + sorted_sides[0]):
-        raise InvalidException()
-
-      # Test if isosceles triangle has congruent sides and base angles
-      for index in range(0, 3):
-        nextIndex = index + 1 if index + 1 < 3 else 0 # Gets each pair of sides and angles
-        congruent_sides = math.isclose(self.sides[index], self.sides[nextIndex], abs_tol=0.01)
-        congruent_angles = math.isclose(self.angles[index], self.angles[nextIndex], abs_tol=0.01)
-        if((congruent_sides and not congruent_angles) or (congruent_angles and not congruent_sides)):
-          raise InvalidException()
-
-      return True
-    except InvalidException as err:
-      return False
+    return Triangle.validity(self.sides, self.angles) == Triangle.VALID
+
+  @staticmethod
+  def validity(sides, angles):
+    """
+    Returns Triangle.VALID if the sides and angles make a valid triangle,
+    or the code of the first test that fails (ex. Triangle.ANGLE_SUM).
+    Failing tests return right away instead of raising exceptions, which are
+    slow in Python.
+    """
+    a, b, c = sides
+    A, B, C = angles
+    # Test for missing components
+    if a is None or b is None or c is None or A is None or B is None or C is None:
+      return Triangle.MISSING
+
+    # Test for non-positive angles and sides
+    if A <= 0 or B <= 0 or C <= 0:
+      return Triangle.NON_POSITIVE_ANGLE
+    if a <= 0 or b <= 0 or c <= 0:
+      return Triangle.NON_POSITIVE_SIDE
+
+    # Test if angles add to 180
+    if not math.isclose(A + B + C, 180, abs_tol=2):
+      return Triangle.ANGLE_SUM
+
+    # Test if longest side is opposite of largest angle. Ties (ex. equilateral
+    # triangles) can be broken either way by rounding, so the angle only
+    # needs to be close to the largest one
+    opposite = A if a >= b and a >= c else (B if b >= c else C)
+    if not math.isclose(opposite, max(A, B, C), abs_tol=0.01):
+      return Triangle.LONGEST_SIDE
+
+    # Test if longest side isn't too big nor small
+    small, middle, large = sorted(sides)
+    if not (abs(middle - small) < large < middle + small):
+      return Triangle.INEQUALITY
+
+    # Test if isosceles triangle has congruent sides and base angles
+    if (math.isclose(a, b, abs_tol=0.01) != math.isclose(A, B, abs_tol=0.01) or
+        math.isclose(b, c, abs_tol=0.01) != math.isclose(B, C, abs_tol=0.01) or
+        math.isclose(c, a, abs_tol=0.01) != math.isclose(C, A, abs_tol=0.01)):
+      return Triangle.ISOSCELES
+    return Triangle.VALID
+
+  @staticmethod
+  def classify(sides, angles):
+    """
+    Returns which case (ex. Triangle.SSA) the known sides and angles fall
+    into, which decides the formulas used to solve the triangle
+    """
+    a, b, c = sides
+    A, B, C = angles
+    known_sides = (a is not None) + (b is not None) + (c is not None)
+    known_angles = (A is not None) + (B is not None) + (C is not None)
+    if known_sides == 3:
+      return Triangle.SSS
+    if known_sides == 2 and known_angles >= 1:
+      # The first known angle decides the case: if the side opposite it is
+      # known, the known angle isn't between the known sides
+      opposite = a if A is not None else (b if B is not None else c)
+      return Triangle.SAS if opposite is None else Triangle.SSA
+    if known_sides == 1 and known_angles >= 2:
+      return Triangle.ASA
+    return Triangle.UNSOLVABLE
 
   def angle_sum(self):
     """
     Finds third angle given 2 known angles
     Formula: X = 180 - Y - Z
     """
-    try:
-      # Get index of unknown angle
-      x = self.angles.index(None)
-      # Get list of angles that aren't None (missing angles)
-      known = [angle for angle in self.angles if angle is not None]
-      self.angles[x] = (180 - known[0] - known[1])
-    except:
-      return
+    Triangle.third_angle(self.angles)
 
   def sss_cosine(self, x):
     """
     Finds angle opposite specified side 3 known sides
     Formula:  X = acos(y^2 + z^2 - x^2 / 2yz)
     """
-    try:
-      # Get sides that are not opposite the desired angle
-      known = [side for index, side in enumerate(self.sides) if index != x]
-      # The above formula, converted to degrees
-      self.angles[x] = math.degrees(math.acos((known[0]**2 + known[1]**2 -
-        self.sides[x]**2) / (2 * known[0] * known[1])))
-    except:
-      return
+    Triangle.cosine_angle(self.sides, self.angles, x)
 
   def sas_cosine(self):
     """
     Finds side opposite known angle given 2 known sides and 1 known angle in-between
     Formula: x = sqrt(y^2 + z^2 - 2yz*cosX)
     """
-    try:
-      # Get index of unknown side
-      x = self.sides.index(None)
-      # Get list of all sides that aren't None (missing sides)
-      known = [side for side in self.sides if side is not None]
-      # The above formula, converted to degrees
-      self.sides[x] = math.sqrt((known[0]**2 + known[1]**2) - (2 *
-        known[0] * known[1] * math.cos(math.radians(self.angles[x]))))
-    except:
-      return
+    Triangle.cosine_side(self.sides, self.angles)
 
   def aas_sine(self, x):
     """
     Finds side opposite specified angle given 2 known angles and 1 known side
     Formula: x = sinX * y / sinY
     """
-    try:
-      # Finds a known side-angle pair
-      known = next(index for index, side in enumerate(self.sides)
-        if self.sides[index] is not None and self.angles[index] is not None)
-      # The above formula, where angles are converted to radians
-      self.sides[x] = (math.sin(math.radians(self.angles[x])) * 
-        (self.sides[known] / math.sin(math.radians(self.angles[known]))))
-    except:
-      return
+    Triangle.sine_side(self.sides, self.angles, x)
 
   def ssa_sine(self, x, quadrant=1):
     """
     Finds angle opposite specified side given 2 known sides and 1 known angle
     Formula: X = asin(x * sinY / y)
     """
-    try:
-      # Finds a known side-angle pair
-      known = next(index for index, side in enumerate(self.sides)
-        if self.sides[index] is not None and self.angles[index] is not None)
-      # The above formula, where angles are converted to radians
-      reference_angle = math.degrees(math.asin(self.sides[x] * (math.sin(
-        math.radians(self.angles[known])) / self.sides[known])))
+    Triangle.sine_angle(self.sides, self.angles, x, quadrant)
+
+  # The formulas below work on lists of sides and angles. When a formula
+  # can't be used (ex. a needed value is missing, or the values can't make a
+  # triangle), they leave the lists as they are.
+
+  @staticmethod
+  def third_angle(angles):
+    """Finds the missing angle if exactly 2 angles are known (see Triangle.angle_sum())"""
+    A, B, C = angles
+    if A is None and B is not None and C is not None:
+      angles[0] = 180 - B - C
+    elif B is None and A is not None and C is not None:
+      angles[1] = 180 - A - C
+    elif C is None and A is not None and B is not None:
+      angles[2] = 180 - A - B
+
+  @staticmethod
+  def cosine_angle(sides, angles, x):
+    """Finds the angle opposite side x from all 3 sides (see Triangle.sss_cosine())"""
+    y, z = sides[x - 2], sides[x - 1]
+    if sides[x] is None or y is None or z is None or y * z == 0:
+      return
+    cosine = (y**2 + z**2 - sides[x]**2) / (2 * y * z)
+    if -1 <= cosine <= 1:
+      angles[x] = math.degrees(math.acos(cosine))
+
+  @staticmethod
+  def cosine_side(sides, angles):
+    """Finds the missing side from the other 2 sides and the angle opposite it (see Triangle.sas_cosine())"""
+    x = 0 if sides[0] is None else (1 if sides[1] is None else (2 if sides[2] is None else None))
+    if x is None or angles[x] is None:
+      return
+    y, z = sides[x - 2], sides[x - 1]
+    if y is None or z is None:
+      return
+    square = y**2 + z**2 - 2 * y * z * math.cos(math.radians(angles[x]))
+    if square >= 0:
+      sides[x] = math.sqrt(square)
+
+  @staticmethod
+  def known_pair(sides, angles):
+    """Returns the index of the first side whose opposite angle is also known (or None)"""
+    for index in range(3):
+      if sides[index] is not None and angles[index] is not None:
+        return index
+    return None
+
+  @staticmethod
+  def sine_side(sides, angles, x):
+    """Finds side x from its opposite angle and a known side-angle pair (see Triangle.aas_sine())"""
+    known = Triangle.known_pair(sides, angles)
+    if known is None or angles[x] is None:
+      return
+    sine = math.sin(math.radians(angles[known]))
+    if sine != 0:
+      sides[x] = math.sin(math.radians(angles[x])) * (sides[known] / sine)
+
+  @staticmethod
+  def sine_angle(sides, angles, x, quadrant=1):
+    """Finds angle x from its opposite side and a known side-angle pair (see Triangle.ssa_sine())"""
+    known = Triangle.known_pair(sides, angles)
+    if known is None or sides[x] is None or sides[known] == 0:
+      return
+    sine = sides[x] * (math.sin(math.radians(angles[known])) / sides[known])
+    if -1 <= sine <= 1:
       # Converts reference angle to angle in specified quadrant
-      self.angles[x] = Plane.to_quadrant(reference_angle, quadrant)
-    except:
+      angles[x] = Plane.to_quadrant(math.degrees(math.asin(sine)), quadrant)
+
+  @staticmethod
+  def solve_sides(sides, angles, case):
+    """
+    Fills in the missing sides and angles (in place) with the formulas for
+    the triangle's case
+    """
+    # SSS Triangle
+    if case == Triangle.SSS:
+      Triangle.cosine_angle(sides, angles, 0)
+      Triangle.cosine_angle(sides, angles, 1)
+      Triangle.cosine_angle(sides, angles, 2)
+
+    # SSA Triangle
+    elif case == Triangle.SSA:
+      # Uses the quadrant 1 triangle, unless only the quadrant 2 one is valid
+      chosen = None
+      for chosen in Triangle.ssa_triangles(sides, angles):
+        if Triangle.validity(*chosen) == Triangle.VALID:
+          break
+      if chosen is not None:
+        sides[:], angles[:] = chosen
+
+    # SAS Triangle
+    elif case == Triangle.SAS:
+      Triangle.cosine_side(sides, angles)
+      for index in range(3):
+        if angles[index] is None:
+          Triangle.cosine_angle(sides, angles, index)
+
+    # ASA Triangle
+    elif case == Triangle.ASA:
+      Triangle.third_angle(angles)
+      for index in range(3):
+        if sides[index] is None:
+          Triangle.sine_side(sides, angles, index)
+
+  @staticmethod
+  def ssa_triangles(sides, angles):
+    """
+    Yields the (sides, angles) lists of every triangle that fits an SSA
+    triangle's known angle X, its opposite side x, and another side y.
+
+    The Law of Sines gives the angle opposite y (Y) from sinY = y * sinX / x.
+    This sine is worked out once, and decides how many triangles there are:
+      - More than 1: no angle has that sine, so y is too long to reach the
+        third side and there's no triangle
+      - Exactly 1: Y is 90 degrees, so there's 1 (right) triangle
+      - Less than 1: arcsin gives a reference angle in quadrant 1, and Y could
+        be that angle or the one in quadrant 2 (180 - reference), since both
+        have the same sine. That's up to 2 triangles.
+    The triangle with Y in quadrant 1 is yielded first. Either one may still
+    not be valid (ex. when X + Y is over 180), which Triangle.validity() checks.
+
+    When a second angle is known too, the angles already fix the triangle's
+    shape, so the only triangle comes from the Angles Sum Theorem and the Law
+    of Cosines (like the other cases), and Triangle.validity() decides if the
+    given values fit together.
+
+    *Sines up to 0.1% over 1 count as 1, since sides rounded to a few digits
+    (ex. a=8.66, c=10, A=60) often put the sine of a right triangle just above it
+    """
+    if angles.count(None) <= 1:
+      new_sides, new_angles = sides[:], angles[:]
+      Triangle.third_angle(new_angles)
+      Triangle.cosine_side(new_sides, new_angles)
+      yield (new_sides, new_angles)
+      return
+    known_angle = 0 if angles[0] is not None else (1 if angles[1] is not None else 2)
+    known_side = next(index for index in range(3) if sides[index] is not None and index != known_angle)
+    if not sides[known_angle]:
       return
+    sine = sides[known_side] * (math.sin(math.radians(angles[known_angle])) / sides[known_angle])
+    if 1 < sine <= 1 + 1e-3:
+      sine = 1
+    if not 0 < sine <= 1:
+      return
+    reference = math.degrees(math.asin(sine))
+    for angle in ((reference, 180 - reference) if sine < 1 else (90,)):
+      new_sides, new_angles = sides[:], angles[:]
+      new_angles[known_side] = angle
+      Triangle.third_angle(new_angles)
+      Triangle.cosine_side(new_sides, new_angles)
+      yield (new_sides, new_angles)
+
+  @staticmethod
+  def solve_all(a=None, b=None, c=None, A=None, B=None, C=None):
+    """
+    Returns a tuple of every valid triangle that fits the given sides and
+    angles, each in the same format as Triangle.solve_tuple(). SSA triangles
+    (2 sides and an angle that isn't between them) can have 0, 1, or 2
+    solutions (the ambiguous case), while every other case has 0 or 1.
+
+    Ex. Triangle.solve_all(a=6, b=8, A=30) returns 2 triangles, with B at
+        about 41.8 and 138.2 degrees
+    """
+    sides = [a, b, c]
+    angles = [A, B, C]
+    if Triangle.classify(sides, angles) != Triangle.SSA:
+      solution = Triangle.solve_tuple(a, b, c, A, B, C)
+      return (solution,) if solution[9] == Triangle.VALID else ()
+    return tuple((*sides, *angles, *Triangle.properties(sides, angles), Triangle.VALID)
+      for sides, angles in Triangle.ssa_triangles(sides, angles)
+      if Triangle.validity(sides, angles) == Triangle.VALID)
+
+  @staticmethod
+  def solve_tuple(a=None, b=None, c=None, A=None, B=None, C=None):
+    """
+    Solves a triangle without making a Triangle object, and returns a plain
+    tuple (a, b, c, A, B, C, perimeter, area, height, validity), where
+    validity is a code from Triangle.validity() (Triangle.VALID if the
+    triangle could be made). This is the fastest way to solve many
+    triangles one at a time.
+
+    Ex. a, b, c, A, B, C, perimeter, area, height, validity = Triangle.solve_tuple(a=3, b=4, c=5)
+    """
+    sides = [a, b, c]
+    angles = [A, B, C]
+    Triangle.solve_sides(sides, angles, Triangle.classify(sides, angles))
+    validity = Triangle.validity(sides, angles)
+    if validity != Triangle.VALID:
+      return (*sides, *angles, 0, 0, 0, validity)
+    perimeter, area, height = Triangle.properties(sides, angles)
+    return (*sides, *angles, perimeter, area, height, validity)
+
+  @staticmethod
+  def properties(sides, angles):
+    """Returns the (perimeter, area, height) of a valid triangle"""
+    a, b, c = sides
+    area = 1/2 * a * b * math.sin(math.radians(angles[2]))
+    return (a + b + c, area, 2 * area / max(a, b, c))
 
   def solve(self):
     """
@@ -183,55 +372,13 @@ class Triangle():
     If no triangles can be made from the given information, this
     will assign the missing components to None
     """
-    # SSS Triangle
-    if self.known_sides == 3:
-      self.sss_cosine(0)
-      self.sss_cosine(1)
-      self.sss_cosine(2)
-
-    # SSA or SAS Triangle
-    elif self.known_angles >= 1 and self.known_sides == 2:
-      # Get index of the only known angle (used to determine triangle type)
-      known_angle = next(index for index, angle in enumerate(self.angles) if angle is not None)
-      # SSA Triangle
-      if(self.sides[known_angle] is not None):
-        # Gets first known side that isn't opposite of the known angle
-        known_side = next(index for index, side in enumerate(self.sides) 
-          if side is not None and index != known_angle)
-        # Tries to solve triangle using SSA formula in quadrant 1
-        self.ssa_sine(known_side, quadrant=1)
-        self.angle_sum()
-        self.sas_cosine()
-        # Tries to solve triangle using SSA formula in quadrant 2
-        # This may be needed because SSA uses arcsin, which has solutions in
-        # Q1 and QII, but may form invalid triangles when finding components afterwards
-        if not self.is_valid():
-          self.__dict__.update(self.default) # Resets angles and sides
-          self.ssa_sine(known_side, quadrant=2)
-          self.angle_sum()
-          self.sas_cosine()
-
-      # SAS Triangle
-      else:
-        self.sas_cosine()
-        for index, angle in enumerate(self.angles):
-          if angle is None:
-            self.sss_cosine(index)
-
-    # ASA Triangle
-    elif self.known_angles >= 2 and self.known_sides == 1:
-      self.angle_sum()
-      for index, side in enumerate(self.sides):
-        if side is None:
-          self.aas_sine(index)
+    Triangle.solve_sides(self.sides, self.angles, Triangle.classify(self.sides, self.angles))
 
     # Triangle Properties
     if self.is_valid():
-      self.perimeter = sum(self.sides)
-      self.area = (1/2 * self.sides[0] * self.sides[1] * math.sin(math.radians(self.angles[2])))
-      self.height = 2 * self.area / max(self.sides)
+      self.perimeter, self.area, self.height = Triangle.properties(self.sides, self.angles)
 
-  def graph(self):
+  def graph(self, output=None):
     """
     Draws triangle using matplotlib.
 
@@ -249,6 +396,9 @@ class Triangle():
       s2^2 - s1^2 = -2x2x3 + x3^2
       s2^2 - s1^2 - x3^2 = -2x2x3
       x2 = (s2^2 - s1^2 - x3^2) / -2x3 | **Solution for x2
+
+    *Pass in an output file path (ex. 'triangle.png') to save the graph
+    instead of showing it
     """
     if not self.is_valid():
       print("Triangle could not be made with given information")
@@ -263,25 +413,532 @@ class Triangle():
     points = [(0, 0), (sides[2], 0), (x, y)]
 
     # Plot triangle
-    triangle = plt.Polygon(points, color="#e55", label="Triangle")
-    plt.gca().add_patch(triangle)
-    plt.plot((points[2][0], points[2][0]), (0, points[2][1]), color="#55e") # height
+    ax = Plane.new_graph("blank", output)
+    triangle = patches.Polygon(points, color="#e55", label="Triangle")
+    ax.add_patch(triangle)
+    ax.plot((points[2][0], points[2][0]), (0, points[2][1]), color="#55e") # height
     
     # Angle Labels
-    plt.annotate(f"{round(angles[0], 3)}°", points[0])
-    plt.annotate(f"{round(angles[1], 3)}°", points[1])
-    plt.annotate(f"{round(angles[2], 3)}°", points[2])
+    ax.annotate(f"{round(angles[0], 3)}°", points[0])
+    ax.annotate(f"{round(angles[1], 3)}°", points[1])
+    ax.annotate(f"{round(angles[2], 3)}°", points[2])
     # Side Length Labels
-    plt.annotate(round(sides[0], 3), ((points[1][0] + points[2][0]) / 2, points[2][1] / 2))
-    plt.annotate(round(sides[1], 3), (points[2][0] / 2, points[2][1] / 2))
-    plt.annotate(round(sides[2], 3), (points[1][0] / 2, 0))
-    plt.annotate(round(self.height, 3), (points[2][0], points[2][1] / 2))
+    ax.annotate(round(sides[0], 3), ((points[1][0] + points[2][0]) / 2, points[2][1] / 2))
+    ax.annotate(round(sides[1], 3), (points[2][0] / 2, points[2][1] / 2))
+    ax.annotate(round(sides[2], 3), (points[1][0] / 2, 0))
+    ax.annotate(round(self.height, 3), (points[2][0], points[2][1] / 2))
     # Property Labels
-    plt.figtext(0.1, 0.9, f"Perimeter: {round(self.perimeter, 4)}")
-    plt.figtext(0.1, 0.85, f"Area: {round(self.area, 4)}")
+    ax.figure.text(0.1, 0.9, f"Perimeter: {round(self.perimeter, 4)}")
+    ax.figure.text(0.1, 0.85, f"Area: {round(self.area, 4)}")
 
     # Plot Settings
-    plt.axis('off')
-    plt.xlim([0, max(sides[2], y)])
-    plt.ylim([0, max(sides[2], y)]) 
-    plt.show()
\ No newline at end of file
+    ax.axis('off')
+    ax.set_xlim([0, max(sides[2], y)])
+    ax.set_ylim([0, max(sides[2], y)]) 
+    Plane.finish(ax, output)
+
+class TriangleSolution(tuple):
+  """
+  A solved triangle that can't be changed, made with Triangle.solve_tuple().
+  It's a tuple (a, b, c, A, B, C, perimeter, area, height, validity) whose
+  values can also be read by name (ex. solution.area). Since it has no
+  __dict__ (__slots__ is empty), it takes much less memory and time to make
+  than a Triangle.
+
+  Ex. solution = TriangleSolution(a=3, b=4, c=5)
+      solution.angles  <- (36.87, 53.13, 90.0)
+  """
+  __slots__ = ()
+
+  def __new__(cls, a=None, b=None, c=None, A=None, B=None, C=None):
+    return tuple.__new__(cls, Triangle.solve_tuple(a, b, c, A, B, C))
+
+  def __reduce__(self):
+    # Unpickles the solved values as they are. __new__ takes the inputs
+    # instead, and solving the solved values again could round them differently.
+    return (tuple.__new__, (type(self), tuple(self)))
+
+  a = property(operator.itemgetter(0))
+  b = property(operator.itemgetter(1))
+  c = property(operator.itemgetter(2))
+  A = property(operator.itemgetter(3))
+  B = property(operator.itemgetter(4))
+  C = property(operator.itemgetter(5))
+  perimeter = property(operator.itemgetter(6))
+  area = property(operator.itemgetter(7))
+  height = property(operator.itemgetter(8))
+  validity = property(operator.itemgetter(9))
+
+  @property
+  def sides(self):
+    return self[:3]
+
+  @property
+  def angles(self):
+    return self[3:6]
+
+  def is_valid(self):
+    """Checks if the triangle could be made (see Triangle.validity())"""
+    return self[9] == Triangle.VALID
+
+class TriangleCache():
+  """
+  Solves triangles through a least-recently-used (LRU) cache, so solving a
+  triangle that was solved recently is just a lookup. Solutions are returned
+  as TriangleSolution tuples, which can't be changed, so it's safe to hand
+  the same one out many times.
+
+  To let more inputs share a solution, each input is made canonical first:
+    - Every value is rounded to 'digits' decimal places, so values that only
+      differ by rounding errors (ex. 0.1 + 0.2 and 0.3) count as the same
+    - Triangles that are the same except for their labels' rotation (ex.
+      a=3, b=4, c=5 and a=4, b=5, c=3) are solved once, and the solution's
+      labels are rotated back for each input
+
+  Ex. cache = TriangleCache(maxsize=256)
+      cache.solve(a=3, b=4, c=5).area
+      cache.cache_info()  <- hits, misses, maxsize, and currsize
+
+  *Rotations aren't collapsed when 2 sides and 2 or more angles are given,
+  since Triangle picks the formulas to use based on which angle comes first
+  """
+  def __init__(self, maxsize=1024, digits=9):
+    self.maxsize = maxsize
+    self.digits = digits
+    # Each cache gets its own LRU (and statistics)
+    self.solve_canonical = functools.lru_cache(maxsize=maxsize)(TriangleSolution)
+
+  def solve(self, a=None, b=None, c=None, A=None, B=None, C=None):
+    """Returns the TriangleSolution of a triangle, solving it only if it isn't cached"""
+    # Values that can't be rounded or compared (ex. strings) skip the cache,
+    # so they're handled the same way as by Triangle.solve_tuple()
+    for value in (a, b, c, A, B, C):
+      if value is not None and not isinstance(value, numbers.Real):
+        return TriangleSolution(a, b, c, A, B, C)
+    digits = self.digits
+    values = (None if a is None else round(a, digits), None if b is None else round(b, digits),
+      None if c is None else round(c, digits), None if A is None else round(A, digits),
+      None if B is None else round(B, digits), None if C is None else round(C, digits))
+    shift = TriangleCache.rotation(values)
+    if shift == 0:
+      return self.solve_canonical(*values)
+    # Rotated so that side 'shift' comes first
+    solution = self.solve_canonical(*TriangleCache.rotate(values, shift))
+    return tuple.__new__(TriangleSolution, TriangleCache.rotate(solution, -shift))
+
+  def cache_info(self):
+    """Returns the cache's (hits, misses, maxsize, currsize)"""
+    return self.solve_canonical.cache_info()
+
+  def cache_clear(self):
+    """Removes every cached solution and resets the statistics"""
+    self.solve_canonical.cache_clear()
+
+  @staticmethod
+  def rotate(values, shift):
+    """
+    Rotates the sides and angles of a tuple (a, b, c, A, B, C, ...) so that
+    the side and angle at index 'shift' come first. Anything after the
+    angles is left alone.
+    """
+    sides = values[shift % 3:3] + values[:shift % 3]
+    angles = values[3 + shift % 3:6] + values[3:3 + shift % 3]
+    return sides + angles + tuple(values[6:])
+
+  @staticmethod
+  def rotation(values):
+    """Returns the shift (0, 1, or 2) of the smallest rotation of the sides and angles"""
+    a, b, c, A, B, C = values
+    if (a is not None) + (b is not None) + (c is not None) == 2 and (A is not None) + (B is not None) + (C is not None) >= 2:
+      return 0
+    # Unknown values sort first
+    a, b, c = (-math.inf if a is None else a), (-math.inf if b is None else b), (-math.inf if c is None else c)
+    A, B, C = (-math.inf if A is None else A), (-math.inf if B is None else B), (-math.inf if C is None else C)
+    first, second, third = (a, b, c, A, B, C), (b, c, a, B, C, A), (c, a, b, C, A, B)
+    if first <= second and first <= third:
+      return 0
+    return 1 if second <= third else 2
+
+class TriangleBatch():
+  """
+  Solves many triangles at once with numpy, the same way Triangle does for
+  a single one. Each component is a column (a list or array) with one
+  value per triangle, where NaN marks the unknown values.
+
+  Ex. batch = TriangleBatch(a=[4, 10, 5], b=[6, 6, 8], c=[8, nan, nan],
+        C=[nan, 50, nan], B=[nan, nan, 40])
+
+  The triangles are sorted into cases (SSS, SAS, SSA, and ASA) with the
+  same rules as Triangle.solve(), and each case is solved for all of its
+  triangles together, so there's no Python loop over the triangles.
+
+  Solved Properties (one row or value per triangle):
+    - sides: array of [a, b, c]
+    - angles: array of [A, B, C] (in degrees)
+    - perimeter, area, height (0 when the triangle isn't valid)
+    - valid: whether the triangle could be made (same as Triangle.is_valid())
+    - case: which case the triangle was solved as (see the codes below)
+  """
+  # Case codes (see Triangle.classify())
+  UNSOLVABLE, SSS, SAS, SSA, ASA = Triangle.UNSOLVABLE, Triangle.SSS, Triangle.SAS, Triangle.SSA, Triangle.ASA
+
+  def __init__(self, a=None, b=None, c=None, A=None, B=None, C=None):
+    # Components that aren't given at all are unknown for every triangle
+    columns = np.broadcast_arrays(*[np.asarray(np.nan if column is None else column, dtype=float)
+      for column in (a, b, c, A, B, C)])
+    self.sides = np.stack(columns[:3], axis=-1).reshape(-1, 3).copy()
+    self.angles = np.stack(columns[3:], axis=-1).reshape(-1, 3).copy()
+    self.case = TriangleBatch.classify(self.sides, self.angles)
+    self.solve()
+
+  def __len__(self):
+    return len(self.case)
+
+  @staticmethod
+  def classify(sides, angles):
+    """Returns the case code of each triangle"""
+    known_sides = ~np.isnan(sides)
+    known_angles = ~np.isnan(angles)
+    side_count = known_sides.sum(axis=1)
+    angle_count = known_angles.sum(axis=1)
+    # Like Triangle.solve(), SSA and SAS are told apart by whether the first
+    # known angle is opposite a known side
+    first_angle = np.argmax(known_angles, axis=1)
+    opposite_known = known_sides[np.arange(len(sides)), first_angle]
+    case = np.full(len(sides), TriangleBatch.UNSOLVABLE, dtype=np.int8)
+    case[side_count == 3] = TriangleBatch.SSS
+    two_sides = (side_count == 2) & (angle_count >= 1)
+    case[two_sides & ~opposite_known] = TriangleBatch.SAS
+    case[two_sides & opposite_known] = TriangleBatch.SSA
+    case[(side_count == 1) & (angle_count >= 2)] = TriangleBatch.ASA
+    return case
+
+  def solve(self):
+    """
+    Solves every triangle, one case at a time. Each case works on a copy of
+    its rows, which are then written back.
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+      for case, method in [(TriangleBatch.SSS, TriangleBatch.solve_sss),
+          (TriangleBatch.SAS, TriangleBatch.solve_sas),
+          (TriangleBatch.SSA, TriangleBatch.solve_ssa),
+          (TriangleBatch.ASA, TriangleBatch.solve_asa)]:
+        rows = np.flatnonzero(self.case == case)
+        if len(rows) > 0:
+          self.sides[rows], self.angles[rows] = method(self.sides[rows], self.angles[rows])
+
+      # Triangle Properties
+      self.valid = TriangleBatch.check(self.sides, self.angles)
+      sides = np.where(self.valid[:, None], self.sides, 0)
+      self.perimeter = sides.sum(axis=1)
+      self.area = 1/2 * sides[:, 0] * sides[:, 1] * np.sin(np.radians(np.where(self.valid, self.angles[:, 2], 0)))
+      self.height = np.where(self.valid, 2 * self.area / sides.max(axis=1), 0)
+
+  @staticmethod
+  def solve_sss(sides, angles):
+    """Finds every angle from the 3 known sides (see Triangle.sss_cosine())"""
+    return (sides, TriangleBatch.sss_cosine(sides, angles))
+
+  @staticmethod
+  def solve_sas(sides, angles):
+    """Finds the missing side, and then the missing angles (see Triangle.sas_cosine())"""
+    TriangleBatch.sas_cosine(sides, angles)
+    return (sides, TriangleBatch.sss_cosine(sides, angles, only_missing=True))
+
+  @staticmethod
+  def solve_ssa(sides, angles):
+    """
+    Finds the angle opposite the other known side with the Law of Sines,
+    and then the rest of the triangle (see Triangle.ssa_triangles()). Like
+    Triangle.solve(), the angle is tried in quadrant 1 first, and the
+    triangles that aren't valid use quadrant 2 instead. Rows with 2 known
+    angles are solved from their angles instead.
+    """
+    rows = np.arange(len(sides))
+    fixed = (~np.isnan(angles)).sum(axis=1) >= 2
+    fixed_sides, fixed_angles = sides[fixed], angles[fixed]
+    TriangleBatch.angle_sum(fixed_angles)
+    TriangleBatch.sas_cosine(fixed_sides, fixed_angles)
+    known_sides = ~np.isnan(sides)
+    known_angle = np.argmax(~np.isnan(angles), axis=1)
+    # First known side that isn't opposite the known angle
+    known_side = np.argmax(known_sides & (np.arange(3) != known_angle[:, None]), axis=1)
+    sine = sides[rows, known_side] * np.sin(np.radians(angles[rows, known_angle])) / sides[rows, known_angle]
+    sine[(sine > 1) & (sine <= 1 + 1e-3)] = 1
+    # Rows without a triangle are left as they are
+    solvable = (sine > 0) & (sine <= 1) & ~fixed
+    reference = np.degrees(np.arcsin(np.where(solvable, sine, 0)))
+    solutions = []
+    for quadrant_angle in (reference, 180 - reference):
+      new_sides, new_angles = sides.copy(), angles.copy()
+      new_angles[rows, known_side] = np.where(solvable, quadrant_angle, angles[rows, known_side])
+      TriangleBatch.angle_sum(new_angles)
+      TriangleBatch.sas_cosine(new_sides, new_angles)
+      new_sides[~solvable], new_angles[~solvable] = sides[~solvable], angles[~solvable]
+      solutions.append((new_sides, new_angles))
+    (sides, angles), (sides2, angles2) = solutions
+    retry = ~TriangleBatch.check(sides, angles)
+    sides[retry], angles[retry] = sides2[retry], angles2[retry]
+    sides[fixed], angles[fixed] = fixed_sides, fixed_angles
+    return (sides, angles)
+
+  @staticmethod
+  def solve_asa(sides, angles):
+    """Finds the third angle, and then the missing sides (see Triangle.aas_sine())"""
+    TriangleBatch.angle_sum(angles)
+    rows = np.arange(len(sides))
+    # First side with a known opposite angle
+    known = np.argmax(~np.isnan(sides) & ~np.isnan(angles), axis=1)
+    ratio = sides[rows, known] / np.sin(np.radians(angles[rows, known]))
+    missing = np.isnan(sides)
+    sides[missing] = (np.sin(np.radians(angles)) * ratio[:, None])[missing]
+    return (sides, angles)
+
+  @staticmethod
+  def angle_sum(angles):
+    """Finds the third angle of the triangles with exactly 2 known angles (X = 180 - Y - Z)"""
+    missing = np.isnan(angles)
+    rows = missing.sum(axis=1) == 1
+    third = 180 - np.nansum(angles, axis=1)
+    angles[missing & rows[:, None]] = third[rows]
+
+  @staticmethod
+  def sss_cosine(sides, angles, only_missing=False):
+    """
+    Finds each angle from the 3 sides with the Law of Cosines. Angles that
+    can't be found (the sides can't make a triangle) keep their old values.
+    Formula: X = acos(y^2 + z^2 - x^2 / 2yz)
+    """
+    for x in range(3):
+      y, z = sides[:, (x + 1) % 3], sides[:, (x + 2) % 3]
+      angle = np.degrees(np.arccos((y**2 + z**2 - sides[:, x]**2) / (2 * y * z)))
+      found = ~np.isnan(angle)
+      if only_missing:
+        found &= np.isnan(angles[:, x])
+      angles[found, x] = angle[found]
+    return angles
+
+  @staticmethod
+  def sas_cosine(sides, angles):
+    """
+    Finds the missing side of each triangle from the other 2 sides and the
+    angle opposite it, with the Law of Cosines
+    Formula: x = sqrt(y^2 + z^2 - 2yz*cosX)
+    """
+    rows = np.flatnonzero(np.isnan(sides).any(axis=1))
+    x = np.argmax(np.isnan(sides[rows]), axis=1)
+    y, z = sides[rows, (x + 1) % 3], sides[rows, (x + 2) % 3]
+    sides[rows, x] = np.sqrt(y**2 + z**2 - 2 * y * z * np.cos(np.radians(angles[rows, x])))
+
+  @staticmethod
+  def check(sides, angles):
+    """Returns whether each triangle is valid, with the same tests as Triangle.is_valid()"""
+    with np.errstate(invalid="ignore"):
+      # Missing components, and non-positive sides or angles
+      valid = (sides > 0).all(axis=1) & (angles > 0).all(axis=1)
+      # Angles add to 180
+      valid &= np.abs(angles.sum(axis=1) - 180) <= 2
+      # Longest side is opposite of largest angle. Ties (ex. equilateral
+      # triangles) can be broken either way by rounding, so the angle only
+      # needs to be close to the largest one
+      opposite = angles[np.arange(len(angles)), np.argmax(sides, axis=1)]
+      valid &= TriangleBatch.isclose(opposite, angles.max(axis=1), 0.01)
+      # Longest side isn't too big nor small
+      ordered = np.sort(sides, axis=1)
+      valid &= (np.abs(ordered[:, 1] - ordered[:, 0]) < ordered[:, 2]) & (ordered[:, 2] < ordered[:, 1] + ordered[:, 0])
+      # Isosceles triangles have congruent sides and base angles
+      for index in range(3):
+        next_index = (index + 1) % 3
+        congruent_sides = TriangleBatch.isclose(sides[:, index], sides[:, next_index], 0.01)
+        congruent_angles = TriangleBatch.isclose(angles[:, index], angles[:, next_index], 0.01)
+        valid &= congruent_sides == congruent_angles
+    return valid
+
+  @staticmethod
+  def isclose(x, y, abs_tol):
+    """Same as math.isclose(x, y, abs_tol=abs_tol) for arrays"""
+    return np.abs(x - y) <= np.maximum(1e-9 * np.maximum(np.abs(x), np.abs(y)), abs_tol)
+
+class TriangleFile():
+  """
+  Solves files of triangles that can be bigger than memory. Each line of
+  the input is one triangle, either as a CSV row (with a header naming the
+  'a', 'b', 'c', 'A', 'B', and 'C' columns) or as a JSON object (JSON Lines).
+  Unknown values are left empty in CSV files and left out (or null) in
+  JSON Lines files.
+
+  Ex. a,b,c,A,B,C        {"a": 3, "b": 4, "c": 5}
+      3,4,5,,,           {"id": 7, "a": 10, "b": 6, "C": 50}
+      10,6,,,,50
+
+  The rows are read in chunks of 'chunk_rows', and each chunk is parsed
+  and solved (with TriangleBatch) in a worker process. CSV rows are split
+  up before they're sent to the workers, since a quoted field can span
+  several lines. Solved chunks are
+  written to the output in the same order as the input. Like WorkerPool,
+  only a few chunks are held at a time, so reading waits for the workers
+  (and the output file) to catch up.
+
+  *Other columns or keys (ex. 'id') are copied to the output unchanged
+  *csv, json, and WorkerPool are only imported when a file is solved, so
+  importing Triangle doesn't load them
+  """
+  COMPONENTS = ("a", "b", "c", "A", "B", "C")
+  SOLVED = COMPONENTS + ("perimeter", "area", "height", "valid")
+
+  def __init__(self, workers=None, max_pending=None, chunk_rows=2**16):
+    self.workers = workers
+    self.max_pending = max_pending
+    self.chunk_rows = chunk_rows
+
+  def solve(self, source, destination, file_format=None, errors=None, progress=None):
+    """
+    Solves every triangle in the source file and writes them to the
+    destination file (in the same format). Returns a dictionary of stats
+    with the number of 'rows' solved, 'invalid' triangles, 'chunks',
+    'failed_chunks', 'seconds', and 'rows_per_second'.
+
+    - file_format is 'csv' or 'jsonl'. By default, it's found from the
+      source's file extension.
+    - errors is an optional file path to write error records to, as JSON
+      Lines. Each chunk with problems gets one record with its 'chunk'
+      number, its 'lines' (first and last line numbers), the line numbers of
+      its 'invalid' triangles, and the 'errors' of lines that couldn't be
+      read. Chunks that fail entirely get an 'error' message instead, and
+      none of their rows are written.
+    - progress is an optional function that's called as
+      progress(done, total, failed) after each chunk (total is always None,
+      since the number of lines isn't known ahead of time)
+    """
+    import csv
+    import json
+    from src.pool import WorkerPool
+    file_format = file_format or TriangleFile.file_format(source)
+    stats = {"rows": 0, "invalid": 0, "chunks": 0, "failed_chunks": 0}
+    start = time.perf_counter()
+    with open(source, newline="") as input_file, open(destination, "w", newline="") as output, \
+        (open(errors, "w") if errors is not None else io.StringIO()) as error_file:
+      header = None
+      rows = input_file
+      if file_format == "csv":
+        rows = csv.reader(input_file)
+        header = next(rows, [])
+        if not set(header) & set(TriangleFile.COMPONENTS):
+          raise ValueError("CSV header doesn't name any of the columns a, b, c, A, B, or C")
+        extras = [name for name in header if name not in TriangleFile.COMPONENTS]
+        csv.writer(output).writerow(extras + list(TriangleFile.SOLVED))
+      with WorkerPool(self.workers, self.max_pending) as pool:
+        chunks = TriangleFile.read_chunks(rows, file_format, header, self.chunk_rows)
+        for index, result, error in pool.map(TriangleFile.solve_chunk, chunks):
+          stats["chunks"] += 1
+          if error is not None:
+            stats["failed_chunks"] += 1
+            record = {"chunk": index, "error": f"{type(error).__name__}: {error}"}
+          else:
+            text, record = result
+            output.write(text)
+            record = {"chunk": index, **record}
+            stats["rows"] += record.pop("rows")
+            stats["invalid"] += len(record["invalid"])
+            record = record if record["invalid"] or record["errors"] else None
+          if record is not None:
+            error_file.write(json.dumps(record) + "\n")
+          if progress is not None:
+            progress(stats["chunks"], None, stats["failed_chunks"])
+    stats["seconds"] = time.perf_counter() - start
+    stats["rows_per_second"] = stats["rows"] / stats["seconds"] if stats["seconds"] > 0 else 0
+    return stats
+
+  @staticmethod
+  def file_format(path):
+    """Returns the format of a file ('csv' or 'jsonl') from its extension"""
+    extension = path.rsplit(".", 1)[-1].lower()
+    if extension == "csv":
+      return "csv"
+    if extension in ("jsonl", "ndjson", "json"):
+      return "jsonl"
+    raise ValueError(f"can't tell the format of '{path}', pass in a file_format of 'csv' or 'jsonl'")
+
+  @staticmethod
+  def read_chunks(rows, file_format, header, chunk_rows):
+    """
+    Yields tasks of (file_format, header, line numbers, last line number,
+    rows) for the workers. rows is a csv.reader for CSV files (which counts
+    the lines it's read in line_num), or the lines of a JSON Lines file.
+    """
+    if file_format == "csv":
+      def numbered():
+        # Each row starts on the line after the end of the one before it
+        start = rows.line_num + 1
+        for row in rows:
+          yield (start, row)
+          start = rows.line_num + 1
+      numbered_rows = numbered()
+    else:
+      numbered_rows = enumerate(rows, 1)
+    while chunk := list(itertools.islice(numbered_rows, chunk_rows)):
+      numbers = [number for number, _ in chunk]
+      last_line = rows.line_num if file_format == "csv" else numbers[-1]
+      yield (file_format, header, numbers, last_line, [row for _, row in chunk])
+
+  @staticmethod
+  def solve_chunk(task):
+    """
+    Parses and solves a chunk of rows in a worker. Returns the solved rows
+    as text, along with an error record of the chunk.
+    """
+    import csv
+    import json
+    file_format, header, line_numbers, last_line, rows = task
+    # Known values of each parsed row, the line numbers of those rows, and
+    # their columns or keys that aren't triangle components
+    values = []
+    numbers = []
+    extras = []
+    problems = {}
+    if file_format == "csv":
+      # Components without a column read an empty field added to the end of each row
+      positions = [header.index(name) if name in header else len(header) for name in TriangleFile.COMPONENTS]
+      others = [index for index, name in enumerate(header) if name not in TriangleFile.COMPONENTS]
+    for number, row in zip(line_numbers, rows):
+      try:
+        if not row:
+          continue
+        if file_format == "csv":
+          if len(row) != len(header):
+            raise ValueError(f"expected {len(header)} fields but found {len(row)}")
+          row.append("")
+          values.append([float(row[index]) if row[index].strip() else math.nan for index in positions])
+          extras.append([row[index] for index in others])
+        else:
+          row = json.loads(row) if row.strip() else None
+          if row is None:
+            continue
+          if not isinstance(row, dict):
+            raise ValueError("line isn't a JSON object")
+          known = [row.pop(name, None) for name in TriangleFile.COMPONENTS]
+          values.append([math.nan if value is None else float(value) for value in known])
+          extras.append(row)
+      except (ValueError, TypeError) as error:
+        problems[str(number)] = f"{type(error).__name__}: {error}"
+        continue
+      numbers.append(number)
+
+    batch = TriangleBatch(*np.array(values, dtype=float).reshape(-1, 6).T)
+    solved = np.concatenate((batch.sides, batch.angles, batch.perimeter[:, None],
+      batch.area[:, None], batch.height[:, None]), axis=1).tolist()
+    valid = batch.valid.tolist()
+    text = io.StringIO()
+    if file_format == "csv":
+      # Numbers are written with repr() so they read back exactly
+      csv.writer(text).writerows([extra + ["" if value != value else repr(value) for value in row] +
+        ["true" if is_valid else "false"] for extra, row, is_valid in zip(extras, solved, valid)])
+    else:
+      for extra, row, is_valid in zip(extras, solved, valid):
+        extra.update(zip(TriangleFile.SOLVED, [None if value != value else value for value in row]))
+        extra["valid"] = is_valid
+        text.write(json.dumps(extra) + "\n")
+    invalid = [number for number, is_valid in zip(numbers, valid) if not is_valid]
+    record = {"lines": [line_numbers[0], last_line], "invalid": invalid,
+      "errors": problems, "rows": len(numbers)}
+    return (text.getvalue(), record)
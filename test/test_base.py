@@ -1,4 +1,8 @@
 import unittest
+import os
+import tempfile
+import random
+import numpy as np
 from src.base import Base
 
 class TestBase(unittest.TestCase):
@@ -11,11 +15,112 @@ class TestBase(unittest.TestCase):
   def test_convert_invalid(self):
     self.assertAlmostEqual(Base.convert(96, 8, 5), None, places=2)
 
+  def test_convert_letters(self):
+    self.assertEqual(Base.convert(255, 10, 16), "ff")
+    self.assertEqual(Base.convert("FF", 16, 2), "11111111")
+    self.assertEqual(Base.convert("zz", 36, 10), "1295")
+    self.assertEqual(Base.convert("1g", 16, 10), None)
+
+  def test_convert_negative(self):
+    # Negative numbers used to loop forever in Base.split_digits()
+    self.assertRaises(ValueError, Base.convert, -5, 10, 2)
+    self.assertRaises(ValueError, Base.to_string, -255, 16)
+    self.assertRaises(ValueError, Base.convert_many, [2**70, -5], 10, 2)
+    # Both the vectorized and one-at-a-time paths of convert_many() raise too
+    self.assertRaises(ValueError, Base.convert_many, [-5], 10, 2)
+    self.assertRaises(ValueError, Base.convert_many, np.array([3, -5]), 10, 2)
+    self.assertRaises(ValueError, Base.convert_many, np.array([2.0, -5.0]), 10, 2)
+    # A '-' in a digit string is just a digit that isn't allowed
+    self.assertIsNone(Base.convert("-5", 10, 2))
+    self.assertIsNone(Base.convert_many(["-5"], 10, 2))
+
+  def test_convert_huge(self):
+    number = random.Random(1).getrandbits(200000)
+    digits = format(number, "x")
+    self.assertEqual(Base.convert(digits, 16, 8), format(number, "o"))
+    self.assertEqual(Base.to_base_10(digits, 16), number)
+
+  def test_convert_power_of_two(self):
+    self.assertEqual(Base.convert("75", 8, 16), "3d")
+    self.assertEqual(Base.convert(1010, 2, 4), 22)
+    self.assertEqual(Base.convert("0003D", 16, 32), "1t")
+    number = random.Random(2).getrandbits(100000)
+    for old_base, new_base in [(2, 16), (16, 8), (32, 4), (8, 32)]:
+      digits = Base.to_string(number, old_base)
+      self.assertEqual(Base.convert(digits, old_base, new_base), Base.to_string(number, new_base))
+
+  def test_regroup(self):
+    digits = Base.to_string(3**4000, 8)
+    chunks = [digits[start:start + 7] for start in range(0, len(digits), 7)]
+    expected = Base.to_string(3**4000, 16)
+    self.assertEqual("".join(Base.regroup(iter(chunks), 8, 16)), expected)
+    self.assertEqual("".join(Base.regroup(iter(chunks), 8, 16, len(digits))), expected)
+    self.assertEqual("".join(Base.regroup(["F", "f"], 16, 2)), "1" * 8)
+    self.assertEqual("".join(Base.regroup(["000"], 2, 8)), "0")
+    with self.assertRaises(ValueError):
+      list(Base.regroup(["19"], 8, 2))
+
+  def test_convert_many(self):
+    self.assertEqual(Base.convert_many([53, 106, 7], 8, 5).tolist(), [133, 240, 12])
+    self.assertEqual(Base.convert_many(np.array([255, 0, 10]), 10, 16).tolist(), ["ff", "0", "a"])
+    self.assertEqual(Base.convert_many(["ff", "7F", "0"], 16, 10).tolist(), ["255", "127", "0"])
+    self.assertEqual(Base.convert_many(np.array([[1, 2], [3, 4]]), 10, 2).tolist(), [[1, 10], [11, 100]])
+
+  def test_convert_many_invalid(self):
+    self.assertIsNone(Base.convert_many([53, 96], 8, 5))
+    self.assertIsNone(Base.convert_many(["1f", "1g"], 16, 10))
+
+  def test_convert_many_matches_convert(self):
+    values = np.random.default_rng(1).integers(0, 10**12, 1000)
+    for new_base in [2, 7, 16, 36]:
+      self.assertEqual(Base.convert_many(values, 10, new_base).tolist(),
+        [str(Base.convert(int(value), 10, new_base)) if new_base > 10 else Base.convert(int(value), 10, new_base)
+          for value in values])
+    # Past 64 bits, the values are converted one at a time
+    self.assertEqual(Base.convert_many([2**70, 5], 10, 8).tolist(), [Base.convert(2**70, 10, 8), 5])
+
+  def test_convert_stream(self):
+    number = random.Random(3).getrandbits(100000)
+    for old_base, new_base in [(10, 7), (36, 10), (16, 8), (8, 2)]:
+      digits = Base.to_string(number, old_base)
+      chunks = (digits[start:start + 999] + "\n" for start in range(0, len(digits), 999))
+      stats = {}
+      output = "".join(Base.convert_stream(chunks, old_base, new_base, stats=stats))
+      self.assertEqual(output, Base.to_string(number, new_base))
+      self.assertEqual(stats["digits_read"], len(digits))
+      self.assertEqual(stats["digits_written"], len(output))
+    with self.assertRaises(ValueError):
+      list(Base.convert_stream(["12", "9"], 8, 10))
+
+  def test_convert_file(self):
+    number = random.Random(4).getrandbits(50000)
+    with tempfile.TemporaryDirectory() as folder:
+      source, destination = os.path.join(folder, "in.txt"), os.path.join(folder, "out.txt")
+      for old_base, new_base in [(10, 16), (8, 16)]:
+        with open(source, "w") as file:
+          file.write(Base.to_string(number, old_base) + "\n")
+        updates = []
+        stats = Base.convert_file(source, destination, old_base, new_base, chunk_size=1000, progress=updates.append)
+        with open(destination) as file:
+          self.assertEqual(file.read(), format(number, "x"))
+        self.assertTrue(len(updates) > 0)
+        self.assertEqual(stats["digits_written"], len(format(number, "x")))
+
   def test_to_base_10(self):
     self.assertAlmostEqual(Base.to_base_10(63, 7), 45, places=2)
 
   def test_from_base_10(self):
     self.assertAlmostEqual(Base.from_base_10(164, 4), 2210, places=2)
 
+  def test_from_base_10_exact(self):
+    # Past 2^53, dividing with floats would round away the last digits
+    self.assertEqual(Base.from_base_10(2**64 + 1, 2), int("1" + "0" * 63 + "1"))
+    self.assertEqual(Base.from_base_10(0, 3), 0)
+
+  def test_to_string(self):
+    for base in [2, 3, 10, 16, 36]:
+      for number in [1, base**32 - 1, base**32, 7**1500 + 17]:
+        self.assertEqual(int(Base.to_string(number, base), base), number)
+
 if __name__ == '__main__':
-  unittest.main()
\ No newline at end of file
+  unittest.main()
@@ -0,0 +1,64 @@
+import io
+import json
+import subprocess
+import sys
+import unittest
+from src.cli import Cli
+
+class TestCli(unittest.TestCase):
+  REQUESTS = [
+    {"id": 1, "op": "triangle.solve", "args": {"a": 3, "b": 4, "c": 5}},
+    {"id": 2, "op": "base.convert", "args": {"number": "ff", "old_base": 16, "new_base": 2}},
+    {"id": 3, "op": "matrix.solve", "args": {"matrix": [[2, 1], [1, 3]], "vector": [3, 5]}},
+    {"id": 4, "op": "matrix.determinant", "args": {"matrix": [[2, 1], [1, 3]]}},
+    {"id": 5, "op": "probability.binomial", "args": {"n": 5, "r": 2, "success_chance": 0.5, "r_meaning": "max"}},
+    {"id": 6, "op": "matrix.inverse", "args": {"matrix": [[1, 2], [2, 4]]}},
+    {"id": 7, "op": "spiral.solve"},
+  ]
+
+  def run_requests(self, **options):
+    lines = [json.dumps(request) + "\n" for request in TestCli.REQUESTS] + ["\n", "not json\n"]
+    output = io.StringIO()
+    Cli.run(lines, output, **options)
+    return [json.loads(line) for line in output.getvalue().splitlines()]
+
+  def test_run(self):
+    responses = self.run_requests()
+    self.assertEqual([response["id"] for response in responses], [1, 2, 3, 4, 5, 6, 7, None])
+    self.assertEqual(responses[0]["result"]["C"], 90)
+    self.assertTrue(responses[0]["result"]["valid"])
+    self.assertEqual(responses[1]["result"], "11111111")
+    self.assertEqual([round(x, 6) for x in responses[2]["result"]], [0.8, 1.4])
+    self.assertEqual(responses[3]["result"], 5)
+    self.assertAlmostEqual(responses[4]["result"], 0.5)
+    self.assertTrue(responses[5]["error"].startswith("ZeroDivisionError"))
+    self.assertIn("unknown op", responses[6]["error"])
+    self.assertIn("error", responses[7])
+
+  def test_workers(self):
+    self.assertEqual(self.run_requests(workers=2, batch_size=2), self.run_requests())
+    unordered = self.run_requests(workers=2, ordered=False, batch_size=3)
+    self.assertEqual(sorted(map(json.dumps, unordered)), sorted(map(json.dumps, self.run_requests())))
+
+  def test_unserializable_result(self):
+    # 10^4000 in base 2 is an int too long for JSON, which only fails its own request
+    lines = [json.dumps({"id": 1, "op": "base.convert", "args": {"number": 10**4000, "old_base": 10, "new_base": 2}}),
+      json.dumps(TestCli.REQUESTS[1])]
+    for workers in (1, 2):
+      output = io.StringIO()
+      Cli.run(lines, output, workers=workers)
+      responses = [json.loads(line) for line in output.getvalue().splitlines()]
+      self.assertEqual([response["id"] for response in responses], [1, 2])
+      self.assertTrue(responses[0]["error"].startswith("ValueError"))
+      self.assertEqual(responses[1]["result"], "11111111")
+
+  def test_lazy_imports(self):
+    # A job of triangles shouldn't load any other solver
+    script = ("import io, sys\nfrom src.cli import Cli\n"
+      "Cli.run(['{\"op\": \"triangle.solve\", \"args\": {\"a\": 3, \"b\": 4, \"c\": 5}}'], io.StringIO())\n"
+      "print(sorted(name for name in ('src.matrix', 'src.base', 'src.probability', 'src.triangle') if name in sys.modules))")
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+    self.assertEqual(output.strip(), "['src.triangle']")
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,59 @@
+import os
+import pstats
+import subprocess
+import sys
+import tempfile
+import unittest
+from src.instrument import Instrument
+from src.matrix import Matrix
+from src.probability import Probability
+from src.triangle import Triangle
+
+class TestInstrument(unittest.TestCase):
+  def test_counts(self):
+    matrix = Matrix([[1, 2, 3], [4, 5, 6], [7, 8, 10]])
+    with Instrument() as instrument:
+      matrix.determinant()
+      matrix * matrix
+      Triangle(a=3, b=4, c=5)
+    stats = instrument.stats
+    # 1 call for the 3x3 matrix, 3 for its 2x2 minors, and 6 for their 1x1 minors
+    self.assertEqual(stats["Matrix.determinant"]["calls"], 10)
+    self.assertEqual(stats["Matrix.determinant"]["primitive_calls"], 1)
+    self.assertEqual(stats["Matrix.determinant"]["max_depth"], 3)
+    self.assertEqual(stats["Matrix.__mul__"]["ops"], 2 * 3 * 3 * 3)
+    self.assertEqual(stats["Triangle.solve"]["calls"], 1)
+    self.assertGreaterEqual(stats["Matrix.determinant"]["total"], stats["Matrix.cofactor"]["total"])
+    self.assertIn("Matrix.cofactor", instrument.report())
+
+  def test_disable(self):
+    original = Matrix.__dict__["determinant"]
+    binomial = Probability.__dict__["binomial"]
+    with Instrument():
+      self.assertIsNot(Matrix.__dict__["determinant"], original)
+      self.assertIsInstance(Probability.__dict__["binomial"], staticmethod)
+    self.assertIs(Matrix.__dict__["determinant"], original)
+    self.assertIs(Probability.__dict__["binomial"], binomial)
+
+  def test_dump(self):
+    with Instrument() as instrument:
+      Matrix([[2, 1], [1, 3]]).inverse()
+    with tempfile.TemporaryDirectory() as folder:
+      path = os.path.join(folder, "matrix.prof")
+      instrument.dump(path)
+      functions = {name: row for (_, _, name), row in pstats.Stats(path).stats.items()}
+    self.assertEqual(functions["Matrix.inverse"][1], 1)
+    self.assertIn(("Matrix.determinant"), [caller[2] for caller in functions["Matrix.cofactor"][4]])
+    # Caller entries have the total calls first, like cProfile's, so recursive calls show as total/primitive
+    determinant = functions["Matrix.determinant"]
+    calls, primitive = next(edge for caller, edge in determinant[4].items() if caller[2] == "Matrix.cofactor")[:2]
+    self.assertGreater(calls, primitive)
+
+  def test_environment(self):
+    script = "from src.matrix import Matrix\nMatrix([[1, 2], [3, 4]]).determinant()"
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True,
+      env=dict(os.environ, MATHKIT_INSTRUMENT="1"))
+    self.assertIn("Matrix.determinant", output.stderr)
+
+if __name__ == '__main__':
+  unittest.main()
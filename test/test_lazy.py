@@ -0,0 +1,32 @@
+import os
+import subprocess
+import sys
+import unittest
+from src.lazy import LazyModule
+
+# Most time (in seconds) that a headless 'import src.matrix' can take
+IMPORT_BUDGET = 0.5
+
+class TestLazy(unittest.TestCase):
+  def test_lazy_module(self):
+    lazy_json = LazyModule("json")
+    self.assertEqual(lazy_json.dumps([1, 2]), "[1, 2]")
+
+  def test_import_time(self):
+    # -X importtime prints 'import time: self [us] | cumulative | package'
+    # to stderr for every module that gets imported
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import src.matrix"],
+      cwd=root, capture_output=True, text=True, env={**os.environ, "MPLBACKEND": "Agg"})
+    self.assertEqual(result.returncode, 0, result.stderr)
+    imported = {}
+    for line in result.stderr.splitlines():
+      if line.startswith("import time:") and "|" in line:
+        _, cumulative, package = line.split("|")
+        if cumulative.strip().isdigit():
+          imported[package.strip()] = int(cumulative) / 1e6
+    self.assertFalse([package for package in imported if package.startswith("matplotlib")])
+    self.assertLess(imported["src.matrix"], IMPORT_BUDGET)
+
+if __name__ == '__main__':
+  unittest.main()
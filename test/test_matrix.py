@@ -1,3 +1,5 @@
+import os
+import tempfile
 import unittest
 from unittest.mock import patch
 from src.matrix import Matrix
@@ -151,5 +153,14 @@ class TestMatrix(unittest.TestCase):
     except:
       self.fail("An error has occurred while graphing 3D transformation")
 
+  def test_graph_output(self):
+    with tempfile.TemporaryDirectory() as folder:
+      Matrix([[1, -2], [5, 3]]).graph_vector(output=os.path.join(folder, "vector2.png"))
+      Matrix([[1, -2], [5, 3], [-3, 1]]).graph_vector(output=os.path.join(folder, "vector3.png"))
+      Matrix([[1, -2], [5, 3]]).graph_transform2(output=os.path.join(folder, "transform2.png"))
+      Matrix([[-1, 2, 2], [4, -1, 5], [3, -4, 5]]).graph_transform3(
+        output=os.path.join(folder, "transform3.svg"))
+      self.assertEqual(len(os.listdir(folder)), 4)
+
 if __name__ == '__main__':
   unittest.main()
\ No newline at end of file
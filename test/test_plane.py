@@ -1,6 +1,9 @@
 import math
+import os
+import tempfile
 import unittest
 from unittest.mock import patch
+import numpy as np
 import matplotlib.pyplot as plt
 from src.plane import Plane
 
@@ -40,6 +43,32 @@ class TestPlane(unittest.TestCase):
     self.assertAlmostEqual(polar[0], 7.81, places=2)
     self.assertAlmostEqual(polar[1], 5.59, places=2)
 
+  def test_axis_to_polar(self):
+    polar = Plane.to_polar(0, -3)
+    self.assertAlmostEqual(polar[0], 3, places=2)
+    self.assertAlmostEqual(polar[1], 270, places=2)
+
+  def test_to_rectangular_many(self):
+    a, b = Plane.to_rectangular_many([11, 5], [29, 2 * 180 / math.pi])
+    self.assertAlmostEqual(a[0], 9.62, places=2)
+    self.assertAlmostEqual(b[0], 5.33, places=2)
+    self.assertAlmostEqual(a[1], -2.08, places=2)
+    self.assertAlmostEqual(b[1], 4.55, places=2)
+
+  def test_to_polar_many(self):
+    r, theta = Plane.to_polar_many([5, -3, -4, 6, 0, -2], [2, 8, -6, -5, 4, 0])
+    correct_r = [5.39, 8.54, 7.21, 7.81, 4, 2]
+    correct_theta = [21.80, 110.56, 236.31, 320.19, 90, 180]
+    for index in range(len(correct_r)):
+      self.assertAlmostEqual(r[index], correct_r[index], places=2)
+      self.assertAlmostEqual(theta[index], correct_theta[index], places=2)
+
+  def test_to_polar_many_complex(self):
+    r, theta = Plane.to_polar_many(np.array([6 - 5j, 1j]), isDegrees=False)
+    self.assertAlmostEqual(r[0], 7.81, places=2)
+    self.assertAlmostEqual(theta[0], 5.59, places=2)
+    self.assertAlmostEqual(theta[1], math.pi / 2, places=2)
+
   def test_to_quadrant_degrees(self):
     angle = Plane.to_quadrant(64, 3)
     self.assertAlmostEqual(angle, 244, places=2)
@@ -55,6 +84,28 @@ class TestPlane(unittest.TestCase):
     except:
       self.fail("An error has occurred while graphing function")
 
+  @patch("src.plane.plt.show")
+  def test_graph_series(self, mock_show):
+    try:
+      x = np.linspace(-5, 5, 100000)
+      Plane.graph_series(x, np.sin(x))
+      Plane.graph_series(x, np.cos(x), scale=5, method="lttb")
+    except:
+      self.fail("An error has occurred while graphing series")
+
+  def test_downsample(self):
+    Plane.init_cartesian2(plt, scale=5)
+    x = np.linspace(-5, 5, 100000)
+    y = np.sin(x)
+    y[31415] = 4
+    for method in ["minmax", "lttb"]:
+      small_x, small_y = Plane.downsample(plt.gca(), x, y, method=method)
+      self.assertLess(len(small_x), 10000)
+      self.assertEqual(small_y.max(), 4)
+    with self.assertRaises(ValueError):
+      Plane.downsample(plt.gca(), x, y, method="every other")
+    plt.close("all")
+
   @patch("src.plane.plt.show")
   def test_graph_rectangular(self, mock_show):
     try:
@@ -72,6 +123,28 @@ class TestPlane(unittest.TestCase):
     except:
       self.fail("An error has occurred while graphing polar")
 
+  def test_graph_output(self):
+    with tempfile.TemporaryDirectory() as folder:
+      figures = len(plt.get_fignums())
+      Plane.graph_function(lambda x: x**2, output=os.path.join(folder, "function.png"))
+      Plane.graph_polar(3, 10, output=os.path.join(folder, "polar.svg"))
+      Plane.graph_rectangular(3, 4, scale=5, output=os.path.join(folder, "rectangular.png"))
+      self.assertEqual(sorted(os.listdir(folder)), ["function.png", "polar.svg", "rectangular.png"])
+      # Saved graphs don't open pyplot figures
+      self.assertEqual(len(plt.get_fignums()), figures)
+
+  def test_template_reuse(self):
+    first = Plane.new_graph("cartesian2", "graph.png", scale=3)
+    artists = len(first.get_children())
+    first.plot([0, 1], [0, 1])
+    first.set_title("Graph")
+    Plane.clear(first)
+    second = Plane.new_graph("cartesian2", "graph.png", scale=3)
+    self.assertIs(first, second)
+    self.assertEqual(len(second.get_children()), artists)
+    self.assertEqual(second.get_title(), "")
+    self.assertIsNot(Plane.new_graph("cartesian3", "graph.png", scale=3), first)
+
   @patch("src.plane.plt.show")
   def test_init_cartesian2(self, mock_show):
     try:
@@ -0,0 +1,42 @@
+import math
+import unittest
+from unittest.mock import patch
+from src.pool import WorkerPool
+
+class TestWorkerPool(unittest.TestCase):
+  def test_ordered(self):
+    with WorkerPool(workers=2, max_pending=3) as pool:
+      results = list(pool.map(math.factorial, range(10)))
+    self.assertEqual([index for index, _, _ in results], list(range(10)))
+    self.assertEqual(results[5][1], 120)
+
+  def test_unordered(self):
+    with WorkerPool(workers=2) as pool:
+      results = list(pool.map(math.factorial, range(10), ordered=False))
+    self.assertEqual(sorted(result for _, result, _ in results),
+      sorted(math.factorial(n) for n in range(10)))
+
+  def test_errors(self):
+    with WorkerPool(workers=2) as pool:
+      results = list(pool.map(math.factorial, [3, -1, 4]))
+    self.assertEqual(results[0], (0, 6, None))
+    self.assertIsInstance(results[1][2], ValueError)
+    self.assertEqual(results[2], (2, 24, None))
+
+  def test_tasks_per_worker(self):
+    with WorkerPool(workers=1, tasks_per_worker=2) as pool:
+      self.assertEqual([result for _, result, _ in pool.map(math.factorial, range(5))], [1, 1, 2, 6, 24])
+    # Older versions of Python can't restart workers, so the option is left out
+    with patch("src.pool.sys.version_info", (3, 10)), patch("src.pool.ProcessPoolExecutor") as executor:
+      WorkerPool(workers=1, tasks_per_worker=2)
+    self.assertNotIn("max_tasks_per_child", executor.call_args.kwargs)
+
+  def test_stop_early(self):
+    with WorkerPool(workers=2) as pool:
+      for index, result, error in pool.map(math.factorial, range(10**9)):
+        if index == 5:
+          break
+    self.assertEqual(result, 120)
+
+if __name__ == '__main__':
+  unittest.main()
@@ -1,6 +1,8 @@
+import math
 import unittest
 from unittest.mock import patch
-from src.probability import Probability
+import numpy as np
+from src.probability import Probability, Binomial
 
 class TestProbability(unittest.TestCase):
   def test_permutations_greater_n(self):
@@ -15,6 +17,48 @@ class TestProbability(unittest.TestCase):
   def test_combinations_greater_r(self):
     self.assertEqual(Probability.combinations(2, 6), 0)
 
+  def test_combinations_exact(self):
+    self.assertEqual(Probability.combinations(1000, 500) % 10**6, 216320)
+    self.assertEqual(Probability.permutations(200, 3), 200 * 199 * 198)
+
+  def test_log_combinations(self):
+    self.assertAlmostEqual(Probability.log_combinations(12, 4), math.log(495), places=9)
+    self.assertAlmostEqual(Probability.log_permutations(15, 3), math.log(2730), places=9)
+    self.assertAlmostEqual(Probability.log_combinations(10**9, 2), math.log(10**9 * (10**9 - 1) / 2), places=6)
+    self.assertEqual(Probability.log_combinations(2, 6), -math.inf)
+
+  def test_binomial_large_n(self):
+    self.assertAlmostEqual(Probability.binomial(10000, 5000, 0.5), 0.0079786, places=7)
+    self.assertAlmostEqual(Probability.binomial(2000, 1, 0.001, "max"), 0.405870, places=6)
+
+  def test_binomial_tails(self):
+    self.assertAlmostEqual(Probability.binomial(200, 30, 0.1, "min"), 0.0163265659, places=9)
+    self.assertAlmostEqual(Probability.binomial(1000, 10, 0.3, "max") / 7.0668555733e-136, 1, places=9)
+    self.assertEqual(Probability.binomial(5, 7, 0.5, "min"), 0)
+    self.assertEqual(Probability.binomial(5, 7, 0.5, "max"), 1)
+
+  def test_binomial_sum(self):
+    exact = sum(math.comb(300, k) * 0.3**k * 0.7**(300 - k) for k in range(80, 121))
+    self.assertAlmostEqual(Probability.binomial_sum(300, 80, 120, 0.3), exact, places=12)
+
+  def test_regularized_beta(self):
+    self.assertAlmostEqual(Probability.regularized_beta(0.45, 2, 3), 0.60901875, places=12)
+    self.assertAlmostEqual(Probability.regularized_beta(0.5, 3, 3), 0.5, places=12)
+
+  def test_binomial_huge_n(self):
+    # 10^8 trials uses the incomplete beta function, which should match the recurrence
+    n, r = 10**8, 5 * 10**7 - 10**4
+    self.assertGreater(n, Probability.BETA_LIMIT)
+    self.assertAlmostEqual(Probability.binomial(n, r, 0.5, "max"),
+      Probability.binomial_sum(n, 0, r, 0.5), places=8)
+    self.assertAlmostEqual(Probability.binomial(n, r, 0.5, "min"),
+      Probability.binomial_sum(n, r, n, 0.5), places=8)
+
+  def test_binomial_certain(self):
+    self.assertEqual(Probability.binomial(5, 0, 0), 1)
+    self.assertEqual(Probability.binomial(5, 5, 1), 1)
+    self.assertEqual(Probability.binomial(5, 4, 1), 0)
+
   def test_binomial_min(self):
     self.assertAlmostEqual(Probability.binomial(4, 2, 0.45, "min"), 0.609, places=3)
 
@@ -24,6 +68,45 @@ class TestProbability(unittest.TestCase):
   def test_binomial_exact(self):
     self.assertAlmostEqual(Probability.binomial(10, 6, 0.5), 0.205, places=3)
 
+  def test_simulate_binomial(self):
+    counts, rates, lower, upper = Probability.simulate_binomial(4, 2, 0.45, "min", trials=100000, seed=3, points=50)
+    self.assertEqual(len(counts), 50)
+    self.assertEqual(counts[0], 1)
+    self.assertEqual(counts[-1], 100000)
+    self.assertTrue(lower[-1] < 0.609 < upper[-1])
+    self.assertLess(upper[-1] - lower[-1], 0.01)
+
+  def test_simulate_binomial_chunks(self):
+    whole = Probability.simulate_binomial(6, 1, 1/9, "max", trials=5000, seed=7, points=None)
+    chunked = Probability.simulate_binomial(6, 1, 1/9, "max", trials=5000, seed=7, points=None, chunk_size=333)
+    self.assertEqual(list(whole[1]), list(chunked[1]))
+
+  def test_simulate_binomial_parallel(self):
+    rate, lower, upper, trials_run = Probability.simulate_binomial_parallel(
+      10, 6, 0.5, trials=200000, seed=5, workers=2, chunk_size=20000)
+    self.assertEqual(trials_run, 200000)
+    self.assertTrue(lower < 0.205 < upper)
+    serial = Probability.simulate_binomial_parallel(
+      10, 6, 0.5, trials=200000, seed=5, workers=1, chunk_size=20000)
+    self.assertEqual(serial, (rate, lower, upper, trials_run))
+
+  def test_simulate_binomial_parallel_early_stop(self):
+    rate, lower, upper, trials_run = Probability.simulate_binomial_parallel(
+      4, 2, 0.45, "min", trials=10**9, seed=2, workers=2, chunk_size=10000, target_width=0.02)
+    self.assertLess(trials_run, 10**9)
+    self.assertLess(upper - lower, 0.02)
+
+  def test_simulate_no_trials(self):
+    with self.assertRaises(ValueError):
+      Probability.simulate_binomial(10, 6, 0.5, trials=0)
+    with self.assertRaises(ValueError):
+      Probability.simulate_binomial_parallel(10, 6, 0.5, trials=0, workers=1)
+
+  def test_wilson_interval(self):
+    lower, upper = Probability.wilson_interval(0, 10)
+    self.assertAlmostEqual(float(lower), 0, places=3)
+    self.assertAlmostEqual(float(upper), 0.278, places=3)
+
   @patch("src.probability.plt.show")
   @patch("src.probability.plt.pause")
   def test_graph_binomial(self, mock_show, mock_pause):
@@ -32,5 +115,65 @@ class TestProbability(unittest.TestCase):
     except:
       self.fail("An error has occurred while graphing binomial probability")
 
+  def test_graph_binomial_series(self):
+    rates = Probability.graph_binomial(5, 3, 4/7, r_meaning="min", trials=20000, display=False, seed=1)
+    self.assertEqual(len(rates), 20000)
+    self.assertAlmostEqual(rates[-1], Probability.binomial(5, 3, 4/7, "min"), places=1)
+    repeated = Probability.graph_binomial(5, 3, 4/7, r_meaning="min", trials=20000, display=False, seed=1)
+    self.assertEqual(list(rates), list(repeated))
+
+  @patch("src.probability.animation.FuncAnimation")
+  @patch("src.probability.plt.show")
+  def test_graph_binomial_delay(self, mock_show, mock_animation):
+    # The old delay argument (6th, like before fps) still works, as fps = 1 / delay
+    with self.assertWarns(DeprecationWarning):
+      Probability.graph_binomial(5, 3, 4/7, "min", 10, 0.25)
+    self.assertEqual(mock_animation.call_args.kwargs["interval"], 250)
+
+  @patch("src.probability.plt.show")
+  def test_graph_binomial_batches(self, mock_show):
+    try:
+      Probability.graph_binomial(10, 6, 0.5, trials=100000, fps=30, batch_size=1000)
+    except:
+      self.fail("An error has occurred while graphing binomial probability")
+
+class TestBinomial(unittest.TestCase):
+  def test_pmf(self):
+    distribution = Binomial(10, 0.5)
+    self.assertAlmostEqual(float(distribution.pmf(6)), 0.205, places=3)
+    self.assertEqual(list(distribution.pmf([-1, 11])), [0, 0])
+    self.assertAlmostEqual(float(distribution.pmf(np.arange(11)).sum()), 1, places=12)
+
+  def test_cdf(self):
+    distribution = Binomial(6, 1/9)
+    self.assertAlmostEqual(float(distribution.cdf(1)), 0.863, places=3)
+    self.assertEqual(list(distribution.cdf([-1, 6, 9])), [0, 1, 1])
+    self.assertAlmostEqual(float(Binomial(4, 0.45).sf(2)), 0.609, places=3)
+
+  def test_ppf(self):
+    distribution = Binomial(1000, 0.3)
+    self.assertEqual(int(distribution.ppf(0.5)), 300)
+    quantiles = distribution.ppf([0.0, 0.025, 0.975, 1.0])
+    self.assertTrue(np.all(distribution.cdf(quantiles) >= [0.0, 0.025, 0.975, 0.999999]))
+    self.assertTrue(np.all(distribution.cdf(quantiles[1:3] - 1) < [0.025, 0.975]))
+
+  def test_certain(self):
+    self.assertEqual(Binomial(5, 0).probability(0), 1)
+    self.assertEqual(Binomial(5, 1).probability(5, "max"), 1)
+    self.assertEqual(Binomial(5, 1).probability(4, "max"), 0)
+
+  def test_shared_tables(self):
+    self.assertIs(Binomial.of(20, 0.25), Binomial.of(20, 0.25))
+    Binomial.clear()
+    # A one-off call doesn't build a table
+    Probability.binomial(20, 4, 0.25, "min")
+    self.assertEqual(Binomial.of.cache_info().currsize, 0)
+    # Repeated calls share one
+    Probability.binomial(20, 5, 0.25, "max")
+    Probability.binomial(20, 6, 0.25)
+    self.assertEqual(Binomial.of.cache_info().currsize, 1)
+    self.assertEqual(Binomial.of.cache_info().hits, 1)
+    self.assertAlmostEqual(Probability.binomial(20, 4, 0.25, "min"), 1 - Binomial.of(20, 0.25).probability(3, "max"))
+
 if __name__ == '__main__':
   unittest.main()
\ No newline at end of file
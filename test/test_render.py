@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from src.render import RenderQueue
+
+class TestRenderQueue(unittest.TestCase):
+  def test_render(self):
+    with tempfile.TemporaryDirectory() as folder:
+      specs = [
+        {"type": "function", "function": "np.sin(x) * x", "scale": 5, "output": os.path.join(folder, "function.png")},
+        {"type": "vector", "matrix": [[1, -2], [5, 3]], "output": os.path.join(folder, "vector.png")},
+        {"type": "transform2", "matrix": [[1, 2], [3, 4]], "vector": (1, -1), "output": os.path.join(folder, "transform2.svg")},
+        {"type": "transform3", "matrix": [[-1, 2, 2], [4, -1, 5], [3, -4, 5]], "output": os.path.join(folder, "transform3.png")},
+        {"type": "triangle", "a": 6, "b": 6, "c": 5, "output": os.path.join(folder, "triangle.png")},
+        {"type": "polar", "r": 3, "theta": 10, "output": os.path.join(folder, "polar.png")},
+      ]
+      updates = []
+      failures = RenderQueue(workers=2).render(specs, progress=lambda *update: updates.append(update))
+      self.assertEqual(failures, [])
+      self.assertEqual(len(os.listdir(folder)), len(specs))
+      self.assertEqual(updates[-1], (len(specs), len(specs), 0))
+
+  def test_failures(self):
+    with tempfile.TemporaryDirectory() as folder:
+      specs = [
+        {"type": "triangle", "a": 3, "b": 4, "c": 0, "output": os.path.join(folder, "invalid.png")},
+        {"type": "spiral", "output": os.path.join(folder, "spiral.png")},
+        {"type": "rectangular", "a": 3, "b": 4, "scale": 5, "output": os.path.join(folder, "rectangular.png")},
+      ]
+      failures = RenderQueue(workers=2).render(iter(specs))
+      self.assertEqual(sorted(failure["index"] for failure in failures), [0, 1])
+      self.assertEqual(os.listdir(folder), ["rectangular.png"])
+
+  def test_expressions(self):
+    self.assertEqual(RenderQueue.to_function("x**2 + np.pi")(2), 4 + 3.141592653589793)
+    self.assertAlmostEqual(RenderQueue.to_function("np.sin(x) * x")(1), 0.8414709848)
+    # Anything besides numbers, x, operators, and numpy math is refused
+    for expression in ["x.__class__", "().__class__.__base__", "np.load('data.npy')", "np",
+        "__import__('os')", "'text'", "[x for x in ()]", "np.sin(x, out=x)"]:
+      self.assertRaises(ValueError, RenderQueue.to_function, expression)
+
+  def test_function_limit(self):
+    first = RenderQueue.to_function("x + 0")
+    with patch.object(RenderQueue, "MAX_FUNCTIONS", 5):
+      for number in range(1, 20):
+        RenderQueue.to_function(f"x + {number}")
+        # The first expression keeps being used, so it's never dropped
+        self.assertIs(RenderQueue.to_function("x + 0"), first)
+      self.assertLessEqual(len(RenderQueue._functions), 5)
+
+if __name__ == '__main__':
+  unittest.main()
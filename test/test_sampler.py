@@ -0,0 +1,84 @@
+import gc
+import unittest
+from unittest.mock import patch
+import numpy as np
+from src.sampler import Sampler
+
+class TestSampler(unittest.TestCase):
+  def test_line_uses_initial_points(self):
+    x, y = Sampler(lambda x: 2 * x + 1).sample(-5, 5, initial_points=11)
+    self.assertEqual(len(x), 11)
+    self.assertAlmostEqual(y[-1], 11, places=2)
+
+  def test_sharp_turn_gets_more_points(self):
+    x, y = Sampler(lambda x: np.abs(x - 0.3)).sample(-1, 1, initial_points=11)
+    near_turn = np.count_nonzero(np.abs(x - 0.3) < 0.1)
+    self.assertGreater(near_turn, 3)
+    self.assertLess(len(x), 200)
+
+  def test_point_budget(self):
+    # Starts just right of 0, so 1/x is never evaluated there
+    x, y = Sampler(lambda x: np.sin(1 / x)).sample(0.01, 1, max_points=150)
+    self.assertLessEqual(len(x), 150)
+    self.assertTrue(np.all(np.diff(x) > 0))
+
+  def test_cache_reuse(self):
+    sampler = Sampler(lambda x: x**3)
+    sampler.sample(-2, 2)
+    evaluations = sampler.evaluations
+    sampler.sample(-2, 2)
+    self.assertEqual(sampler.evaluations, evaluations)
+
+  def test_cache_limit(self):
+    sampler = Sampler(lambda x: x**3)
+    with patch.object(Sampler, "MAX_CACHE", 50):
+      x, y = sampler.sample(-2, 2, tolerance=0)
+      self.assertGreater(len(x), 50)
+      self.assertEqual(len(sampler.cache), 50)
+      np.testing.assert_allclose(y, x**3)
+      # The most recently used points are the ones kept
+      sampler.evaluate([-2.0])
+      self.assertEqual(next(reversed(sampler.cache)), -2.0)
+
+  def test_shared_sampler(self):
+    function = lambda x: x**2
+    self.assertIs(Sampler.of(function), Sampler.of(function))
+    Sampler.of(function).sample(0, 1)
+    # The shared sampler (and its cache) goes away with its function
+    count = len(Sampler._samplers)
+    del function
+    gc.collect()
+    self.assertEqual(len(Sampler._samplers), count - 1)
+
+  def test_scalar_function(self):
+    x, y = Sampler(lambda x: max(x, 0)).sample(-1, 1)
+    self.assertAlmostEqual(y[0], 0, places=2)
+    self.assertAlmostEqual(y[-1], 1, places=2)
+
+  def test_min_max_keeps_peaks(self):
+    x = np.linspace(0, 10, 100000)
+    y = np.sin(x)
+    y[500] = -7
+    y[77777] = 9
+    small_x, small_y = Sampler.min_max(x, y, 100)
+    self.assertLessEqual(len(small_x), 400)
+    self.assertEqual(small_y.min(), -7)
+    self.assertEqual(small_y.max(), 9)
+    self.assertEqual(small_x[0], 0)
+    self.assertEqual(small_x[-1], 10)
+
+  def test_lttb(self):
+    x = np.linspace(0, 10, 100000)
+    y = np.sin(x)
+    y[4242] = 5
+    small_x, small_y = Sampler.lttb(x, y, 500)
+    self.assertEqual(len(small_x), 500)
+    self.assertEqual(small_y.max(), 5)
+    self.assertTrue(np.all(np.diff(small_x) > 0))
+
+  def test_downsample_drops_undefined(self):
+    small_x, small_y = Sampler.min_max([0, 1, 2], [1, np.nan, 3], 10)
+    self.assertEqual(list(small_x), [0, 2])
+
+if __name__ == '__main__':
+  unittest.main()
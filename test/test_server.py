@@ -0,0 +1,104 @@
+import asyncio
+import unittest
+from src.cli import Cli
+from src.server import Server, Client
+
+class TestServer(unittest.TestCase):
+  def serve(self, test, **options):
+    """Runs test(server, client) against a server on a free localhost port"""
+    async def run():
+      server = await Server(port=0, workers=1, **options).start()
+      client = await Client(port=server.port).connect()
+      try:
+        await test(server, client)
+      finally:
+        await client.close()
+        await server.close()
+    asyncio.run(run())
+
+  def test_requests(self):
+    async def test(server, client):
+      solution = await client.request("triangle.solve", {"a": 10, "b": 6, "C": 50})
+      self.assertAlmostEqual(solution["c"], Cli.solve("triangle.solve", {"a": 10, "b": 6, "C": 50})["c"])
+      self.assertTrue(solution["valid"])
+      self.assertEqual(await client.request("base.convert", {"number": "ff", "old_base": 16, "new_base": 2}), "11111111")
+      self.assertEqual(await client.request("matrix.determinant", {"matrix": [[2, 1], [1, 3]]}), 5)
+      self.assertIn("error", await client.send("matrix.inverse", {"matrix": [[1, 2], [2, 4]]}))
+      self.assertIn("unknown op", (await client.send("spiral.solve"))["error"])
+      self.assertIn("error", await client.send("triangle.solve", {"d": 4}))
+    self.serve(test)
+
+  def test_triangle_arguments(self):
+    results = Server.solve_triangles([{"a": "3", "b": 4, "c": 5}, {"a": True, "b": 4, "c": 5}, {"a": 3, "b": 4.0, "c": 5}])
+    self.assertEqual([error.split(":")[0] if error else None for _, error in results], ["TypeError", "TypeError", None])
+    self.assertTrue(results[2][0]["valid"])
+
+  def test_batches(self):
+    async def test(server, client):
+      requests = [("triangle.solve", {"a": a, "b": 6, "C": 50}) for a in range(1, 30)]
+      requests += [("probability.binomial", {"n": 10, "r": r, "success_chance": 0.3, "r_meaning": meaning})
+        for r in range(-1, 12) for meaning in ("exact", "min", "max")]
+      results = await asyncio.gather(*(client.request(op, args) for op, args in requests))
+      for (op, args), result in zip(requests, results):
+        expected = Cli.solve(op, args)
+        if op == "probability.binomial":
+          self.assertAlmostEqual(result, expected, places=12)
+        else:
+          self.assertEqual(result["valid"], expected["valid"])
+          self.assertAlmostEqual(result["area"], expected["area"])
+      metrics = await client.request("server.metrics")
+      self.assertLess(metrics["batches"], len(requests))
+      self.assertEqual(metrics["batched"], len(requests))
+    self.serve(test, batch_delay=0.05)
+
+  def test_coalescing(self):
+    async def test(server, client):
+      args = {"n": 50, "r": 20, "success_chance": 0.5}
+      results = await asyncio.gather(*(client.request("probability.binomial", args) for _ in range(20)))
+      self.assertEqual(len(set(results)), 1)
+      metrics = await client.request("server.metrics")
+      self.assertEqual(metrics["coalesced"], 19)
+      self.assertEqual(metrics["requests"], 20)
+    self.serve(test, batch_delay=0.05)
+
+  def test_unserializable_result(self):
+    async def test(server, client):
+      # 10^4000 in base 2 is an int too long for JSON
+      response = await asyncio.wait_for(client.send("base.convert",
+        {"number": 10**4000, "old_base": 10, "new_base": 2}), 10)
+      self.assertTrue(response["error"].startswith("ValueError"))
+      self.assertEqual(await client.request("base.convert", {"number": "ff", "old_base": 16, "new_base": 2}), "11111111")
+    self.serve(test)
+
+  def test_client_failures(self):
+    async def run():
+      # A server that never answers, and closes each connection after its first request
+      async def silent(reader, writer):
+        await reader.readline()
+        await asyncio.sleep(0.2)
+        writer.close()
+      server = await asyncio.start_server(silent, "127.0.0.1", 0)
+      port = server.sockets[0].getsockname()[1]
+      client = await Client(port=port, timeout=0.05).connect()
+      with self.assertRaises(asyncio.TimeoutError):
+        await client.send("triangle.solve", {"a": 3, "b": 4, "c": 5})
+      await client.close()
+      client = await Client(port=port).connect()
+      with self.assertRaises(ConnectionError):
+        await client.send("triangle.solve", {"a": 3, "b": 4, "c": 5})
+      with self.assertRaises(ConnectionError):
+        await client.send("triangle.solve", {"a": 3, "b": 4, "c": 5})
+      await client.close()
+      server.close()
+      await server.wait_closed()
+    asyncio.run(run())
+
+  def test_load(self):
+    async def test(server, client):
+      stats = await Client.load(Client.sample_requests(200, unique=50, seed=0), port=server.port, connections=2)
+      self.assertEqual((stats["requests"], stats["errors"]), (200, 0))
+      self.assertGreater(stats["latency_ms"]["max"], 0)
+    self.serve(test)
+
+if __name__ == '__main__':
+  unittest.main()
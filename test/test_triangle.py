@@ -1,6 +1,14 @@
+import csv
+import json
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
 import unittest
 from unittest.mock import patch
-from src.triangle import Triangle
+import numpy as np
+from src.triangle import Triangle, TriangleBatch, TriangleCache, TriangleFile, TriangleSolution
 
 class TriangleTest(unittest.TestCase):
   def test_sss(self):
@@ -65,6 +73,75 @@ class TriangleTest(unittest.TestCase):
     self.assertAlmostEqual(triangle.angles[1], 65.376, places=2)
     self.assertAlmostEqual(triangle.angles[2], 49.249, places=2)
 
+  def test_validity(self):
+    self.assertEqual(Triangle.validity([3, 4, 5], [36.87, 53.13, 90]), Triangle.VALID)
+    self.assertEqual(Triangle.validity([3, 4, None], [36.87, 53.13, 90]), Triangle.MISSING)
+    self.assertEqual(Triangle.validity([3, 4, 5], [36.87, 53.13, 60]), Triangle.ANGLE_SUM)
+    self.assertEqual(Triangle.validity([3, 4, 5], [36.87, 90, 53.13]), Triangle.LONGEST_SIDE)
+    self.assertEqual(Triangle.validity([1, 2, 10], [10, 20, 150]), Triangle.INEQUALITY)
+    self.assertEqual(Triangle.validity([5, 5.5, 6], [55, 55, 70]), Triangle.ISOSCELES)
+
+  def test_solve_tuple(self):
+    for args in [dict(a=4, b=6, c=8), dict(a=10, b=6, C=50), dict(a=5, b=8, B=40),
+        dict(A=50, a=150, c=100), dict(A=30, c=8, B=70), dict(a=3, b=4, c=0)]:
+      triangle = Triangle(**args)
+      solution = Triangle.solve_tuple(**args)
+      self.assertEqual(type(solution), tuple)
+      self.assertEqual(list(solution[:3]), triangle.sides)
+      self.assertEqual(list(solution[3:6]), triangle.angles)
+      self.assertEqual(solution[6:9], (triangle.perimeter, triangle.area, triangle.height))
+      self.assertEqual(solution[9] == Triangle.VALID, triangle.is_valid())
+
+  def test_solve_all(self):
+    # Ambiguous case: B can be acute or obtuse
+    solutions = Triangle.solve_all(a=6, b=8, A=30)
+    self.assertEqual(len(solutions), 2)
+    self.assertAlmostEqual(solutions[0][4], 41.81, places=2)
+    self.assertAlmostEqual(solutions[1][4], 138.19, places=2)
+    for solution in solutions:
+      self.assertEqual(solution[9], Triangle.VALID)
+      self.assertAlmostEqual(sum(solution[3:6]), 180)
+    # Right triangle (sinB is exactly 1)
+    solutions = Triangle.solve_all(a=3, b=6, A=30)
+    self.assertEqual(len(solutions), 1)
+    self.assertAlmostEqual(solutions[0][2], 5.196, places=2)
+    # Too short to reach, only obtuse or acute, and other cases
+    self.assertEqual(Triangle.solve_all(a=2, b=6, A=30), ())
+    self.assertEqual(len(Triangle.solve_all(a=10, b=6, A=30)), 1)
+    self.assertEqual(len(Triangle.solve_all(A=50, a=150, c=100)), 1)
+    self.assertEqual(Triangle.solve_all(a=3, b=4, c=5), (Triangle.solve_tuple(a=3, b=4, c=5),))
+
+  def test_ssa_right(self):
+    triangle = Triangle(a=3, b=6, A=30)
+    self.assertTrue(triangle.is_valid())
+    self.assertAlmostEqual(triangle.angles[1], 90, places=2)
+
+  def test_ssa_rounded(self):
+    # Sides rounded to a few digits put the sine of the right angle just over 1
+    for known in [{"a": 8.66, "c": 10, "A": 60}, {"a": 8.66, "c": 10, "A": 60, "C": 90},
+        {"a": 10, "b": 6.41, "B": 60, "C": 90}]:
+      solution = Triangle.solve_tuple(**known)
+      self.assertEqual(solution[9], Triangle.VALID)
+      self.assertAlmostEqual(solution[5], 90, places=2)
+      batch = TriangleBatch(**{name: np.array([value]) for name, value in known.items()})
+      self.assertTrue(batch.valid[0])
+      np.testing.assert_allclose(batch.sides[0], solution[:3])
+
+  def test_solution(self):
+    solution = TriangleSolution(a=3, b=4, c=5)
+    self.assertAlmostEqual(solution.C, 90, places=2)
+    self.assertEqual(solution.sides, (3, 4, 5))
+    self.assertEqual(solution.area, 6)
+    self.assertTrue(solution.is_valid())
+    with self.assertRaises(AttributeError):
+      solution.a = 6
+    self.assertFalse(TriangleSolution(a=1, b=2, c=10).is_valid())
+    # Unpickling keeps the solved values instead of solving them again
+    for solution in [TriangleSolution(a=10, b=6, C=50), TriangleSolution(a=6, b=8, A=30)]:
+      copy = pickle.loads(pickle.dumps(solution))
+      self.assertEqual(copy, solution)
+      self.assertIsInstance(copy, TriangleSolution)
+
   @patch("src.triangle.plt.show")
   def test_graph(self, mock_show):
     try:
@@ -73,6 +150,143 @@ class TriangleTest(unittest.TestCase):
     except:
       self.fail("An error has occurred while graphing triangle")
 
+  def test_graph_output(self):
+    with tempfile.TemporaryDirectory() as folder:
+      output = os.path.join(folder, "triangle.png")
+      Triangle(a=6, b=6, c=5).graph(output=output)
+      Triangle(a=4, b=6, B=80).graph(output=output)
+      self.assertTrue(os.path.exists(output))
+
+class TriangleCacheTest(unittest.TestCase):
+  def test_hits(self):
+    cache = TriangleCache(maxsize=2)
+    first = cache.solve(a=3, b=4, c=5)
+    self.assertIs(cache.solve(a=3, b=4, c=5), first)
+    # Rotated labels and rounding errors share the same solution
+    rotated = cache.solve(a=4, b=5, c=3)
+    self.assertEqual(rotated.sides, (4, 5, 3))
+    self.assertAlmostEqual(rotated.B, 90, places=2)
+    cache.solve(a=0.1 + 0.2, b=0.3, C=60)
+    cache.solve(a=0.3, b=0.3, C=60)
+    info = cache.cache_info()
+    self.assertEqual((info.hits, info.misses, info.currsize), (3, 2, 2))
+    cache.cache_clear()
+    self.assertEqual(cache.cache_info().currsize, 0)
+
+  def test_matches_solve_tuple(self):
+    cache = TriangleCache()
+    for args in [dict(a=10, b=6, C=50), dict(b=5, c=8, C=40), dict(A=50, a=150, c=100),
+        dict(B=30, a=8, C=70), dict(a=3, b=4, c=0), dict(a=6, b=8, A=30, B=40)]:
+      solution = cache.solve(**args)
+      self.assertIsInstance(solution, TriangleSolution)
+      for value, expected in zip(solution, Triangle.solve_tuple(**args)):
+        if expected is None:
+          self.assertIsNone(value)
+        else:
+          self.assertAlmostEqual(value, expected)
+
+  def test_non_numeric(self):
+    # Values the cache can't round are solved like Triangle.solve_tuple() does
+    cache = TriangleCache()
+    self.assertEqual(cache.solve(a=3, b=4, c=5, A="x"), Triangle.solve_tuple(a=3, b=4, c=5, A="x"))
+    self.assertRaises(TypeError, cache.solve, a="3", b=4, c=5)
+    self.assertEqual(cache.cache_info().currsize, 0)
+
+class TriangleBatchTest(unittest.TestCase):
+  def test_cases(self):
+    nan = np.nan
+    # SSS, SAS, SSA (quadrant 1), SSA (quadrant 2), ASA
+    single = [Triangle(a=4, b=6, c=8), Triangle(a=10, b=6, C=50), Triangle(a=5, b=8, B=40),
+      Triangle(A=50, a=150, c=100), Triangle(A=30, c=8, B=70)]
+    batch = TriangleBatch(
+      a=[4, 10, 5, 150, nan], b=[6, 6, 8, nan, nan], c=[8, nan, nan, 100, 8],
+      A=[nan, nan, nan, 50, 30], B=[nan, nan, 40, nan, 70], C=[nan, 50, nan, nan, nan])
+    self.assertEqual(batch.case.tolist(), [TriangleBatch.SSS, TriangleBatch.SAS,
+      TriangleBatch.SSA, TriangleBatch.SSA, TriangleBatch.ASA])
+    self.assertTrue(batch.valid.all())
+    for index, triangle in enumerate(single):
+      np.testing.assert_allclose(batch.sides[index], triangle.sides)
+      np.testing.assert_allclose(batch.angles[index], triangle.angles)
+      self.assertAlmostEqual(batch.perimeter[index], triangle.perimeter)
+      self.assertAlmostEqual(batch.area[index], triangle.area)
+      self.assertAlmostEqual(batch.height[index], triangle.height)
+
+  def test_invalid(self):
+    batch = TriangleBatch(a=[3, 1, 3], b=[4, 2, np.nan], c=[0, 10, np.nan], A=[np.nan, np.nan, 40])
+    self.assertEqual(batch.valid.tolist(), [False, False, False])
+    self.assertEqual(batch.case[2], TriangleBatch.UNSOLVABLE)
+    self.assertEqual(batch.area.tolist(), [0, 0, 0])
+
+  def test_broadcast(self):
+    batch = TriangleBatch(a=np.arange(3, 6), b=4, c=5)
+    self.assertEqual(len(batch), 3)
+    np.testing.assert_allclose(batch.angles[0], Triangle(a=3, b=4, c=5).angles)
+
+class TriangleFileTest(unittest.TestCase):
+  def test_csv(self):
+    with tempfile.TemporaryDirectory() as folder:
+      source, destination, errors = (os.path.join(folder, name) for name in ("in.csv", "out.csv", "errors.jsonl"))
+      with open(source, "w") as file:
+        file.write("id,a,b,c,A,B,C\n1,3,4,5,,,\n2,10,6,,,,50\n\n3,x,4,5,,,\n4,1,1,5,,,\n5,3,4\n")
+      updates = []
+      stats = TriangleFile(workers=2, chunk_rows=2).solve(source, destination, errors=errors,
+        progress=lambda *update: updates.append(update))
+      self.assertEqual((stats["rows"], stats["invalid"], stats["chunks"], stats["failed_chunks"]), (3, 1, 3, 0))
+      self.assertEqual(updates[-1], (3, None, 0))
+      with open(destination) as file:
+        lines = file.read().splitlines()
+      self.assertEqual(lines[0], "id,a,b,c,A,B,C,perimeter,area,height,valid")
+      self.assertEqual([line.split(",")[0] for line in lines[1:]], ["1", "2", "4"])
+      solved = [float(value) for value in lines[2].split(",")[1:10]]
+      self.assertEqual(tuple(solved), Triangle.solve_tuple(a=10, b=6, C=50)[:9])
+      self.assertEqual(lines[3].split(",")[-1], "false")
+      with open(errors) as file:
+        records = [json.loads(line) for line in file]
+      self.assertEqual([record["chunk"] for record in records], [1, 2])
+      self.assertEqual(list(records[0]["errors"]), ["5"])
+      self.assertEqual(records[1]["invalid"], [6])
+
+  def test_csv_multiline_fields(self):
+    with tempfile.TemporaryDirectory() as folder:
+      source, destination, errors = (os.path.join(folder, name) for name in ("in.csv", "out.csv", "errors.jsonl"))
+      with open(source, "w", newline="") as file:
+        file.write('note,a,b,c\n"first\nline",3,4,5\n"two\nmore\nlines",1,1,5\nlast,6,8,10\n')
+      stats = TriangleFile(workers=1, chunk_rows=1).solve(source, destination, errors=errors)
+      self.assertEqual((stats["rows"], stats["invalid"], stats["chunks"]), (3, 1, 3))
+      with open(destination, newline="") as file:
+        rows = list(csv.reader(file))
+      self.assertEqual([row[0] for row in rows[1:]], ["first\nline", "two\nmore\nlines", "last"])
+      with open(errors) as file:
+        record = json.loads(file.readline())
+      self.assertEqual((record["lines"], record["invalid"]), ([4, 6], [4]))
+
+  def test_jsonl(self):
+    with tempfile.TemporaryDirectory() as folder:
+      source, destination = os.path.join(folder, "in.jsonl"), os.path.join(folder, "out.jsonl")
+      with open(source, "w") as file:
+        file.write('{"id": 1, "a": 3, "b": 4, "c": 5}\n{"a": \n{"a": 6, "b": 8, "A": 30, "C": null}\n')
+      stats = TriangleFile(workers=1).solve(source, destination)
+      self.assertEqual(stats["rows"], 2)
+      with open(destination) as file:
+        records = [json.loads(line) for line in file]
+      self.assertEqual(records[0]["id"], 1)
+      self.assertEqual(records[0]["C"], 90)
+      self.assertAlmostEqual(records[1]["B"], 41.81, places=2)
+      self.assertTrue(all(record["valid"] for record in records))
+
+  def test_lazy_imports(self):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    script = ("import sys\nimport src.triangle\n"
+      "print(sorted(name for name in ('csv', 'json', 'src.pool') if name in sys.modules))")
+    output = subprocess.run([sys.executable, "-c", script], cwd=root, capture_output=True, text=True, check=True,
+      env={**os.environ, "MPLBACKEND": "Agg"}).stdout
+    self.assertEqual(output.strip(), "[]")
+
+  def test_format(self):
+    self.assertEqual(TriangleFile.file_format("triangles.CSV"), "csv")
+    self.assertEqual(TriangleFile.file_format("triangles.ndjson"), "jsonl")
+    self.assertRaises(ValueError, TriangleFile.file_format, "triangles.txt")
+
 # Run all tests in class if this file is ran (renamed to __main__ when running)
 if __name__ == '__main__':
   unittest.main()
\ No newline at end of file